@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'main.profiling.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,6 +63,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'core.urls'
 
+# main.profiling: Server-Timing sarlavhalari va har so'rov uchun JSON log (standart holatda o'chiq)
+REQUEST_PROFILING = False
+# Bitta SQL shabloni shuncha marta takrorlansa N+1 deb belgilanadi
+REQUEST_PROFILING_N_PLUS_ONE = 5
+
 CORS_ORIGIN_ALLOW_ALL = True
 
 SWAGGER_SETTINGS = {
@@ -80,8 +87,11 @@ REST_FRAMEWORK = {
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
 
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'main.authentication.RoleClaimsJWTAuthentication',
+    ),
+
+    'DEFAULT_PAGINATION_CLASS': 'main.pagination.IdCursorPagination',
+    'PAGE_SIZE': 50,
 
 }
 
@@ -89,8 +99,11 @@ REST_FRAMEWORK = {
 from datetime import timedelta
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=30),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=180)
+    # Access token claim'lari (rol, guruhlar) refresh'da bazadan qayta o'qiladi, shuning uchun qisqa
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=180),
+    "TOKEN_OBTAIN_SERIALIZER": "main.serializers.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "main.serializers.RoleTokenRefreshSerializer",
 }
 
 
@@ -170,9 +183,8 @@ JAZZMIN_SETTINGS = {
     "custom_links": {
         "main.Student": [{
             "name": "Import Talabalar",
-            "url": "https://docs.google.com/",
+            "url": "admin:main_student_import",
             "icon": "fas fa-upload",
-            "new_window": True
         }],
     },
     "default_theme": "darkly",
@@ -229,6 +241,56 @@ else:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# main.media.serve_media: 'django' | 'x-accel' (nginx) | 'x-sendfile' (Apache)
+MEDIA_SERVE_MODE = 'django' if DEBUG else 'x-accel'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 60 * 60
+# Faqat tizimga kirgan foydalanuvchilarga beriladigan papkalar, masalan ('answers/',)
+MEDIA_PROTECTED_PREFIXES = ()
+
+
+# Test qog'ozi, model versiyalari (ETag), dashboard va token holati keshlari barcha worker
+# process'lar uchun umumiy bo'lishi shart: LocMemCache'da bir worker'dagi yozuv boshqalarining
+# versiyasini yangilamaydi. REDIS_URL berilsa Redis (maxmemory-policy noeviction yoki
+# volatile-*), aks holda bitta serverdagi process'lar bo'lishadigan fayl keshi.
+REDIS_URL = os.environ.get('REDIS_URL')
+
+
+def shared_cache(name, max_entries):
+    if REDIS_URL:
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL, 'KEY_PREFIX': name}
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / name,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+
+def session_cache():
+    """
+    main.test_sessions avtosaqlash buferi: Redis yoki ``main_test_session_cache`` jadvali
+    (``manage.py createcachetable``). FileBasedCache har ``set``da papkani to'liq o'qiydi va
+    to'lganda buferlangan javoblarni tasodifiy o'chiradi, shuning uchun bu yerda ishlatilmaydi
+    (main.E001). Imtihon o'rtasida hech narsa cull qilinmasin: MAX_ENTRIES bir vaqtdagi
+    sessiyalar x savollar sonidan ancha katta, muddati o'tgan yozuvlar cull'da birinchi o'chadi.
+    """
+    if REDIS_URL:
+        return shared_cache('test_sessions', None)
+    return {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'main_test_session_cache',
+        'OPTIONS': {'MAX_ENTRIES': 2000000},
+    }
+
+
+CACHES = {
+    'default': shared_cache('default', 50000),
+    'test_sessions': session_cache(),
+}
+TEST_SESSION_CACHE = 'test_sessions'
+# Tarmoq kechikishi uchun muddatdan keyin qabul qilinadigan soniyalar
+TEST_SESSION_GRACE_SECONDS = 30
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
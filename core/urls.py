@@ -1,6 +1,8 @@
 
+import re
+
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
@@ -8,7 +10,8 @@ from rest_framework_simplejwt.views import token_obtain_pair , token_refresh
 from main.views import *
 
 from django.conf import settings
-from django.conf.urls.static import static
+from main.media import serve_media
+from main import async_views
 
 
 schema_view = get_schema_view(
@@ -29,7 +32,9 @@ urlpatterns = [
     path('', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
 
 urlpatterns += [
     path('token/', token_obtain_pair ),
@@ -41,6 +46,7 @@ urlpatterns += [
     path('courses/', CourseListView.as_view(), name='courses'),
     path('courses/create/', CourseCreateView.as_view(), name='courses'),
     path('courses/<int:pk>/', CourseRetrieveUpdateDestroyView.as_view()),
+    path('courses/<int:pk>/students/', CourseStudentListView.as_view(), name='course-students'),
     path('groups/', GroupListCreateView.as_view(), name='groups'),
     path('groups/<int:pk>/', GroupRetrieveUpdateDestroyView.as_view()),
     path('mentors/', MentorListCreateView.as_view(), name='mentors'),
@@ -48,14 +54,25 @@ urlpatterns += [
     path('mentors/get-me/', MentorDetailView.as_view(), name='mentor-details'),
     path('students/', StudentListCreateView.as_view(), name='students'),
     path('students/<int:pk>/', StudentRetrieveUpdateDestroyView.as_view()),
+    path('students/<int:pk>/points/', StudentPointHistoryView.as_view(), name='student-point-history'),
+    path('students/import/', StudentImportView.as_view(), name='students-import'),
+    path('students/import/<str:job_id>/', StudentImportJobView.as_view(), name='students-import-job'),
     path('students/get-me/', StudentDetailView.as_view(), name='student-details'),
+    path('students/dashboard/', StudentDashboardView.as_view(), name='student-dashboard'),
     path('give-points/', GivePointCreateView.as_view()),
+    path('give-points/bulk/', GivePointBulkCreateView.as_view(), name='give-points-bulk'),
     path('give-points/list/', GivePointListView.as_view(), name='give_points'),
     path('give-points/<int:pk>/', GivePointRetrieveUpdateDestroyView.as_view()),
 
     path('test/' , TestListView.as_view(), name='test-list'),
     path('test/create/' , TestCreatView.as_view(),),
     path('test/<int:pk>/', TestRetrieveUpdateDestroyView.as_view()),
+    path('test/<int:pk>/paper/', TestPaperView.as_view(), name='test-paper'),
+    path('test/<int:pk>/stats/', TestStatsView.as_view(), name='test-stats'),
+    path('test-sessions/', TestSessionStartView.as_view(), name='test-session-start'),
+    path('test-sessions/<int:pk>/', TestSessionDetailView.as_view(), name='test-session'),
+    path('test-sessions/<int:pk>/answers/', TestSessionAnswersView.as_view(), name='test-session-answers'),
+    path('test-sessions/<int:pk>/submit/', TestSessionSubmitView.as_view(), name='test-session-submit'),
     path('students/test/result/', StudentTestResultListCreateView.as_view(), name='test-result'),
     path('student/test/result/<int:pk>' , StudentTestResultRetrieveUpdateDestroyView.as_view()),
     path('student/test/result/get-me/', StudentTestDetailView.as_view(), name='test-result-get-me'),
@@ -74,8 +91,18 @@ urlpatterns += [
 
     path('achievement/' , AchievementListCreateView.as_view(), name='achievement-list'),
     path('achievement/<int:pk>/' ,AchievementRetrieveUpdateDestroyView.as_view() ),
+    path('achievement/<int:pk>/redeem/', AchievementRedeemView.as_view(), name='achievement-redeem'),
+    path('achievement/purchases/', AchievementPurchaseListView.as_view(), name='achievement-purchases'),
     path('api/tests/submit/', SubmitTestAPIView.as_view(), name='submit-test'),
+    path('api/tests/submit/answers/', SubmitTestAnswersAPIView.as_view(), name='submit-test-answers'),
+    path('api/async/tests/submit/answers/', async_views.submit_test_answers, name='submit-test-answers-async'),
+    path('api/async/students/dashboard/', async_views.student_dashboard, name='student-dashboard-async'),
+    path('export/<slug:name>.<slug:file_format>', ExportView.as_view(), name='export'),
     path('api/test-submission-log/', TestSubmissionLogAPIView.as_view(), name='test-submission-log'),
 
+    path('leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
+    path('leaderboard/group/<int:pk>/', GroupLeaderboardView.as_view(), name='leaderboard-group'),
+    path('leaderboard/course/<int:pk>/', CourseLeaderboardView.as_view(), name='leaderboard-course'),
+
 
 ]
@@ -3,6 +3,13 @@ from .models import Group as CustomGroup
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import *
 from django.contrib.auth.models import Group
+from django import forms
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .points import InsufficientPoints, add_points
+from .student_import import ImportFormatError, import_status, start_import
 
 try:
     admin.site.unregister(Group)
@@ -16,6 +23,9 @@ class GroupAdmin(admin.ModelAdmin):
     list_filter = ('active',)
     ordering = ('-name',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('mentors', 'courses')
+
     def get_mentors(self, obj):
         return ", ".join([mentor.name for mentor in obj.mentors.all()])
     get_mentors.short_description = 'Mentors'
@@ -56,6 +66,10 @@ class MentorAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'point_limit', 'get_courses', 'birthday')
     search_fields = ('name', 'user__username')
     list_filter = ('point_limit', 'birthday')
+    list_select_related = ('user',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('course')
 
     def get_courses(self, obj):
         return ", ".join([course.name for course in obj.course.all()])
@@ -63,16 +77,79 @@ class MentorAdmin(admin.ModelAdmin):
 
 admin.site.register(Mentor, MentorAdmin)
 
+class StudentImportForm(forms.Form):
+    file = forms.FileField(label='CSV / XLSX fayl')
+
+
+class StudentAdminForm(forms.ModelForm):
+    points_adjustment = forms.IntegerField(
+        required=False, label="Ballni o'zgartirish",
+        help_text="Musbat - qo'shish, manfiy - ayirish. Ball jurnaliga yoziladi va reyting yangilanadi.")
+    points_description = forms.CharField(required=False, label='Izoh')
+
+    class Meta:
+        model = Student
+        fields = '__all__'
+
+    def clean_points_adjustment(self):
+        amount = self.cleaned_data.get('points_adjustment') or 0
+        if amount < 0 and -amount > (self.instance.points if self.instance.pk else 0):
+            raise forms.ValidationError("Talabada buncha ball yo'q.")
+        return amount
+
+
 class StudentAdmin(admin.ModelAdmin):
+    form = StudentAdminForm
+    readonly_fields = ('points',)
     list_display = ('name', 'birth_date', 'points', 'group', 'get_mentor', 'created_at')
     search_fields = ('name', 'user__username', 'group__name')
     list_filter = ('group__name', 'created_at', )
     ordering = ('-created_at',)
+    list_select_related = ('group',)
+    # 20k qatorda to'liq COUNT(*) har sahifada qayta hisoblanmasin
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('group__mentors')
 
     def get_mentor(self, obj):
         return ", ".join([mentor.name for mentor in obj.group.mentors.all()])
     get_mentor.short_description = 'Mentors'
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        amount = form.cleaned_data.get('points_adjustment')
+        if not amount:
+            return
+        try:
+            add_points(obj.pk, amount, 'mentor', form.cleaned_data.get('points_description') or "Admin tomonidan tuzatish")
+        except InsufficientPoints:
+            self.message_user(request, "Ball o'zgartirilmadi: talabada buncha ball yo'q.", level='error')
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='main_student_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = StudentImportForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                job_id = start_import(upload, upload.name)
+            except ImportFormatError as e:
+                form.add_error('file', str(e))
+            else:
+                return redirect(f'{request.path}?job={job_id}')
+        # Import fon oqimida ketadi; sahifa holatni keshdan o'qiydi
+        job_id = request.GET.get('job')
+        job = import_status(job_id) if job_id else None
+        context = {**self.admin_site.each_context(request), 'title': 'Import Talabalar', 'form': form, 'job': job,
+                   'job_id': job_id, 'opts': self.model._meta}
+        return TemplateResponse(request, 'admin/main/student/import.html', context)
+
 admin.site.register(Student, StudentAdmin)
 
 
@@ -95,10 +172,12 @@ class TestAdmin(admin.ModelAdmin):
     search_fields = ('title', 'created_by__name')
     list_filter = ('created_at',)
     ordering = ('-created_at',)
+    list_select_related = ('created_by',)
     inlines = [QuestionInline]
 
 
 from django.contrib.admin import SimpleListFilter
+from django.db.models import Count
 
 class AnswerCountFilter(SimpleListFilter):
     title = 'Answer count'
@@ -111,29 +190,36 @@ class AnswerCountFilter(SimpleListFilter):
         )
 
     def queryset(self, request, queryset):
+        # QuestionAdmin.get_queryset option_count'ni annotate qiladi
         if self.value() == 'lt4':
-            return [q for q in queryset if q.answeroption_set.count() < 4]
+            return queryset.filter(option_count__lt=4)
         if self.value() == 'eq4':
-            return [q for q in queryset if q.answeroption_set.count() == 4]
+            return queryset.filter(option_count=4)
         return queryset
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("test", "answer_count", "text")
+    list_display = ("test", "answer_count", "attempts", "correct_count", "text")
     search_fields = ('text', 'test__title')
     list_filter = ("test__title", AnswerCountFilter)
     ordering = ('test',)
+    list_select_related = ('test',)
     inlines = [AnswerOptionInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(option_count=Count('options'))
+
     def answer_count(self, obj):
-        return obj.options.count()
+        return obj.option_count
     answer_count.short_description = "Answers"
+    answer_count.admin_order_field = 'option_count'
 
 class AnswerOptionAdmin(admin.ModelAdmin):
-    list_display = ('label', 'text', 'is_correct', 'question')
+    list_display = ('label', 'text', 'is_correct', 'selected_count', 'question')
     search_fields = ('text', 'question__text')
     list_filter = ('is_correct', 'question__test__title')
     ordering = ('label',)
+    list_select_related = ('question',)
 
 admin.site.register(AnswerOption, AnswerOptionAdmin)
 
@@ -143,6 +229,7 @@ class StudentTestResultAdmin(admin.ModelAdmin):
     search_fields = ('student__name', 'test__title')
     list_filter = ('test__created_at',)
     ordering = ('-taken_at',)
+    list_select_related = ('student', 'test')
 
 
 admin.site.register(StudentTestResult, StudentTestResultAdmin)
@@ -152,6 +239,7 @@ class GivePointAdmin(admin.ModelAdmin):
     search_fields = ('student__name', 'mentor__name')
     list_filter = ('point_type', 'created_at')
     ordering = ('-created_at',)
+    list_select_related = ('student', 'mentor')
 
 
 admin.site.register(GivePoint, GivePointAdmin)
@@ -162,5 +250,31 @@ class AchievementAdmin(admin.ModelAdmin):
     ordering = ('-amount',)
 
 admin.site.register(Achievement, AchievementAdmin)
-admin.site.register(TestSubmissionLog)
+class TestSubmissionLogAdmin(admin.ModelAdmin):
+    list_display = ('student', 'test', 'correct_answers', 'submitted_at')
+    search_fields = ('student__name', 'test__title')
+    ordering = ('-submitted_at',)
+    list_select_related = ('student', 'test')
+
+admin.site.register(TestSubmissionLog, TestSubmissionLogAdmin)
+
+
+class PointEventAdmin(admin.ModelAdmin):
+    list_display = ('student', 'amount', 'point_type', 'description', 'created_at')
+    search_fields = ('student__name', 'description')
+    list_filter = ('point_type', 'created_at')
+    ordering = ('-created_at',)
+    list_select_related = ('student',)
+    show_full_result_count = False
+
+admin.site.register(PointEvent, PointEventAdmin)
+
+class AchievementPurchaseAdmin(admin.ModelAdmin):
+    list_display = ('student', 'achievement', 'price', 'created_at')
+    search_fields = ('student__name', 'achievement__name')
+    list_filter = ('achievement', 'created_at')
+    ordering = ('-created_at',)
+    list_select_related = ('student', 'achievement')
+    show_full_result_count = False
 
+admin.site.register(AchievementPurchase, AchievementPurchaseAdmin)
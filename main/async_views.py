@@ -0,0 +1,135 @@
+"""
+ASGI (``core.asgi``) ostida ishlaydigan async endpoint'lar.
+
+DRF ``APIView`` sinxron, shuning uchun bu yerdagi view'lar oddiy Django async funksiyalari.
+Django'ning async ORM'i so'rovlarni ``sync_to_async(thread_sensitive=True)`` orqali bitta oqimda
+ketma-ket bajaradi, shuning uchun so'rovlar ham ketma-ket yoziladi: foyda so'rovlarning parallelligida
+emas, kutish paytida event loop boshqa so'rovlarga xizmat qilishida. Tranzaksiya talab qiladigan
+yozish qismi ``sync_to_async`` ichida bajariladi.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import leaderboard, test_sessions
+from .authentication import RoleClaimsJWTAuthentication, get_claims, get_student_id
+from .grading import AnswerKey, submit_answers
+from .models import PointEvent, Student, StudentTestResult
+from .serializers import StudentTestResultSerializer, SubmitTestPayloadSerializer
+
+RECENT_RESULTS = 5
+RECENT_POINTS = 10
+
+
+async def _authenticate(request):
+    """
+    Token claim'lari bo'lsa foydalanuvchi holati keshdan tekshiriladi (keshda bo'lmasa bazadan);
+    eski tokenlar uchun foydalanuvchi bazadan o'qiladi.
+    """
+    auth = RoleClaimsJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    token = auth.get_validated_token(raw_token)
+    return await sync_to_async(auth.get_user)(token)
+
+
+async def _student_id(request):
+    """``(student_id, None)`` yoki ``(None, xato javobi)``."""
+    try:
+        user = await _authenticate(request)
+    except AuthenticationFailed as exc:
+        return None, JsonResponse({'detail': str(exc.detail)}, status=401)
+    if user is None:
+        return None, JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    claims = get_claims(user)
+    student_id = claims['student_id'] if claims is not None else await sync_to_async(get_student_id)(user)
+    if student_id is None:
+        return None, JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+    return student_id, None
+
+
+async def _list(queryset):
+    return [row async for row in queryset]
+
+
+@csrf_exempt
+@require_POST
+async def submit_test_answers(request):
+    """``SubmitTestAnswersAPIView`` ning async varianti (imtihon oxiridagi bir vaqtdagi yuborishlar uchun)."""
+    student_id, error = await _student_id(request)
+    if error is not None:
+        return error
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'detail': 'JSON parse error.'}, status=400)
+    payload = SubmitTestPayloadSerializer(data=data)
+    if not payload.is_valid():
+        return JsonResponse(payload.errors, status=400)
+    test_id = payload.validated_data['test_id']
+    answers = payload.validated_data['answers']
+    if not answers:
+        return JsonResponse({'answers': ['You must provide at least one answer.']}, status=400)
+
+    key = await AnswerKey.aload(test_id)
+    if key is None:
+        return JsonResponse({'test_id': ['Test not found.']}, status=400)
+    if await test_sessions.ablocks_direct_submit(student_id, test_id):
+        return JsonResponse({'test_id': [test_sessions.DIRECT_SUBMIT_BLOCKED]}, status=400)
+    if await StudentTestResult.objects.filter(student_id=student_id, test_id=test_id).aexists():
+        return JsonResponse(['You have already submitted this test.'], status=400, safe=False)
+    student = await Student.objects.only('id', 'name').filter(pk=student_id).afirst()
+
+    try:
+        key.validate(answers)
+        result = await sync_to_async(submit_answers)(student, key, answers)
+    except serializers.ValidationError as exc:
+        return JsonResponse(exc.detail, status=400, safe=False)
+
+    # student va test allaqachon yuklangan, serializer bazaga murojaat qilmaydi
+    return JsonResponse(StudentTestResultSerializer(result).data, status=201)
+
+
+@require_GET
+async def student_dashboard(request):
+    """Profil, ball, reytingdagi o'rin, oxirgi natijalar va ball hodisalari."""
+    student_id, error = await _student_id(request)
+    if error is not None:
+        return error
+
+    student = await Student.objects.filter(pk=student_id).values('id', 'name', 'points', 'group_id', 'image').afirst()
+    if student is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    results = await _list(
+        StudentTestResult.objects.filter(student_id=student_id).order_by('-taken_at')
+        .values('id', 'test_id', 'test__title', 'score', 'taken_at')[:RECENT_RESULTS]
+    )
+    events = await _list(
+        PointEvent.objects.filter(student_id=student_id)
+        .values('amount', 'point_type', 'description', 'created_at')[:RECENT_POINTS]
+    )
+    # Ikkala o'rin bitta so'rovda
+    scopes = [leaderboard.GLOBAL_SCOPE, leaderboard.group_scope(student['group_id'])]
+    ranks = await sync_to_async(leaderboard.ranks_of)(scopes, student['points'])
+    global_rank, group_rank = ranks[scopes[0]], ranks[scopes[1]]
+    image = student.pop('image')
+    student['image'] = request.build_absolute_uri(Student._meta.get_field('image').storage.url(image)) if image else None
+
+    return JsonResponse({
+        'student': student,
+        'rank': {'global': global_rank, 'group': group_rank},
+        'recent_results': [
+            {'id': row['id'], 'test': row['test_id'], 'test_title': row['test__title'], 'score': row['score'], 'taken_at': row['taken_at']}
+            for row in results
+        ],
+        'recent_points': events,
+    })
@@ -0,0 +1,130 @@
+import time
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Group, Mentor, Student, User
+
+ROLE_CLAIMS = ('role', 'is_superuser', 'student_id', 'mentor_id', 'group_ids')
+# is_active shu muddatdan ortiq keshda turmaydi (signal chetlab o'tilgan update() uchun ham)
+ACTIVE_STATE_TIMEOUT = 5 * 60
+
+
+def build_role_claims(user):
+    """Token ichiga yoziladigan rol va identifikatorlar (token berilganda bir marta hisoblanadi)."""
+    claims = {
+        'role': user.role,
+        'is_superuser': user.is_superuser,
+        'student_id': None,
+        'mentor_id': None,
+        'group_ids': [],
+    }
+
+    student = Student.objects.filter(user=user).values('id', 'group_id').first()
+    if student is not None:
+        claims['student_id'] = student['id']
+        claims['group_ids'] = [student['group_id']]
+
+    mentor_id = Mentor.objects.filter(user=user).values_list('id', flat=True).first()
+    if mentor_id is not None:
+        claims['mentor_id'] = mentor_id
+        claims['group_ids'] = list(Group.objects.filter(mentors=mentor_id).values_list('id', flat=True))
+
+    return claims
+
+
+def add_role_claims(token, user):
+    for name, value in build_role_claims(user).items():
+        token[name] = value
+    # Token hozirgina bazadagi foydalanuvchi uchun berildi: birinchi so'rov holatni qayta o'qimasin
+    cache.set(_active_key(user.pk), user.is_active, ACTIVE_STATE_TIMEOUT)
+    return token
+
+
+def get_claims(user):
+    """Token'dan olingan rol ma'lumotlari yoki ``None`` (sessiya yoki eski token bilan kirilganda)."""
+    return getattr(user, 'token_claims', None)
+
+
+def get_student_id(user):
+    claims = get_claims(user)
+    if claims is not None:
+        return claims['student_id']
+    return Student.objects.filter(user=user).values_list('id', flat=True).first()
+
+
+def _active_key(user_id):
+    return f'auth-active:{user_id}'
+
+
+def _not_before_key(user_id):
+    return f'auth-not-before:{user_id}'
+
+
+def revoke_tokens(user_id):
+    """
+    Foydalanuvchining hozirgacha berilgan access tokenlarini bekor qiladi: client refresh
+    qilib yangi claim'lar oladi. Darhol va commit'dan keyin yana yoziladi, aks holda commit'dan
+    oldin refresh qilingan token eski claim'lar bilan o'tib ketadi.
+    """
+    if user_id is None:
+        return
+    lifetime = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+    def revoke():
+        cache.set(_not_before_key(user_id), int(time.time()), lifetime)
+        cache.delete(_active_key(user_id))
+
+    revoke()
+    transaction.on_commit(revoke)
+
+
+def check_token_state(validated_token):
+    """
+    Claim'li tokenlar uchun simplejwt'ning user-exists/is_active tekshiruvi o'rnida: holat
+    keshdan o'qiladi, bazaga har foydalanuvchi uchun ``ACTIVE_STATE_TIMEOUT`` da bir marta boriladi.
+    """
+    user_id = validated_token[api_settings.USER_ID_CLAIM]
+    state = cache.get_many([_active_key(user_id), _not_before_key(user_id)])
+
+    active = state.get(_active_key(user_id))
+    if active is None:
+        active = User.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(_active_key(user_id), active, ACTIVE_STATE_TIMEOUT)
+    if not active:
+        raise AuthenticationFailed("User is inactive or deleted", code='user_inactive')
+
+    not_before = state.get(_not_before_key(user_id))
+    if not_before is not None and validated_token.get('iat', 0) < not_before:
+        raise AuthenticationFailed("Token is outdated, refresh it", code='token_revoked')
+
+
+class RoleClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Token ichidagi rol claim'laridan foydalanuvchini bazaga murojaat qilmasdan tiklaydi.
+
+    Qaytariladigan ``User`` faqat ``id``, ``role`` va ``is_superuser`` bilan yuklangan;
+    qolgan maydonlar deferred, ya'ni view ularga haqiqatan murojaat qilgandagina o'qiladi.
+    Faollik va bekor qilish ``check_token_state`` bilan tekshiriladi; claim'lar eskirishi
+    qisqa access token muddati va ``revoke_tokens`` bilan chegaralangan.
+    Claim'lari bo'lmagan eski tokenlar odatdagidek bazadan tekshiriladi.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        check_token_state(validated_token)
+
+        loaded = {
+            'id': validated_token[api_settings.USER_ID_CLAIM],
+            'is_superuser': validated_token['is_superuser'],
+            'role': validated_token['role'],
+        }
+        # from_db qiymatlarni modeldagi maydonlar tartibida kutadi
+        field_names = [field.attname for field in User._meta.concrete_fields if field.attname in loaded]
+        user = User.from_db(DEFAULT_DB_ALIAS, field_names, [loaded[name] for name in field_names])
+        user.token_claims = {name: validated_token.get(name) for name in ROLE_CLAIMS}
+        return user
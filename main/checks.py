@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SESSION_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Dashboard umumiy qismlari, test qog'ozi, ETag versiyalari, token holati va sessiya buferi
+    keshdagi versiya/kalitlarga tayanadi: kesh har process'da alohida bo'lsa bir worker'dagi
+    yozuv boshqalarida ko'rinmaydi.
+    """
+    errors = []
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if backend in PROCESS_LOCAL_BACKENDS:
+        errors.append(Warning(
+            f"CACHES['default'] uses {backend.rsplit('.', 1)[-1]}, which is not shared between worker processes.",
+            hint="Set REDIS_URL or use a file/database cache so invalidations reach every worker.",
+            id='main.W001',
+        ))
+
+    # Avtosaqlash buferi har javobda yoziladi va cull'da yo'qolmasligi kerak: faqat Redis yoki DB jadvali
+    alias = settings.TEST_SESSION_CACHE
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in SESSION_BACKENDS:
+        errors.append(Error(
+            f"CACHES['{alias}'] uses {str(backend).rsplit('.', 1)[-1]}; test session answers need Redis or a database cache.",
+            hint="Set REDIS_URL, or use django.core.cache.backends.db.DatabaseCache and run createcachetable.",
+            id='main.E001',
+        ))
+    return errors
@@ -0,0 +1,115 @@
+"""
+Talaba ilovasi uchun bitta so'rovli dashboard: profil, ball, reytingdagi o'rin, mavjud va
+tugallanmagan testlar, oxirgi natijalar va ball yetadigan yutuqlar.
+
+Talabaga tegishli qismlar to'rtta so'rov bilan yig'iladi (profil, natijalar, ochiq sessiyalar,
+reyting). Ko'p talabalar uchun bir xil bo'lgan qismlar - guruh testlari va yutuqlar ro'yxati -
+``main.versions`` tokenlari bilan versiyalangan keshda turadi; kesh barcha worker'lar uchun
+umumiy bo'lishi kerak, aks holda bir process'dagi invalidatsiya boshqalariga yetmaydi
+(``main.checks`` ogohlantiradi).
+"""
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from . import leaderboard, versions
+from .models import Achievement, Question, Student, StudentTestResult, Test, TestSession
+
+SHARED_TIMEOUT = 60 * 60
+RECENT_RESULTS = 5
+
+
+def group_tests(group_id):
+    """Guruhga berilgan testlar (savollar soni bilan); guruhdagi barcha talabalar uchun umumiy."""
+    key = f'dashboard:tests:{group_id}:' + ':'.join(versions.get_tokens([Test, Test.groups.through, Question]))
+    tests = cache.get(key)
+    if tests is None:
+        tests = list(
+            Test.objects.filter(groups=group_id).annotate(question_count=Count('questions'))
+            .order_by('-created_at', '-id').values('id', 'title', 'duration_minutes', 'question_count')
+        )
+        cache.set(key, tests, SHARED_TIMEOUT)
+    return tests
+
+
+def achievements():
+    """Zaxirada bor yutuqlar narx bo'yicha; hamma talabalar uchun umumiy."""
+    key = 'dashboard:achievements:' + versions.get_tokens([Achievement])[0]
+    items = cache.get(key)
+    if items is None:
+        items = list(
+            Achievement.objects.filter(amount__gt=0).order_by('point_price', 'id')
+            .values('id', 'name', 'image', 'amount', 'point_price')
+        )
+        cache.set(key, items, SHARED_TIMEOUT)
+    return items
+
+
+def _image_url(request, model, name):
+    if not name:
+        return None
+    return request.build_absolute_uri(model._meta.get_field('image').storage.url(name))
+
+
+def build(student_id, request):
+    """Dashboard ma'lumotlari yoki talaba topilmasa ``None``."""
+    student = (
+        Student.objects.filter(pk=student_id)
+        .values('id', 'name', 'birth_date', 'bio', 'image', 'points', 'group_id', 'group__name')
+        .first()
+    )
+    if student is None:
+        return None
+    points = student['points']
+
+    results = list(
+        StudentTestResult.objects.filter(student_id=student_id).order_by('-taken_at')
+        .values('id', 'test_id', 'test__title', 'score', 'taken_at')
+    )
+    sessions = {
+        row['test_id']: row
+        for row in TestSession.objects.filter(student_id=student_id, submitted_at__isnull=True).values('id', 'test_id', 'deadline')
+    }
+    scopes = [leaderboard.GLOBAL_SCOPE, leaderboard.group_scope(student['group_id'])]
+    ranks = leaderboard.ranks_of(scopes, points)
+
+    now = timezone.now()
+    finished = {row['test_id'] for row in results}
+    available, unfinished = [], []
+    for test in group_tests(student['group_id']):
+        if test['id'] in finished:
+            continue
+        session = sessions.get(test['id'])
+        if session is None:
+            available.append(test)
+        else:
+            unfinished.append({
+                **test,
+                'session': session['id'],
+                'deadline': session['deadline'],
+                'remaining_seconds': max(int((session['deadline'] - now).total_seconds()), 0),
+            })
+
+    return {
+        'student': {
+            'id': student['id'],
+            'name': student['name'],
+            'birth_date': student['birth_date'],
+            'bio': student['bio'],
+            'image': _image_url(request, Student, student['image']),
+            'group': {'id': student['group_id'], 'name': student['group__name']},
+        },
+        'points': points,
+        'rank': {'global': ranks[scopes[0]], 'group': ranks[scopes[1]]},
+        'available_tests': available,
+        'unfinished_tests': unfinished,
+        'recent_results': [
+            {'id': row['id'], 'test': row['test_id'], 'test_title': row['test__title'], 'score': row['score'], 'taken_at': row['taken_at']}
+            for row in results[:RECENT_RESULTS]
+        ],
+        'affordable_achievements': [
+            {**item, 'image': _image_url(request, Achievement, item['image'])}
+            for item in achievements() if item['point_price'] <= points
+        ],
+        'server_time': now,
+    }
@@ -0,0 +1,103 @@
+"""
+Natijalar, ball hodisalari va yuborish jurnalini CSV/XLSX ko'rinishida eksport qilish.
+
+Qatorlar ``values()`` bilan kerakli ustunlarga (JOIN'lar bilan) proyeksiya qilinadi va
+``iterator(chunk_size=...)`` bilan o'qiladi (PostgreSQL'da server-side cursor), shuning uchun
+xotira sarfi eksport hajmiga bog'liq emas.
+"""
+import csv
+import datetime
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .models import PointEvent, StudentTestResult, TestSubmissionLog
+
+CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# nom -> (model, [(sarlavha, values() maydoni)], {so'rov parametri: filtr})
+EXPORTS = {
+    'results': (
+        StudentTestResult,
+        [('id', 'id'), ('student_id', 'student_id'), ('student', 'student__name'), ('group', 'student__group__name'),
+         ('test_id', 'test_id'), ('test', 'test__title'), ('score', 'score'), ('taken_at', 'taken_at')],
+        {'student': 'student_id', 'test': 'test_id', 'group': 'student__group_id'},
+    ),
+    'point-events': (
+        PointEvent,
+        [('id', 'id'), ('student_id', 'student_id'), ('student', 'student__name'), ('group', 'student__group__name'),
+         ('amount', 'amount'), ('point_type', 'point_type'), ('description', 'description'), ('created_at', 'created_at')],
+        {'student': 'student_id', 'group': 'student__group_id'},
+    ),
+    'submission-logs': (
+        TestSubmissionLog,
+        [('id', 'id'), ('student_id', 'student_id'), ('student', 'student__name'), ('group', 'student__group__name'),
+         ('test_id', 'test_id'), ('test', 'test__title'), ('correct_answers', 'correct_answers'), ('submitted_at', 'submitted_at')],
+        {'student': 'student_id', 'test': 'test_id', 'group': 'student__group_id'},
+    ),
+}
+
+
+class _Echo:
+    """csv.writer uchun fayl o'rnida: yozilgan qatorni o'zini qaytaradi."""
+
+    def write(self, value):
+        return value
+
+
+def _localize(value):
+    if isinstance(value, datetime.datetime):
+        # XLSX timezone'li vaqtni qabul qilmaydi; ikkala formatda ham mahalliy vaqt
+        return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+    return value
+
+
+def export_rows(name, params, group_ids=None):
+    """
+    ``(sarlavhalar, qatorlar iteratori)``. ``group_ids`` berilsa faqat shu guruhlar talabalari
+    (mentor uchun); ``params`` dagi ``student``/``test``/``group`` filtr sifatida qo'llanadi.
+    """
+    model, columns, filters = EXPORTS[name]
+    queryset = model.objects.all()
+    if group_ids is not None:
+        queryset = queryset.filter(student__group_id__in=group_ids)
+    for param, lookup in filters.items():
+        value = params.get(param)
+        if value and value.isdigit():
+            queryset = queryset.filter(**{lookup: value})
+
+    fields = [field for _, field in columns]
+    rows = queryset.order_by('id').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    return [header for header, _ in columns], (tuple(_localize(value) for value in row) for row in rows)
+
+
+def csv_response(filename, headers, rows):
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield '\ufeff'  # Excel UTF-8 ni to'g'ri ochishi uchun BOM
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def xlsx_response(filename, headers, rows):
+    """XLSX zip arxiv bo'lgani uchun write-only rejimda vaqtinchalik faylga yoziladi va fayldan uzatiladi."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(filename)
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f'{filename}.xlsx', content_type=XLSX_CONTENT_TYPE)
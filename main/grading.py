@@ -0,0 +1,109 @@
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .item_stats import record_answers
+from .models import AnswerOption, StudentAnswer, StudentTestResult, Test
+from .points import add_points
+
+POINTS_PER_CORRECT_ANSWER = 5
+
+
+class AnswerKey:
+    """Testning barcha variantlari bitta so'rovda yuklangan javoblar kaliti."""
+
+    def __init__(self, test, options):
+        self.test = test
+        # option_id -> (question_id, is_correct)
+        self.options = {option_id: (question_id, is_correct) for option_id, question_id, is_correct in options}
+        self.question_ids = {question_id for question_id, _ in self.options.values()}
+
+    @classmethod
+    def load(cls, test_id):
+        test = Test.objects.filter(id=test_id).only('id', 'title').first()
+        if test is None:
+            return None
+        options = AnswerOption.objects.filter(question__test_id=test_id).values_list('id', 'question_id', 'is_correct')
+        return cls(test, options)
+
+    @classmethod
+    def from_paper(cls, paper):
+        """``test_paper.get_paper(..., with_answers=True)`` keshidan, bazaga murojaatsiz."""
+        test = Test(id=paper['id'], title=paper['title'])
+        options = [
+            (option['id'], question['id'], option['is_correct'])
+            for question in paper['questions'] for option in question['options']
+        ]
+        return cls(test, options)
+
+    @classmethod
+    async def aload(cls, test_id):
+        """``load`` ning async varianti (so'rovlar event loop'ni bloklamaydi, lekin ketma-ket)."""
+        test = await Test.objects.filter(id=test_id).only('id', 'title').afirst()
+        if test is None:
+            return None
+        options = AnswerOption.objects.filter(question__test_id=test_id).values_list('id', 'question_id', 'is_correct')
+        return cls(test, await _alist(options))
+
+    def validate(self, answers):
+        seen = set()
+        for answer in answers:
+            question_id = answer['question_id']
+            option_id = answer['answer_option_id']
+
+            if question_id not in self.question_ids:
+                raise serializers.ValidationError(
+                    {"question_id": f"Question {question_id} not found in this test."})
+
+            if question_id in seen:
+                raise serializers.ValidationError(
+                    {"question_id": f"Question {question_id} answered more than once."})
+            seen.add(question_id)
+
+            option = self.options.get(option_id)
+            if option is None or option[0] != question_id:
+                raise serializers.ValidationError({
+                    "answer_option_id": f"Answer option {option_id} does not belong to question {question_id}."})
+
+    def grade(self, answers):
+        """(question_id, answer_option_id, is_correct) ro'yxatini qaytaradi."""
+        return [
+            (answer['question_id'], answer['answer_option_id'], self.options[answer['answer_option_id']][1])
+            for answer in answers
+        ]
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+def submit_answers(student, key, answers):
+    """
+    Javoblarni baholaydi va bitta tranzaksiyada saqlaydi.
+
+    Test uzunligidan qat'i nazar so'rovlar soni o'zgarmaydi: natija, barcha javoblar
+    (bulk_create) va talabaning bali bir martada yoziladi.
+    """
+    graded = key.grade(answers)
+    correct_count = sum(1 for _, _, is_correct in graded if is_correct)
+    score = correct_count * POINTS_PER_CORRECT_ANSWER
+
+    try:
+        with transaction.atomic():
+            result = StudentTestResult.objects.create(student=student, test=key.test, score=score)
+            StudentAnswer.objects.bulk_create([
+                StudentAnswer(result=result, question_id=question_id, answer_option_id=option_id, is_correct=is_correct)
+                for question_id, option_id, is_correct in graded
+            ])
+            record_answers(graded)
+
+            add_points(
+                student.pk,
+                score,
+                point_type='test',
+                description=f"Testdan ball: {key.test.title}",
+                created_at=result.taken_at,
+            )
+    except IntegrityError:
+        raise serializers.ValidationError("You have already submitted this test.")
+
+    return result
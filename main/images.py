@@ -0,0 +1,133 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Nomi -> eng katta tomoni (px)
+SIZES = {
+    'thumb': 128,
+    'medium': 512,
+}
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='image-derivatives')
+
+
+def derivative_name(name, size, fmt):
+    """``images/a.jpg`` -> ``images/a.thumb.webp`` (fmt='webp') yoki ``images/a.thumb.jpg`` (fmt='original')."""
+    stem, ext = os.path.splitext(name)
+    if fmt == 'webp':
+        ext = '.webp'
+    return f'{stem}.{size}{ext}'
+
+
+def is_derivative(name):
+    stem = os.path.splitext(name)[0]
+    return os.path.splitext(stem)[1][1:] in SIZES
+
+
+def _save(image, path, ext):
+    if ext == '.webp':
+        image.save(path, 'WEBP', quality=WEBP_QUALITY, method=4)
+    elif ext in ('.jpg', '.jpeg'):
+        image.convert('RGB').save(path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        image.save(path)
+
+
+def make_derivatives(path, force=False):
+    """
+    Fayl yonida o'lcham variantlari va ularning WebP nusxalarini yaratadi.
+
+    Faqat fayl yo'li bilan ishlaydi, shuning uchun process pool ichida ham chaqirish mumkin.
+    Yaratilgan fayllar sonini qaytaradi.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SOURCE_EXTENSIONS or is_derivative(path):
+        return 0
+
+    mtime = os.path.getmtime(path)
+    targets = list(dict.fromkeys(
+        (size, derivative_name(path, size, fmt))
+        for size in SIZES
+        for fmt in ('original', 'webp')
+    ))
+    if not force:
+        targets = [(size, target) for size, target in targets
+                   if not os.path.exists(target) or os.path.getmtime(target) < mtime]
+    if not targets:
+        return 0
+
+    with Image.open(path) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'RGBA'):
+            source = source.convert('RGBA' if 'A' in source.getbands() or 'transparency' in source.info else 'RGB')
+
+        for size, target in targets:
+            image = source.copy()
+            image.thumbnail((SIZES[size], SIZES[size]), Image.Resampling.LANCZOS)
+            _save(image, target, os.path.splitext(target)[1].lower())
+    return len(targets)
+
+
+def _generate(path, on_done=None):
+    try:
+        make_derivatives(path)
+    except Exception:
+        logger.exception("Image derivatives failed for %s", path)
+        return
+    if on_done is not None:
+        on_done()
+
+
+def _generate_in_thread(path, on_done=None):
+    try:
+        _generate(path, on_done)
+    finally:
+        # Fon oqimining DB ulanishi ochiq qolmasin
+        connection.close()
+
+
+def schedule_derivatives(field_file, on_done=None):
+    """
+    Tranzaksiya yakunlangach variantlarni fon oqimida yaratadi (so'rov javobini kutdirmaydi).
+    Variantlar tayyor bo'lgach (oldindan bor bo'lsa ham) ``on_done()`` chaqiriladi: u modeldagi
+    ``image_variants_of`` belgisini yozadi.
+    """
+    if not field_file:
+        return
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        return
+    transaction.on_commit(lambda: _executor.submit(_generate_in_thread, path, on_done))
+
+
+def variant_urls(field_file, request=None):
+    """
+    ``{'thumb': {'original': url, 'webp': url}, ...}`` yoki variantlar hali tayyor bo'lmasa ``None``.
+
+    Tayyorlik modeldagi ``image_variants_of`` dan olinadi, storage'ga so'rov yuborilmaydi.
+    """
+    if not field_file:
+        return None
+    name = field_file.name
+    if getattr(field_file.instance, 'image_variants_of', None) != name:
+        return None
+    storage = getattr(field_file, 'storage', default_storage)
+
+    def url(value):
+        value = storage.url(value)
+        return request.build_absolute_uri(value) if request is not None else value
+
+    return {
+        size: {fmt: url(derivative_name(name, size, fmt)) for fmt in ('original', 'webp')}
+        for size in SIZES
+    }
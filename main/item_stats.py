@@ -0,0 +1,97 @@
+"""
+Savollar tahlili (item analysis): urinishlar, to'g'ri javob ulushi va variantlar tanlanishi.
+
+Hisoblagichlar ``Question.attempts``/``correct_count`` va ``AnswerOption.selected_count``
+ustunlarida turadi va javoblar saqlangan tranzaksiya commit bo'lgach oshiriladi, shuning uchun
+statistika ``StudentAnswer`` jadvalini skanerlamasdan savollar soniga proporsional vaqtda o'qiladi.
+Natija o'chirilganda hisoblagichlar kamaymaydi; ``rebuild_item_stats`` ularni tarixdan tiklaydi.
+"""
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import AnswerOption, Question, StudentAnswer
+
+# Shundan kam urinishda baho (juda qiyin/oson, shubhali kalit) berilmaydi
+MIN_ATTEMPTS = 10
+HARD_RATE = 0.3
+EASY_RATE = 0.95
+
+
+def record_answers(graded):
+    """
+    ``(question_id, answer_option_id, is_correct)`` ro'yxati uchun hisoblagichlarni commit'dan keyin oshiradi.
+
+    Savol qatorlari testni topshirayotgan hamma talabalar uchun umumiy: ularni baholash
+    tranzaksiyasi ichida yangilash parallel topshiriqlarni commit'gacha navbatga qo'yardi.
+    Tranzaksiya bekor bo'lsa hisoblagichlar o'zgarmaydi; xato log'ga yoziladi va
+    ``rebuild_item_stats`` bilan tiklanadi.
+    """
+    if graded:
+        transaction.on_commit(lambda: _increment(graded), robust=True)
+
+
+def _increment(graded):
+    """Alohida qisqa tranzaksiyada 2 ta UPDATE."""
+    question_ids = [question_id for question_id, _, _ in graded]
+    correct_ids = [question_id for question_id, _, is_correct in graded if is_correct]
+
+    with transaction.atomic():
+        Question.objects.filter(pk__in=question_ids).update(
+            attempts=F('attempts') + 1,
+            correct_count=F('correct_count') + Case(When(pk__in=correct_ids, then=Value(1)), default=Value(0)),
+        )
+        AnswerOption.objects.filter(pk__in=[option_id for _, option_id, _ in graded]).update(
+            selected_count=F('selected_count') + 1,
+        )
+
+
+def test_stats(test_id):
+    """Test savollari bo'yicha statistika: ikki so'rov, javoblar jadvaliga murojaatsiz."""
+    questions = {
+        row['id']: {**row, 'correct_rate': None, 'options': [], 'flags': []}
+        for row in Question.objects.filter(test_id=test_id).order_by('id').values('id', 'text', 'attempts', 'correct_count')
+    }
+    options = (
+        AnswerOption.objects.filter(question__test_id=test_id).order_by('question_id', 'label', 'id')
+        .values('id', 'question_id', 'label', 'text', 'is_correct', 'selected_count')
+    )
+    for option in options:
+        question = questions[option.pop('question_id')]
+        attempts = question['attempts']
+        option['share'] = round(option['selected_count'] / attempts, 4) if attempts else None
+        question['options'].append(option)
+
+    for question in questions.values():
+        attempts = question['attempts']
+        if not attempts:
+            continue
+        question['correct_rate'] = round(question['correct_count'] / attempts, 4)
+        if attempts < MIN_ATTEMPTS:
+            continue
+        if question['correct_rate'] < HARD_RATE:
+            question['flags'].append('too_hard')
+        if question['correct_rate'] > EASY_RATE:
+            question['flags'].append('too_easy')
+        key = max((o['selected_count'] for o in question['options'] if o['is_correct']), default=0)
+        if any(not o['is_correct'] and o['selected_count'] > key for o in question['options']):
+            question['flags'].append('suspicious_key')
+    return list(questions.values())
+
+
+def rebuild(test_id=None):
+    """Hisoblagichlarni ``StudentAnswer`` tarixidan qayta hisoblaydi (har jadval uchun bitta UPDATE)."""
+    questions = Question.objects.all()
+    options = AnswerOption.objects.all()
+    if test_id is not None:
+        questions = questions.filter(test_id=test_id)
+        options = options.filter(question__test_id=test_id)
+
+    def counted(field, **filters):
+        return Coalesce(Subquery(
+            StudentAnswer.objects.filter(**{field: OuterRef('pk')}, **filters).order_by()
+            .values(field).annotate(total=Count('id')).values('total')
+        ), 0)
+
+    questions.update(attempts=counted('question'), correct_count=counted('question', is_correct=True))
+    options.update(selected_count=counted('answer_option'))
@@ -0,0 +1,200 @@
+import threading
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Group, LeaderboardBucket, Student
+
+GLOBAL_SCOPE = 'global'
+_pending = threading.local()
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def course_scope(course_id):
+    return f'course:{course_id}'
+
+
+def scopes_for_group(group_id):
+    """Shu guruh talabasi qatnashadigan barcha reyting scope'lari."""
+    course_ids = Group.courses.through.objects.filter(group_id=group_id).values_list('course_id', flat=True)
+    return [GLOBAL_SCOPE, group_scope(group_id)] + [course_scope(course_id) for course_id in course_ids]
+
+
+def students_in_scope(scope):
+    if scope == GLOBAL_SCOPE:
+        return Student.objects.all()
+    kind, _, pk = scope.partition(':')
+    if kind == 'group':
+        return Student.objects.filter(group_id=pk)
+    if kind == 'course':
+        return Student.objects.filter(group__courses=pk)
+    raise ValueError(f"Unknown leaderboard scope: {scope}")
+
+
+def _shift(scopes, points, delta):
+    _apply_deltas({(scope, points): delta for scope in scopes})
+
+
+def scopes_for_groups(group_ids):
+    """``{group_id: scope'lar}`` bitta so'rovda."""
+    scopes = {group_id: [GLOBAL_SCOPE, group_scope(group_id)] for group_id in group_ids}
+    for group_id, course_id in Group.courses.through.objects.filter(group_id__in=scopes).values_list('group_id', 'course_id'):
+        scopes[group_id].append(course_scope(course_id))
+    return scopes
+
+
+def move(group_id, old_points, new_points):
+    """Talaba bali o'zgarganda uni eski bucket'dan yangisiga o'tkazadi (scope'lar soniga bog'liq emas)."""
+    if old_points == new_points:
+        return
+    deltas = {}
+    for scope in scopes_for_group(group_id):
+        deltas[scope, old_points] = -1
+        deltas[scope, new_points] = 1
+    _apply_deltas(deltas)
+
+
+def move_many(changes):
+    """
+    ``(group_id, eski_ball, yangi_ball)`` ro'yxati uchun ``move``. Bucket o'zgarishlari avval
+    yig'iladi, so'ng har bir farq qiymati uchun bitta UPDATE bajariladi, shuning uchun so'rovlar
+    soni talabalar soniga bog'liq emas.
+    """
+    changes = [change for change in changes if change[1] != change[2]]
+    if not changes:
+        return
+    scopes = scopes_for_groups({group_id for group_id, _, _ in changes})
+
+    deltas = {}
+    for group_id, old_points, new_points in changes:
+        for scope in scopes[group_id]:
+            deltas[scope, old_points] = deltas.get((scope, old_points), 0) - 1
+            deltas[scope, new_points] = deltas.get((scope, new_points), 0) + 1
+
+    _apply_deltas(deltas)
+
+
+def add_many(entries):
+    """``(group_id, ball)`` ro'yxatidagi yangi talabalarni bucket'larga qo'shadi."""
+    if not entries:
+        return
+    scopes = scopes_for_groups({group_id for group_id, _ in entries})
+    deltas = {}
+    for group_id, points in entries:
+        for scope in scopes[group_id]:
+            deltas[scope, points] = deltas.get((scope, points), 0) + 1
+    _apply_deltas(deltas)
+
+
+def _apply_deltas(deltas):
+    """
+    ``{(scope, ball): farq}`` ni chaqirgan tranzaksiya commit bo'lgach qo'llaydi.
+
+    Bucket qatorlari hamma ball yozuvlari uchun umumiy: ularni balans tranzaksiyasi ichida
+    yangilash barcha yozuvlarni commit'gacha navbatga qo'yardi. Commit'dan keyingi qadam
+    xato bersa log'ga yoziladi; ``rebuild_leaderboard`` bucket'larni tiklaydi.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    pending = _pending_deltas()
+    pending.append(deltas)
+
+    def flush():
+        pending[:] = [item for item in pending if item is not deltas]
+        _write_deltas(deltas)
+
+    transaction.on_commit(flush, robust=True)
+
+
+def _pending_deltas():
+    """Joriy oqim tranzaksiyasida commit'ni kutayotgan farqlar (``rebuild`` ularni tashlab yuboradi)."""
+    if not hasattr(_pending, 'items') or not transaction.get_connection().in_atomic_block:
+        _pending.items = []
+    return _pending.items
+
+
+def _write_deltas(deltas):
+    """Qisqa alohida tranzaksiya: qatorlar ``(scope, ball)`` tartibida qulflanadi, shuning uchun
+    parallel yozuvlar deadlock'ga tushmaydi; har bir farq qiymati uchun bitta UPDATE."""
+    if not deltas:
+        return
+    keys = sorted(deltas)
+    condition = Q()
+    for scope, points in keys:
+        condition |= Q(scope=scope, points=points)
+
+    with transaction.atomic():
+        LeaderboardBucket.objects.bulk_create(
+            [LeaderboardBucket(scope=scope, points=points) for scope, points in keys if deltas[scope, points] > 0],
+            ignore_conflicts=True,
+        )
+        list(LeaderboardBucket.objects.filter(condition).order_by('scope', 'points').select_for_update().values_list('id', flat=True))
+
+        by_delta = {}
+        for key in keys:
+            by_delta.setdefault(deltas[key], []).append(key)
+        for delta, group in by_delta.items():
+            matching = Q()
+            for scope, points in group:
+                matching |= Q(scope=scope, points=points)
+            LeaderboardBucket.objects.filter(matching).update(students=F('students') + delta)
+
+
+def add(group_id, points):
+    _shift(scopes_for_group(group_id), points, 1)
+
+
+def remove(group_id, points):
+    _shift(scopes_for_group(group_id), points, -1)
+
+
+def rebuild(scopes=None):
+    """Bucket'larni talabalar jadvalidan qaytadan hisoblaydi (boshlang'ich to'ldirish va tekshirish uchun)."""
+    if scopes is None:
+        scopes = [GLOBAL_SCOPE]
+        scopes += [group_scope(pk) for pk in Group.objects.values_list('id', flat=True)]
+        scopes += [course_scope(pk) for pk in Group.courses.through.objects.values_list('course_id', flat=True).distinct()]
+
+    # Tranzaksiya ichidagi o'zgarishlar quyidagi hisobga kiradi: ularning farqlari ikki marta qo'shilmasin
+    rebuilt = set(scopes)
+    for deltas in _pending_deltas():
+        for key in [key for key in deltas if key[0] in rebuilt]:
+            del deltas[key]
+
+    for scope in scopes:
+        LeaderboardBucket.objects.filter(scope=scope).delete()
+        counts = students_in_scope(scope).order_by().values('points').annotate(total=Count('id'))
+        LeaderboardBucket.objects.bulk_create(
+            [LeaderboardBucket(scope=scope, points=row['points'], students=row['total']) for row in counts],
+            batch_size=1000,
+        )
+
+
+def rank_of(scope, points):
+    """Musobaqa tartibidagi o'rin: 1 + shu scope'da balli yuqoriroq talabalar soni."""
+    above = LeaderboardBucket.objects.filter(scope=scope, points__gt=points).aggregate(total=Sum('students'))['total']
+    return (above or 0) + 1
+
+
+def ranks_of(scopes, points):
+    """``rank_of`` bir nechta scope uchun bitta so'rovda: ``{scope: o'rin}``."""
+    above = dict(
+        LeaderboardBucket.objects.filter(scope__in=scopes, points__gt=points)
+        .values('scope').annotate(total=Sum('students')).values_list('scope', 'total')
+    )
+    return {scope: (above.get(scope) or 0) + 1 for scope in scopes}
+
+
+def top(scope, limit):
+    students = list(students_in_scope(scope).order_by('-points', 'id').only('id', 'name', 'points', 'image', 'image_variants_of')[:limit])
+
+    for position, student in enumerate(students):
+        if position and students[position - 1].points == student.points:
+            student.rank = students[position - 1].rank
+        else:
+            student.rank = position + 1
+    return students
@@ -0,0 +1,170 @@
+import json
+import logging
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from main.models import User
+from main.serializers import RoleTokenObtainPairSerializer
+
+# Benchmark qilinmaydigan yo'llar: admin, swagger, token va media
+SKIP_PREFIXES = ('admin/', 'token/', 'media/', 'protected-media/')
+
+
+def iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern.callback
+
+
+def percentile(values, pct):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[pct - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "core/urls.py dagi har bir GET endpoint'ni JWT bilan kirgan talaba, mentor va admin nomidan "
+        "chaqirib p50/p95/p99, throughput va SQL so'rovlar sonini JSON faylga yozadi"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Har bir endpoint uchun so'rovlar soni")
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--roles', default='student,mentor,admin')
+        parser.add_argument('--only', default='', help="Faqat shu matnni o'z ichiga olgan yo'llar")
+        parser.add_argument('--output', default='bench_results.json')
+        parser.add_argument('--compare', help="Oldingi natijalar fayli bilan solishtirish")
+
+    def handle(self, *args, **options):
+        clients = self.make_clients(options['roles'].split(','))
+        # 403/404 javoblar har so'rovda ogohlantirish yozmasin
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+
+        results = []
+        for route, callback in iter_patterns(get_resolver().url_patterns):
+            url = self.build_url(route, callback)
+            if url is None or options['only'] not in url:
+                continue
+            for role, client in clients.items():
+                results.append(self.measure(client, url, role, options))
+                row = results[-1]
+                self.stdout.write(
+                    f"{row['status']} {role:8} {url:45} p50={row['p50_ms']:8.2f}ms p95={row['p95_ms']:8.2f}ms "
+                    f"p99={row['p99_ms']:8.2f}ms {row['rps']:8.1f} req/s {row['queries']:4} q"
+                )
+
+        with open(options['output'], 'w') as f:
+            json.dump({'settings': {k: options[k] for k in ('requests', 'warmup', 'roles')}, 'results': results},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} ta o'lchov {options['output']} ga yozildi"))
+
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def make_clients(self, roles):
+        users = {
+            'student': User.objects.filter(student__isnull=False).order_by('id').first(),
+            'mentor': User.objects.filter(mentor__isnull=False).order_by('id').first(),
+            'admin': User.objects.filter(is_superuser=True).order_by('id').first(),
+        }
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS and settings.ALLOWED_HOSTS[0] != '*' else 'testserver'
+
+        clients = {}
+        for role in roles:
+            user = users.get(role)
+            if user is None:
+                raise CommandError(f"'{role}' foydalanuvchisi topilmadi; avval seed_data ni ishga tushiring")
+            token = RoleTokenObtainPairSerializer.get_token(user).access_token
+            clients[role] = Client(HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_HOST=host)
+        return clients
+
+    def build_url(self, route, callback):
+        route = route.lstrip('^').rstrip('$')
+        if not route or route.startswith(SKIP_PREFIXES) or '(?P' in route:
+            return None
+
+        view_class = getattr(callback, 'view_class', None) or getattr(callback, 'cls', None)
+        if view_class is None or not hasattr(view_class, 'get'):
+            return None
+
+        if '<int:pk>' in route:
+            model = self.view_model(view_class)
+            if model is None:
+                return None
+            pk = model.objects.order_by('id').values_list('id', flat=True).first()
+            if pk is None:
+                return None
+            route = route.replace('<int:pk>', str(pk))
+        if '<' in route:
+            return None
+        return '/' + route
+
+    def view_model(self, view_class):
+        model = getattr(view_class, 'scope_model', None)
+        if model is not None:
+            return model
+        queryset = getattr(view_class, 'queryset', None)
+        if queryset is not None:
+            return queryset.model
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        meta = getattr(serializer_class, 'Meta', None)
+        return getattr(meta, 'model', None)
+
+    def measure(self, client, url, role, options):
+        for _ in range(options['warmup']):
+            client.get(url)
+
+        # request_started signali reset_queries() chaqiradi, shuning uchun execute_wrapper bilan sanaymiz
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            response = client.get(url)
+
+        timings = []
+        started = time.perf_counter()
+        for _ in range(options['requests']):
+            t0 = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - started
+
+        return {
+            'endpoint': url,
+            'role': role,
+            'status': response.status_code,
+            'bytes': len(response.content) if not response.streaming else None,
+            'queries': len(queries),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'rps': round(options['requests'] / elapsed, 1),
+        }
+
+    def compare(self, path, results):
+        with open(path) as f:
+            previous = {(row['endpoint'], row['role']): row for row in json.load(f)['results']}
+
+        self.stdout.write(f"\n{path} bilan solishtirish (p95, so'rovlar):")
+        for row in results:
+            old = previous.get((row['endpoint'], row['role']))
+            if old is None:
+                continue
+            change = (row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0
+            self.stdout.write(
+                f"{row['role']:8} {row['endpoint']:45} p95 {old['p95_ms']:8.2f} -> {row['p95_ms']:8.2f}ms "
+                f"({change:+.0f}%)  queries {old['queries']} -> {row['queries']}"
+            )
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.test import AsyncClient, Client
+from django.utils import timezone
+
+from main import item_stats, leaderboard
+from main.management.commands.benchmark import percentile
+from main.management.commands.seed_data import PREFIX
+from main.models import AnswerOption, PointEvent, Student, StudentTestResult, Test
+from main.serializers import RoleTokenObtainPairSerializer
+
+SYNC_URL = '/api/tests/submit/answers/'
+ASYNC_URL = '/api/async/tests/submit/answers/'
+
+
+class Command(BaseCommand):
+    help = (
+        "Imtihon oxiridagi yuborishlar to'lqinini simulyatsiya qiladi: bir xil miqdordagi talabalar testni "
+        "WSGI (sinxron view, cheklangan oqimlar) va ASGI (async view) orqali bir vaqtda yuboradi. "
+        f"Faqat seed_data ({PREFIX}*) talabalari va testlari ishlatiladi; yaratilgan natijalar oxirida bekor qilinadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help="Har bir yo'l uchun yuboruvchilar soni")
+        parser.add_argument('--wsgi-threads', type=int, default=8, help="WSGI worker oqimlari soni")
+        parser.add_argument('--asgi-concurrency', type=int, default=0, help="Bir vaqtdagi async so'rovlar (0 - hammasi)")
+        parser.add_argument('--test', type=int, help="Test id (standart: eng ko'p talabaga berilgan test)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help="Natijalarni JSON faylga yozish")
+        parser.add_argument('--keep', action='store_true', help="Yaratilgan natijalarni o'chirmaslik")
+
+    def handle(self, *args, **options):
+        test = self.pick_test(options['test'])
+        students = self.eligible_students(test, options['students'] * 2)
+        if len(students) < 2:
+            raise CommandError(f"Bu testni yubora oladigan {PREFIX}* talabalar yetarli emas; avval seed_data ni ishga tushiring")
+        half = len(students) // 2
+        payloads = self.payloads(test, students, options['seed'])
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS and settings.ALLOWED_HOSTS[0] != '*' else 'testserver'
+        started_at = timezone.now()
+
+        try:
+            report = {
+                'test': test.id,
+                'questions': len(payloads[0][1]['answers']),
+                'wsgi': self.run_wsgi(payloads[:half], host, options['wsgi_threads']),
+                'asgi': asyncio.run(self.run_asgi(payloads[half:half * 2], host, options['asgi_concurrency'])),
+            }
+        finally:
+            if not options['keep']:
+                self.cleanup(test, [student.id for student in students], started_at)
+
+        for name in ('wsgi', 'asgi'):
+            row = report[name]
+            self.stdout.write(
+                f"{name}: {row['requests']} so'rov, {row['errors']} xato, {row['seconds']:.2f}s, {row['rps']:.1f} req/s, "
+                f"p50={row['p50_ms']:.1f}ms p95={row['p95_ms']:.1f}ms p99={row['p99_ms']:.1f}ms"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write('\n')
+        # Xato javoblarning vaqtlari yuborish latency'si emas: bunday o'lchov natija sifatida qabul qilinmaydi
+        failed = {name: report[name]['statuses'] for name in ('wsgi', 'asgi') if report[name]['errors']}
+        if failed:
+            raise CommandError(f"Non-201 responses, timings are not valid: {failed}")
+
+    def pick_test(self, test_id):
+        tests = Test.objects.filter(questions__isnull=False, created_by__user__username__startswith=PREFIX)
+        if test_id is not None:
+            tests = tests.filter(pk=test_id)
+        test = tests.annotate(students=Count('groups__student', distinct=True)).order_by('-students', '-id').first()
+        if test is None:
+            raise CommandError(f"Savollari bor {PREFIX}* test topilmadi")
+        return test
+
+    def eligible_students(self, test, limit):
+        return list(
+            Student.objects.filter(group__test=test, user__username__startswith=PREFIX)
+            .exclude(studenttestresult__test=test)
+            .select_related('user').order_by('id')[:limit]
+        )
+
+    def payloads(self, test, students, seed):
+        rng = random.Random(seed)
+        options = {}
+        for option_id, question_id in AnswerOption.objects.filter(question__test=test).values_list('id', 'question_id'):
+            options.setdefault(question_id, []).append(option_id)
+
+        payloads = []
+        for student in students:
+            token = RoleTokenObtainPairSerializer.get_token(student.user).access_token
+            answers = [{'question_id': question_id, 'answer_option_id': rng.choice(ids)} for question_id, ids in options.items()]
+            payloads.append((f'Bearer {token}', {'test_id': test.id, 'answers': answers}))
+        return payloads
+
+    def summarize(self, timings, statuses, seconds):
+        counts = {}
+        for code in statuses:
+            counts[str(code)] = counts.get(str(code), 0) + 1
+        return {
+            'requests': len(timings),
+            'errors': sum(1 for code in statuses if code != 201),
+            'statuses': counts,
+            'seconds': round(seconds, 3),
+            'rps': round(len(timings) / seconds, 1) if seconds else 0,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+        }
+
+    def run_wsgi(self, payloads, host, threads):
+        def submit(payload):
+            authorization, body = payload
+            client = Client(HTTP_AUTHORIZATION=authorization, HTTP_HOST=host)
+            t0 = time.perf_counter()
+            try:
+                response = client.post(SYNC_URL, body, content_type='application/json')
+            finally:
+                connections.close_all()
+            return (time.perf_counter() - t0) * 1000, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            rows = list(executor.map(submit, payloads))
+        return self.summarize([row[0] for row in rows], [row[1] for row in rows], time.perf_counter() - started)
+
+    async def run_asgi(self, payloads, host, concurrency):
+        semaphore = asyncio.Semaphore(concurrency or len(payloads))
+        client = AsyncClient()
+
+        async def submit(payload):
+            authorization, body = payload
+            async with semaphore:
+                t0 = time.perf_counter()
+                # Host sarlavhasi AsyncClient'da 'testserver' bilan qo'shilib ketadi; SERVER_NAME uni almashtiradi
+                response = await client.post(ASYNC_URL, body, content_type='application/json',
+                                             headers={'Authorization': authorization}, SERVER_NAME=host)
+                return (time.perf_counter() - t0) * 1000, response.status_code
+
+        started = time.perf_counter()
+        rows = await asyncio.gather(*(submit(payload) for payload in payloads))
+        return self.summarize([row[0] for row in rows], [row[1] for row in rows], time.perf_counter() - started)
+
+    def cleanup(self, test, student_ids, started_at):
+        """
+        Faqat benchmark yaratgan natijalar, ularning ball hodisalari (``created_at = taken_at``)
+        va balanslarni qaytaradi; shu vaqtda yozilgan boshqa hodisalarga tegilmaydi.
+        """
+        with transaction.atomic():
+            results = StudentTestResult.objects.filter(student_id__in=student_ids, test=test, taken_at__gte=started_at)
+            created = list(results.values_list('student_id', 'taken_at'))
+            if not created:
+                return
+            matching = Q()
+            for student_id, taken_at in created:
+                matching |= Q(student_id=student_id, created_at=taken_at)
+            events = PointEvent.objects.filter(matching, point_type='test')
+
+            totals = dict(events.values('student_id').annotate(total=Sum('amount')).values_list('student_id', 'total'))
+            if totals:
+                changes = [
+                    (group_id, points, points - totals[pk])
+                    for pk, group_id, points in Student.objects.filter(pk__in=totals).values_list('id', 'group_id', 'points')
+                ]
+                Student.objects.filter(pk__in=totals).update(points=F('points') - Case(
+                    *[When(pk=pk, then=Value(total)) for pk, total in totals.items()], default=Value(0),
+                ))
+                leaderboard.move_many(changes)
+            events.delete()
+            results.delete()
+            item_stats.rebuild(test.id)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main import test_sessions
+
+
+class Command(BaseCommand):
+    help = "Muddati o'tgan ochiq test sessiyalarini yopadi va buferdagi javoblarni saqlaydi (cron orqali har daqiqada)"
+
+    def handle(self, *args, **options):
+        closed = test_sessions.close_expired()
+        self.stdout.write(self.style.SUCCESS(f"{closed} ta sessiya yopildi"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.query_plans import explain_hot_queries
+
+
+class Command(BaseCommand):
+    help = "Asosiy so'rovlarning EXPLAIN rejasini olib, kerakli indekslar ishlatilishini tekshiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefer-indexes', action='store_true',
+                            help="PostgreSQL'da seq scan'ni o'chirib tekshirish (kichik bazalar uchun)")
+        parser.add_argument('--verbose-plans', action='store_true', help="To'liq rejalarni chiqarish")
+
+    def handle(self, *args, **options):
+        missing = []
+        for name, index, plan, used in explain_hot_queries(options['prefer_indexes']):
+            status = self.style.SUCCESS('OK     ') if used else self.style.ERROR('MISSING')
+            self.stdout.write(f"{status} {name} -> {index}")
+            if options['verbose_plans'] or not used:
+                self.stdout.write(plan)
+            if not used:
+                missing.append(name)
+
+        if missing:
+            raise CommandError(f"{len(missing)} ta so'rov kutilgan indeksdan foydalanmayapti")
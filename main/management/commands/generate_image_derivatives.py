@@ -0,0 +1,61 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from main import test_paper, versions
+from main.images import SOURCE_EXTENSIONS, is_derivative, make_derivatives
+from main.models import Achievement, AnswerOption, Mentor, Question, Student, Test
+
+
+class Command(BaseCommand):
+    help = "MEDIA_ROOT ichidagi rasmlar uchun o'lcham va WebP variantlarini yaratadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Process'lar soni")
+        parser.add_argument('--force', action='store_true', help="Mavjud variantlarni ham qayta yaratish")
+
+    def iter_sources(self):
+        for root, _, files in os.walk(settings.MEDIA_ROOT):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.splitext(name)[1].lower() in SOURCE_EXTENSIONS and not is_derivative(path):
+                    yield path
+
+    def handle(self, *args, **options):
+        sources = list(self.iter_sources())
+        force = [options['force']] * len(sources)
+        created = failed = 0
+        ready = []
+
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(make_derivatives, path, flag): path for path, flag in zip(sources, force)}
+            for future, path in futures.items():
+                try:
+                    created += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{path}: {e}")
+                else:
+                    ready.append(os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/'))
+
+        if self.mark_ready(ready) or created:
+            # Keshlangan image_variants (ro'yxat ETag'lari, test qog'ozlari) eskirdi
+            versions.bump(Student, Mentor, Question, AnswerOption, Achievement)
+            for test_id in Test.objects.values_list('id', flat=True).iterator():
+                test_paper.bump_version(test_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(sources)} ta rasm tekshirildi, {created} ta variant yaratildi, {failed} ta xato"
+        ))
+
+    def mark_ready(self, names):
+        """Variantlari tayyor rasmlar uchun ``image_variants_of`` ni yozadi; belgilangan qatorlar soni."""
+        marked = 0
+        for model in (Student, Mentor, Question, AnswerOption, Achievement):
+            for start in range(0, len(names), 500):
+                marked += (model.objects.filter(image__in=names[start:start + 500])
+                           .exclude(image_variants_of=F('image')).update(image_variants_of=F('image')))
+        return marked
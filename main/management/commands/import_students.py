@@ -0,0 +1,28 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.student_import import BATCH_SIZE, ImportFormatError, import_students
+
+
+class Command(BaseCommand):
+    help = "CSV yoki XLSX fayldan talabalarni import qiladi (username, password, name, birth_date, group, bio)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Parol hash qiladigan process'lar soni")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as f:
+                report = import_students(f, options['path'], workers=options['workers'], batch_size=options['batch_size'])
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            details = '; '.join(f"{field}: {message}" for field, message in error['errors'].items())
+            self.stderr.write(f"{error['row']}-qator: {details}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['rows']} ta qator o'qildi, {report['created']} ta talaba yaratildi, {len(report['errors'])} ta xato"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main import item_stats
+
+
+class Command(BaseCommand):
+    help = "Savol va variant hisoblagichlarini (urinishlar, to'g'ri javoblar, tanlanishlar) StudentAnswer tarixidan qayta hisoblaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--test', type=int, help="Faqat shu test savollari")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            item_stats.rebuild(options['test'])
+        self.stdout.write(self.style.SUCCESS("Savollar statistikasi qayta hisoblandi"))
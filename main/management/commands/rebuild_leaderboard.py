@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Reyting bucket'larini talabalar jadvalidan qaytadan hisoblaydi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('scopes', nargs='*', help="Masalan: global group:3 course:2 (bo'sh bo'lsa hammasi)")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            leaderboard.rebuild(options['scopes'] or None)
+        self.stdout.write(self.style.SUCCESS("Leaderboard rebuilt"))
@@ -0,0 +1,221 @@
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, Sum, Value, When
+from django.utils import timezone
+
+from main import item_stats, leaderboard
+from main.grading import POINTS_PER_CORRECT_ANSWER
+from main.models import (AnswerOption, Course, GivePoint, Group, Mentor, PointEvent, Question, Student,
+                         StudentAnswer, StudentTestResult, Test, TestSubmissionLog, User)
+
+PREFIX = 'seed_'
+PASSWORD = 'seed-password'
+BATCH = 2000
+
+
+def set_values(model, field, values):
+    """
+    ``{pk: qiymat}`` ni CASE bilan 500 tadan yozadi. bulk_create auto_now_add maydonlarini
+    hozirgi vaqtga qo'yadi, vaqtlarni shu yo'l bilan o'tmishga suramiz.
+    """
+    items = list(values.items())
+    for start in range(0, len(items), 500):
+        chunk = dict(items[start:start + 500])
+        model.objects.filter(pk__in=chunk).update(**{
+            field: Case(*[When(pk=pk, then=Value(value)) for pk, value in chunk.items()], output_field=model._meta.get_field(field)),
+        })
+
+
+class Command(BaseCommand):
+    help = "Benchmark uchun tasodifiy, lekin seed bo'yicha takrorlanadigan ma'lumotlar yaratadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--courses', type=int, default=8)
+        parser.add_argument('--mentors', type=int, default=25)
+        parser.add_argument('--groups', type=int, default=80)
+        parser.add_argument('--students', type=int, default=3000)
+        parser.add_argument('--tests', type=int, default=200)
+        parser.add_argument('--questions', type=int, default=15, help="Har bir testdagi savollar soni")
+        parser.add_argument('--results-per-student', type=int, default=8)
+        parser.add_argument('--events-per-student', type=int, default=80, help="Mentor bergan ballar soni")
+        parser.add_argument('--years', type=int, default=2, help="Hodisalar tarqaladigan davr")
+        parser.add_argument('--flush', action='store_true', help=f"Avval {PREFIX}* foydalanuvchilarni o'chirish")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now()
+        self.start = self.now - datetime.timedelta(days=365 * options['years'])
+
+        if options['flush']:
+            self.flush()
+        elif User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError(f"{PREFIX}* ma'lumotlar allaqachon bor; --flush bilan qayta yarating")
+
+        with transaction.atomic():
+            self.generate(options)
+            leaderboard.rebuild()
+            item_stats.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{Student.objects.filter(user__username__startswith=PREFIX).count()} talaba, "
+            f"{PointEvent.objects.filter(student__user__username__startswith=PREFIX).count()} ball hodisasi yaratildi. "
+            f"Parol: {PASSWORD}"
+        ))
+
+    def flush(self):
+        with transaction.atomic():
+            Test.objects.filter(created_by__user__username__startswith=PREFIX).delete()
+            Group.objects.filter(name__startswith=PREFIX).delete()
+            Course.objects.filter(name__startswith=PREFIX).delete()
+            User.objects.filter(username__startswith=PREFIX).delete()
+            leaderboard.rebuild()
+            item_stats.rebuild()
+
+    def random_time(self):
+        return self.start + (self.now - self.start) * self.rng.random()
+
+    def create_users(self, role, count, password):
+        users = [User(username=f'{PREFIX}{role.lower()}_{i}', role=role, password=password) for i in range(count)]
+        return User.objects.bulk_create(users, batch_size=BATCH)
+
+    def generate(self, options):
+        rng = self.rng
+        password = make_password(PASSWORD)
+
+        User.objects.create(username=f'{PREFIX}admin', role='ADMIN', password=password, is_staff=True, is_superuser=True)
+        courses = Course.objects.bulk_create([Course(name=f'{PREFIX}course_{i}') for i in range(options['courses'])])
+
+        mentor_users = self.create_users('TEACHER', options['mentors'], password)
+        mentors = Mentor.objects.bulk_create([
+            Mentor(user=user, name=f'Mentor {i}', point_limit=rng.choice([10, 20, 50]))
+            for i, user in enumerate(mentor_users)
+        ])
+        Mentor.course.through.objects.bulk_create([
+            Mentor.course.through(mentor_id=mentor.id, course_id=course.id)
+            for mentor in mentors for course in rng.sample(courses, k=min(2, len(courses)))
+        ])
+
+        groups = Group.objects.bulk_create([Group(name=f'{PREFIX}group_{i}') for i in range(options['groups'])])
+        Group.courses.through.objects.bulk_create([
+            Group.courses.through(group_id=group.id, course_id=course.id)
+            for group in groups for course in rng.sample(courses, k=min(rng.randint(1, 2), len(courses)))
+        ])
+        group_mentors = {group.id: rng.sample(mentors, k=min(2, len(mentors))) for group in groups}
+        Group.mentors.through.objects.bulk_create([
+            Group.mentors.through(group_id=group_id, mentor_id=mentor.id)
+            for group_id, group_mentor_list in group_mentors.items() for mentor in group_mentor_list
+        ])
+
+        tests = Test.objects.bulk_create([
+            Test(title=f'Test {i}', description='Seed test', created_by=rng.choice(mentors), duration_minutes=rng.choice([20, 30, 45]))
+            for i in range(options['tests'])
+        ])
+        set_values(Test, 'created_at', {test.id: self.random_time() for test in tests})
+        test_groups = {test.id: rng.sample(groups, k=min(rng.randint(1, 4), len(groups))) for test in tests}
+        Test.groups.through.objects.bulk_create([
+            Test.groups.through(test_id=test_id, group_id=group.id)
+            for test_id, test_group_list in test_groups.items() for group in test_group_list
+        ])
+
+        questions = Question.objects.bulk_create([
+            Question(test=test, text=f'{test.title}: savol {i}')
+            for test in tests for i in range(options['questions'])
+        ], batch_size=BATCH)
+        options_rows = []
+        for question in questions:
+            correct = rng.choice('ABCD')
+            options_rows += [
+                AnswerOption(question=question, label=label, text=f'Variant {label}', is_correct=label == correct)
+                for label in 'ABCD'
+            ]
+        answer_options = AnswerOption.objects.bulk_create(options_rows, batch_size=BATCH)
+
+        # question_id -> [(option_id, is_correct)], test_id -> [question_id]
+        key = {}
+        for option in answer_options:
+            key.setdefault(option.question_id, []).append((option.id, option.is_correct))
+        test_questions = {}
+        for question in questions:
+            test_questions.setdefault(question.test_id, []).append(question.id)
+        group_tests = {}
+        for test_id, test_group_list in test_groups.items():
+            for group in test_group_list:
+                group_tests.setdefault(group.id, []).append(test_id)
+
+        student_users = self.create_users('STUDENT', options['students'], password)
+        students = [
+            Student(user=user, name=f'Talaba {i}', birth_date=datetime.date(2005 + rng.randint(0, 10), rng.randint(1, 12), rng.randint(1, 28)),
+                    group=rng.choice(groups))
+            for i, user in enumerate(student_users)
+        ]
+        students = Student.objects.bulk_create(students, batch_size=BATCH)
+        set_values(Student, 'created_at', {student.id: self.random_time() for student in students})
+
+        self.generate_results(students, group_tests, test_questions, key, options)
+        self.generate_point_events(students, group_mentors, options)
+
+    def generate_results(self, students, group_tests, test_questions, key, options):
+        rng = self.rng
+        results, answers_by_result, logs = [], [], []
+        for student in students:
+            available = group_tests.get(student.group_id, [])
+            for test_id in rng.sample(available, k=min(options['results_per_student'], len(available))):
+                skill = rng.random()
+                answers = []
+                for question_id in test_questions[test_id]:
+                    option_id, is_correct = next(o for o in key[question_id] if o[1]) if rng.random() < skill else rng.choice(key[question_id])
+                    answers.append((question_id, option_id, is_correct))
+                correct = sum(1 for answer in answers if answer[2])
+                results.append(StudentTestResult(student_id=student.id, test_id=test_id, score=correct * POINTS_PER_CORRECT_ANSWER))
+                answers_by_result.append(answers)
+                logs.append(TestSubmissionLog(student_id=student.id, test_id=test_id, correct_answers=correct))
+
+        results = StudentTestResult.objects.bulk_create(results, batch_size=BATCH)
+        logs = TestSubmissionLog.objects.bulk_create(logs, batch_size=BATCH)
+        taken_at = {result.id: self.random_time() for result in results}
+        set_values(StudentTestResult, 'taken_at', taken_at)
+        set_values(TestSubmissionLog, 'submitted_at', {log.id: taken_at[result.id] for log, result in zip(logs, results)})
+
+        batch = []
+        for result, answers in zip(results, answers_by_result):
+            batch += [
+                StudentAnswer(result_id=result.id, question_id=question_id, answer_option_id=option_id, is_correct=is_correct)
+                for question_id, option_id, is_correct in answers
+            ]
+            if len(batch) >= BATCH * 5:
+                StudentAnswer.objects.bulk_create(batch, batch_size=BATCH)
+                batch = []
+        StudentAnswer.objects.bulk_create(batch, batch_size=BATCH)
+
+        PointEvent.objects.bulk_create([
+            PointEvent(student_id=result.student_id, amount=result.score, point_type='test',
+                       description=f'Testdan ball: #{result.test_id}', created_at=taken_at[result.id])
+            for result in results if result.score
+        ], batch_size=BATCH)
+
+    def generate_point_events(self, students, group_mentors, options):
+        rng = self.rng
+        gives, events = [], []
+        for student in students:
+            for _ in range(rng.randint(0, options['events_per_student'] * 2)):
+                mentor = rng.choice(group_mentors[student.group_id])
+                amount = rng.randint(1, mentor.point_limit)
+                created_at = self.random_time()
+                gives.append((GivePoint(student_id=student.id, mentor_id=mentor.id, amount=amount, description='Seed'), created_at))
+                events.append(PointEvent(student_id=student.id, amount=amount, point_type='mentor', description='Seed', created_at=created_at))
+
+        created = GivePoint.objects.bulk_create([give for give, _ in gives], batch_size=BATCH)
+        set_values(GivePoint, 'created_at', {give.id: created_at for give, (_, created_at) in zip(created, gives)})
+        PointEvent.objects.bulk_create(events, batch_size=BATCH)
+
+        # Kesh qilingan balans = jurnal yig'indisi
+        totals = (
+            PointEvent.objects.filter(student__user__username__startswith=PREFIX)
+            .values('student_id').annotate(total=Sum('amount')).values_list('student_id', 'total')
+        )
+        set_values(Student, 'points', dict(totals))
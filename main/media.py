@@ -0,0 +1,96 @@
+"""
+MEDIA_URL ostidagi fayllarni berish.
+
+Production'da fayl tanasini Django emas, oldidagi proxy yuboradi (``MEDIA_SERVE_MODE``):
+
+* ``'x-accel'`` - nginx. ``X-Accel-Redirect: MEDIA_ACCEL_PREFIX + path`` (URL-kodlangan) qaytariladi, nginx'da::
+
+      location /protected-media/ {
+          internal;
+          alias /path/to/media/;
+      }
+
+* ``'x-sendfile'`` - Apache/lighttpd, ``X-Sendfile: <to'liq yo'l>`` (URL-kodlangan, mod_xsendfile uni dekodlaydi).
+* ``'django'`` - faylni Django o'zi yuboradi (development).
+
+Har uch rejimda ham ETag/Last-Modified qo'yiladi va ``If-None-Match``/``If-Modified-Since``
+so'rovlariga proxy'ga bormasdan 304 qaytariladi. ETag nginx kabi hajm va mtime'dan olinadi:
+faylni o'qish kerak emas. Yuklangan fayllar nomi kontentdan olinmaydi va bir xil nom ostida
+almashtirilishi mumkin, shuning uchun hammasi ``MEDIA_CACHE_MAX_AGE`` va ``must-revalidate`` bilan
+keshlanadi.
+"""
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import RoleClaimsJWTAuthentication
+
+
+def _file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _is_protected(path):
+    return path.startswith(tuple(settings.MEDIA_PROTECTED_PREFIXES))
+
+
+def _is_authorized(request, path):
+    if not _is_protected(path):
+        return True
+    if request.user.is_authenticated:
+        return True
+    try:
+        return RoleClaimsJWTAuthentication().authenticate(request) is not None
+    except AuthenticationFailed:
+        return False
+
+
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except Exception:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    if not _is_authorized(request, path):
+        return HttpResponse(status=403)
+
+    stat = os.stat(full_path)
+    etag = _file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _file_response(full_path, path)
+        content_type, encoding = mimetypes.guess_type(full_path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+
+    visibility = {'private': True} if _is_protected(path) else {'public': True}
+    patch_cache_control(response, max_age=settings.MEDIA_CACHE_MAX_AGE, must_revalidate=True, **visibility)
+    return response
+
+
+def _file_response(full_path, path):
+    mode = settings.MEDIA_SERVE_MODE
+    if mode == 'x-accel':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = quote(full_path)
+        return response
+    return FileResponse(open(full_path, 'rb'))
@@ -0,0 +1,139 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def _source_times(apps, student_ids):
+    """
+    Sanasiz yozuvlar uchun manba vaqtlari: ``GivePoint.created_at`` (ketma-ketlik bo'yicha),
+    eski submit yozuvlari uchun ``TestSubmissionLog.submitted_at`` yoki ``StudentTestResult.taken_at``.
+    """
+    GivePoint = apps.get_model('main', 'GivePoint')
+    TestSubmissionLog = apps.get_model('main', 'TestSubmissionLog')
+    StudentTestResult = apps.get_model('main', 'StudentTestResult')
+
+    gives = {}
+    for student_id, *row in (
+        GivePoint.objects.filter(student_id__in=student_ids).order_by('created_at', 'id')
+        .values_list('student_id', 'amount', 'description', 'point_type', 'created_at')
+    ):
+        gives.setdefault(student_id, []).append(row)
+    logs = {
+        (student_id, f"{title} testidan {correct} ta to‘g‘ri javob"): submitted_at
+        for student_id, title, correct, submitted_at in TestSubmissionLog.objects.filter(student_id__in=student_ids)
+        .values_list('student_id', 'test__title', 'correct_answers', 'submitted_at')
+    }
+    results = {
+        (student_id, title): taken_at
+        for student_id, title, taken_at in StudentTestResult.objects.filter(student_id__in=student_ids)
+        .values_list('student_id', 'test__title', 'taken_at')
+    }
+    return gives, logs, results
+
+
+def _undated_time(student_id, entry, gives, logs, results):
+    amount = entry.get('amount') or 0
+    description = entry.get('description')
+    point_type = entry.get('point_type') or 'mentor'
+
+    if point_type == 'test' and description:
+        if (student_id, description) in logs:
+            return logs[student_id, description]
+        if ' testidan ' in description:
+            title = description.rsplit(' testidan ', 1)[0]
+            if (student_id, title) in results:
+                return results[student_id, title]
+
+    candidates = gives.get(student_id, [])
+    for i, (give_amount, give_description, give_type, created_at) in enumerate(candidates):
+        if (give_amount, give_description, give_type) == (amount, description, point_type):
+            del candidates[i]
+            return created_at
+    return None
+
+
+def _copy_chunk(apps, students):
+    PointEvent = apps.get_model('main', 'PointEvent')
+    sources = _source_times(apps, [student.id for student in students])
+    batch = []
+    for student in students:
+        for entry in student.point_history or []:
+            date = entry.get('date')
+            created_at = parse_datetime(date) if date else _undated_time(student.id, entry, *sources)
+            batch.append(PointEvent(
+                student_id=student.id,
+                amount=entry.get('amount') or 0,
+                point_type=entry.get('point_type') or 'mentor',
+                description=entry.get('description'),
+                # Manbasi topilmagan yozuv uchun yagona ma'lum vaqt
+                created_at=created_at or student.created_at,
+            ))
+    PointEvent.objects.bulk_create(batch, batch_size=1000)
+
+
+def copy_point_history(apps, schema_editor):
+    Student = apps.get_model('main', 'Student')
+
+    chunk = []
+    for student in Student.objects.only('id', 'created_at', 'point_history').iterator(chunk_size=500):
+        chunk.append(student)
+        if len(chunk) >= 500:
+            _copy_chunk(apps, chunk)
+            chunk = []
+    _copy_chunk(apps, chunk)
+
+
+def restore_point_history(apps, schema_editor):
+    Student = apps.get_model('main', 'Student')
+    PointEvent = apps.get_model('main', 'PointEvent')
+
+    for student in Student.objects.only('id').iterator(chunk_size=500):
+        events = PointEvent.objects.filter(student_id=student.id).order_by('created_at', 'id')
+        student.point_history = [
+            {
+                'amount': event.amount,
+                'point_type': event.point_type,
+                'description': event.description,
+                'date': event.created_at.isoformat(),
+            }
+            for event in events
+        ]
+        student.save(update_fields=['point_history'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_alter_testsubmissionlog_unique_together'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testsubmissionlog',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.student'),
+        ),
+        migrations.CreateModel(
+            name='PointEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('point_type', models.CharField(choices=[('mentor', 'From Mentor'), ('test', 'From Test')], max_length=20)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='point_events', to='main.student')),
+            ],
+            options={
+                'ordering': ('-created_at', '-id'),
+                'indexes': [models.Index(fields=['student', '-created_at', '-id'], name='pointevent_student_created_idx')],
+            },
+        ),
+        migrations.RunPython(copy_point_history, restore_point_history),
+        migrations.RemoveField(
+            model_name='student',
+            name='point_history',
+        ),
+    ]
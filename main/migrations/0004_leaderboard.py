@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:32
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_leaderboard(apps, schema_editor):
+    Student = apps.get_model('main', 'Student')
+    Group = apps.get_model('main', 'Group')
+    LeaderboardBucket = apps.get_model('main', 'LeaderboardBucket')
+
+    scopes = {'global': Student.objects.all()}
+    for group_id in Group.objects.values_list('id', flat=True):
+        scopes[f'group:{group_id}'] = Student.objects.filter(group_id=group_id)
+    for course_id in Group.courses.through.objects.values_list('course_id', flat=True).distinct():
+        scopes[f'course:{course_id}'] = Student.objects.filter(group__courses=course_id)
+
+    for scope, students in scopes.items():
+        counts = students.order_by().values('points').annotate(total=Count('id'))
+        LeaderboardBucket.objects.bulk_create(
+            [LeaderboardBucket(scope=scope, points=row['points'], students=row['total']) for row in counts],
+            batch_size=1000,
+        )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_point_event_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=30)),
+                ('points', models.PositiveIntegerField()),
+                ('students', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardbucket',
+            constraint=models.UniqueConstraint(fields=('scope', 'points'), name='leaderboard_scope_points_uniq'),
+        ),
+        migrations.RunPython(fill_leaderboard, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 15:43
+
+from django.db import migrations, models
+
+from main.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY tranzaksiya ichida ishlamaydi
+    atomic = False
+
+    dependencies = [
+        ('main', '0004_leaderboard'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='givepoint',
+            index=models.Index(fields=['student', '-created_at'], name='givepoint_student_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='givepoint',
+            index=models.Index(fields=['mentor', '-created_at'], name='givepoint_mentor_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(fields=['-points', 'id'], name='student_points_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='student',
+            index=models.Index(fields=['group', '-points', 'id'], name='student_group_points_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='studenttestresult',
+            index=models.Index(fields=['student', '-taken_at'], name='result_student_taken_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='testsubmissionlog',
+            index=models.Index(fields=['student', '-submitted_at'], name='submission_student_time_idx'),
+        ),
+    ]
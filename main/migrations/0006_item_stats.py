@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_item_stats(apps, schema_editor):
+    Question = apps.get_model('main', 'Question')
+    AnswerOption = apps.get_model('main', 'AnswerOption')
+    StudentAnswer = apps.get_model('main', 'StudentAnswer')
+
+    def counted(field, **filters):
+        return Coalesce(Subquery(
+            StudentAnswer.objects.filter(**{field: OuterRef('pk')}, **filters).order_by()
+            .values(field).annotate(total=Count('id')).values('total')
+        ), 0)
+
+    Question.objects.update(attempts=counted('question'), correct_count=counted('question', is_correct=True))
+    AnswerOption.objects.update(selected_count=counted('answer_option'))
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answeroption',
+            name='selected_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='correct_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_item_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_item_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('deadline', models.DateTimeField()),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('result', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='main.studenttestresult')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.student')),
+                ('test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='main.test')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('submitted_at__isnull', True)), fields=['deadline'], name='testsession_open_deadline_idx')],
+                'unique_together': {('student', 'test')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_test_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='givepoint',
+            name='point_type',
+            field=models.CharField(choices=[('mentor', 'From Mentor'), ('test', 'From Test'), ('achievement', 'Achievement purchase')], default='mentor', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='pointevent',
+            name='point_type',
+            field=models.CharField(choices=[('mentor', 'From Mentor'), ('test', 'From Test'), ('achievement', 'Achievement purchase')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AchievementPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('achievement', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='purchases', to='main.achievement')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='main.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', '-created_at'], name='purchase_student_created_idx')],
+            },
+        ),
+    ]
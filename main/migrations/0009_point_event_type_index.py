@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+from main.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY tranzaksiya ichida ishlamaydi
+    atomic = False
+
+    dependencies = [
+        ('main', '0008_achievement_purchases'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='pointevent',
+            index=models.Index(fields=['student', 'point_type', '-created_at', '-id'], name='pointevent_student_type_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:36
+
+import os
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+IMAGE_MODELS = ('Student', 'Mentor', 'Question', 'AnswerOption', 'Achievement')
+
+
+def mark_existing_variants(apps, schema_editor):
+    # Bir martalik tekshiruv: variantlari allaqachon yaratilgan rasmlar belgilanadi
+    for model_name in IMAGE_MODELS:
+        model = apps.get_model('main', model_name)
+        names = model.objects.exclude(image='').exclude(image=None).values_list('image', flat=True).distinct()
+        ready = [name for name in names.iterator()
+                 if default_storage.exists(f'{os.path.splitext(name)[0]}.thumb.webp')]
+        for start in range(0, len(ready), 500):
+            model.objects.filter(image__in=ready[start:start + 500]).update(image_variants_of=models.F('image'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_point_event_type_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='achievement',
+            name='image_variants_of',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='answeroption',
+            name='image_variants_of',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='mentor',
+            name='image_variants_of',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='image_variants_of',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='image_variants_of',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(mark_existing_variants, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -20,6 +21,8 @@ class Mentor(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, limit_choices_to={'role': 'TEACHER'})
     name = models.CharField(max_length=100)
     image = models.ImageField(upload_to='images/', null=True, blank=True)
+    # main.images variantlari tayyor bo'lgan rasm nomi (fon oqimi yozadi): URL'lar storage'ni tekshirmasdan quriladi
+    image_variants_of = models.CharField(max_length=100, blank=True, default='', editable=False)
     birthday = models.DateField(null=True, blank=True)
     point_limit = models.IntegerField()
     course = models.ManyToManyField(Course)
@@ -49,18 +52,31 @@ class Student(models.Model):
     name = models.CharField(max_length=100)
     birth_date = models.DateField()
     image = models.ImageField(upload_to="images/", null=True, blank=True)
+    image_variants_of = models.CharField(max_length=100, blank=True, default='', editable=False)
     bio = models.TextField(null=True, blank=True)
     points = models.PositiveIntegerField(default=0)
-    point_history = models.JSONField(default=list, blank=True)
     group = models.ForeignKey(Group, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Ball faqat main.points orqali (jurnal + UPDATE ... + n) o'zgaradi: mavjud talabani saqlashda
+        # xotiradagi eski ``points`` qiymati bazaga yozilmaydi
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields if not field.primary_key and field.name != 'points'
+            ]
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Student"
         verbose_name_plural = "Students"
+        indexes = [
+            models.Index(fields=['-points', 'id'], name='student_points_idx'),
+            models.Index(fields=['group', '-points', 'id'], name='student_group_points_idx'),
+        ]
 
 
 class Test(models.Model):
@@ -79,6 +95,10 @@ class Question(models.Model):
     test = models.ForeignKey('Test', related_name='questions', on_delete=models.CASCADE)
     text = models.TextField(blank=True, null=True)
     image = models.ImageField(upload_to='questions/', blank=True, null=True)
+    image_variants_of = models.CharField(max_length=100, blank=True, default='', editable=False)
+    # main.item_stats hisoblagichlari: javoblar commit bo'lgach UPDATE ... + 1 bilan oshadi
+    attempts = models.PositiveIntegerField(default=0, editable=False)
+    correct_count = models.PositiveIntegerField(default=0, editable=False)
 
     def clean(self):
         if not self.text and not self.image:
@@ -94,7 +114,9 @@ class AnswerOption(models.Model):
     label = models.CharField(max_length=1, choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')])
     text = models.CharField(max_length=255 , blank=True, null=True)
     image = models.ImageField(upload_to='answers/', blank=True, null=True)
+    image_variants_of = models.CharField(max_length=100, blank=True, default='', editable=False)
     is_correct = models.BooleanField(default=False)
+    selected_count = models.PositiveIntegerField(default=0, editable=False)
 
     def clean(self):
         if not self.text and not self.image:
@@ -119,21 +141,30 @@ class StudentTestResult(models.Model):
 
     class Meta:
         unique_together = ('student', 'test')
+        indexes = [
+            models.Index(fields=['student', '-taken_at'], name='result_student_taken_idx'),
+        ]
 
     def update_score(self):
-        correct_answers = self.answers.filter(is_correct=True).count()
-        self.score = correct_answers * 5
-        self.save()
-
-        if self.score > 0:
-            self.student.points += self.score
-            self.student.point_history.append({
-                'amount': self.score,
-                'point_type': 'test',
-                'description': f"Testdan ball: {self.test.title}",
-                'date': self.taken_at.isoformat(),
-            })
-            self.student.save()
+        from .points import add_points
+
+        # Ball faqat o'zgargan qismiga beriladi; score ustida compare-and-set
+        # parallel javoblar bir xil farqni ikki marta qo'shib yubormasligi uchun.
+        while True:
+            old_score = self.score
+            new_score = self.answers.filter(is_correct=True).count() * 5
+            if StudentTestResult.objects.filter(pk=self.pk, score=old_score).update(score=new_score):
+                break
+            self.refresh_from_db(fields=['score'])
+        self.score = new_score
+
+        if new_score != old_score:
+            add_points(
+                self.student_id,
+                new_score - old_score,
+                point_type='test',
+                description=f"Testdan ball: {self.test.title}",
+            )
 
     def __str__(self):
         return f"{self.student.name} - {self.test.title} - {self.score} ball"
@@ -146,34 +177,59 @@ class StudentAnswer(models.Model):
     is_correct = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
+        from .item_stats import record_answers
+
         self.is_correct = self.answer_option.is_correct
 
         is_new = self._state.adding
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                record_answers([(self.question_id, self.answer_option_id, self.is_correct)])
 
         if is_new:
-            if self.is_correct:
-                self.result.student.points += 5
-                self.result.student.point_history.append({
-                    'amount': 5,
-                    'point_type': 'test',
-                    'description': f"To‘g‘ri javob: {self.question.text}",
-                    'date': self.result.taken_at.isoformat(),
-                })
-                self.result.student.save()
-
             self.result.update_score()
 
     def __str__(self):
         return f"{self.result.student.name}: {self.question.text[:30]} → {self.answer_option.label}"
+
+
+class TestSession(models.Model):
+    """Talabaning test urinishi: boshlanish vaqti va muddati serverda belgilanadi (``main.test_sessions``)."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    test = models.ForeignKey(Test, on_delete=models.CASCADE)
+    started_at = models.DateTimeField(default=timezone.now)
+    deadline = models.DateTimeField()
+    submitted_at = models.DateTimeField(null=True, blank=True)
+    result = models.OneToOneField(StudentTestResult, null=True, blank=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        unique_together = ('student', 'test')
+        indexes = [
+            models.Index(fields=['deadline'], name='testsession_open_deadline_idx', condition=models.Q(submitted_at__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.test_id} ({self.started_at:%Y-%m-%d %H:%M})"
+
+
+POINT_TYPE_CHOICES = [('mentor', 'From Mentor'), ('test', 'From Test'), ('achievement', 'Achievement purchase')]
+
+
 class GivePoint(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     mentor = models.ForeignKey(Mentor, on_delete=models.CASCADE)
     amount = models.PositiveIntegerField(default=0)
     description = models.TextField(null=True ,blank=True)
-    point_type = models.CharField(max_length=20, choices=[('mentor', 'From Mentor'), ('test', 'From Test')], default='mentor')
+    point_type = models.CharField(max_length=20, choices=POINT_TYPE_CHOICES, default='mentor')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-created_at'], name='givepoint_student_created_idx'),
+            models.Index(fields=['mentor', '-created_at'], name='givepoint_mentor_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.student.name} {self.amount} -> {self.mentor.name}"
 
@@ -182,17 +238,36 @@ class GivePoint(models.Model):
             raise ValidationError(f"Mentor can give max {self.mentor.point_limit} points")
 
     def save(self, *args, **kwargs):
-        self.student.points += self.amount
-        self.student.point_history.append({
-            'amount': self.amount,
-            'point_type': self.point_type,
-            'description': self.description,
-        })
-        self.student.save()
-        super().save(*args, **kwargs)
+        from .points import add_points
+
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                add_points(self.student_id, self.amount, self.point_type, self.description)
+
+
+class PointEvent(models.Model):
+    """Ball o'zgarishlari jurnali: har bir hodisa uchun bitta qator, faqat qo'shiladi."""
+    student = models.ForeignKey(Student, related_name='point_events', on_delete=models.CASCADE)
+    amount = models.IntegerField()
+    point_type = models.CharField(max_length=20, choices=POINT_TYPE_CHOICES)
+    description = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ('-created_at', '-id')
+        indexes = [
+            models.Index(fields=['student', '-created_at', '-id'], name='pointevent_student_created_idx'),
+            models.Index(fields=['student', 'point_type', '-created_at', '-id'], name='pointevent_student_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id}: {self.amount} ({self.point_type})"
 
 class Achievement(models.Model):
     image = models.ImageField(upload_to='achievements/', null=True, blank=True)
+    image_variants_of = models.CharField(max_length=100, blank=True, default='', editable=False)
     name = models.CharField(max_length=255)
     amount = models.PositiveIntegerField(default=0)
     point_price = models.PositiveIntegerField()
@@ -201,6 +276,22 @@ class Achievement(models.Model):
         return self.name
 
 
+class AchievementPurchase(models.Model):
+    """Sotib olingan yutuqlar tarixi; ``price`` - sotib olingan paytdagi narx."""
+    student = models.ForeignKey(Student, related_name='purchases', on_delete=models.CASCADE)
+    achievement = models.ForeignKey(Achievement, related_name='purchases', on_delete=models.PROTECT)
+    price = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-created_at'], name='purchase_student_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} -> {self.achievement_id} ({self.price})"
+
+
 class TestSubmissionLog(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     test = models.ForeignKey(Test, on_delete=models.CASCADE)
@@ -208,9 +299,30 @@ class TestSubmissionLog(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('student_id', 'test_id')
+        unique_together = ('student', 'test')
+        indexes = [
+            models.Index(fields=['student', '-submitted_at'], name='submission_student_time_idx'),
+        ]
 
     def __str__(self):
         return f"Student {self.student_id} submitted test {self.test_id}"
 
 
+
+
+class LeaderboardBucket(models.Model):
+    """
+    Reyting uchun oldindan hisoblangan jadval: har bir scope ('global', 'group:<id>',
+    'course:<id>') va ball qiymati uchun shu ballga ega talabalar soni.
+    """
+    scope = models.CharField(max_length=30)
+    points = models.PositiveIntegerField()
+    students = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'points'], name='leaderboard_scope_points_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.points}: {self.students}"
@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key: every page is an index range scan
+    (``WHERE id < cursor ORDER BY id DESC LIMIT n``), so its cost does not grow with the table.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class CreatedAtCursorPagination(IdCursorPagination):
+    """Keyset pagination on ``created_at`` for tables with a ``(<fk>, -created_at)`` index."""
+    ordering = '-created_at'
@@ -1,13 +1,24 @@
 from rest_framework.permissions import BasePermission
+from main.authentication import get_claims
 from main.models import Mentor, Student
 
 class IsMentor(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and Mentor.objects.filter(user=request.user).exists()
+        if not request.user.is_authenticated:
+            return False
+        claims = get_claims(request.user)
+        if claims is not None:
+            return claims['mentor_id'] is not None
+        return Mentor.objects.filter(user=request.user).exists()
 
 class IsStudent(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and Student.objects.filter(user=request.user).exists()
+        if not request.user.is_authenticated:
+            return False
+        claims = get_claims(request.user)
+        if claims is not None:
+            return claims['student_id'] is not None
+        return Student.objects.filter(user=request.user).exists()
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
@@ -15,4 +26,8 @@ class IsAdmin(BasePermission):
 
 class IsMentorOrAdmin(BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and (Mentor.objects.filter(user=request.user).exists() or request.user.is_superuser)
\ No newline at end of file
+        if not request.user.is_authenticated:
+            return False
+        if request.user.is_superuser:
+            return True
+        return IsMentor().has_permission(request, view)
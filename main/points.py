@@ -0,0 +1,119 @@
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from . import leaderboard, versions
+from .models import Achievement, AchievementPurchase, GivePoint, PointEvent, Student
+
+
+class InsufficientPoints(Exception):
+    pass
+
+
+class OutOfStock(Exception):
+    pass
+
+
+def add_points(student_id, amount, point_type, description=None, created_at=None):
+    """
+    Talaba baliga ``amount`` qo'shadi (manfiy bo'lsa ayiradi) va jurnalga yozadi.
+
+    Balans bitta ``UPDATE ... SET points = points + n`` bilan o'zgaradi, shuning uchun
+    parallel yozuvlarda ball yo'qolmaydi va faqat ``points`` ustuni yangilanadi.
+    Ayirishda shart ham shu so'rovda tekshiriladi: ball yetmasa ``InsufficientPoints``.
+    """
+    if amount == 0:
+        return
+
+    students = Student.objects.filter(pk=student_id)
+    if amount < 0:
+        students = students.filter(points__gte=-amount)
+
+    with transaction.atomic(savepoint=False):
+        updated = students.update(points=F('points') + amount)
+        if updated:
+            event = PointEvent(student_id=student_id, amount=amount, point_type=point_type, description=description)
+            if created_at is not None:
+                event.created_at = created_at
+            event.save()
+
+            points, group_id = Student.objects.filter(pk=student_id).values_list('points', 'group_id').get()
+            leaderboard.move(group_id, points - amount, points)
+
+    if not updated:
+        raise InsufficientPoints(f"Student {student_id} does not have {-amount} points")
+
+
+def add_points_bulk(amounts, point_type, description=None):
+    """
+    ``{student_id: amount}`` bo'yicha bir nechta talabaga ball qo'shadi (faqat musbat miqdorlar).
+
+    Balanslar bitta ``UPDATE ... SET points = points + CASE ...`` bilan, jurnal ``bulk_create``
+    bilan yoziladi; so'rovlar soni talabalar soniga bog'liq emas. Yangi balanslarni qaytaradi.
+    """
+    amounts = {student_id: amount for student_id, amount in amounts.items() if amount}
+    if not amounts:
+        return {}
+    if any(amount < 0 for amount in amounts.values()):
+        raise ValueError("add_points_bulk only adds points; use add_points for deductions")
+
+    with transaction.atomic(savepoint=False):
+        Student.objects.filter(pk__in=amounts).update(points=F('points') + Case(
+            *[When(pk=student_id, then=Value(amount)) for student_id, amount in amounts.items()],
+            default=Value(0),
+        ))
+        PointEvent.objects.bulk_create([
+            PointEvent(student_id=student_id, amount=amount, point_type=point_type, description=description)
+            for student_id, amount in amounts.items()
+        ])
+
+        rows = Student.objects.filter(pk__in=amounts).values_list('id', 'points', 'group_id')
+        balances = {}
+        changes = []
+        for student_id, points, group_id in rows:
+            balances[student_id] = points
+            changes.append((group_id, points - amounts[student_id], points))
+        leaderboard.move_many(changes)
+    return balances
+
+
+def give_points_bulk(mentor_id, amounts, description=None):
+    """Mentor nomidan bir nechta talabaga ``GivePoint`` yozadi va balanslarni bitta tranzaksiyada oshiradi."""
+    with transaction.atomic():
+        gives = GivePoint.objects.bulk_create([
+            GivePoint(student_id=student_id, mentor_id=mentor_id, amount=amount, description=description)
+            for student_id, amount in amounts.items()
+        ])
+        add_points_bulk(amounts, 'mentor', description)
+    return gives
+
+
+def redeem_achievement(student_id, achievement_id):
+    """
+    Talaba ballari evaziga yutuqni sotib oladi va ``AchievementPurchase`` qaytaradi.
+
+    Ball ham, zaxira ham shartli bitta ``UPDATE`` bilan o'zgaradi (``points >= narx``,
+    ``amount > 0``), ``SELECT ... FOR UPDATE`` ishlatilmaydi. Zaxira eng oxirida kamaytiriladi:
+    ko'pchilik talashadigan yutuq qatori faqat commit'gacha band turadi. Shart bajarilmasa
+    butun tranzaksiya bekor bo'ladi: ``InsufficientPoints`` yoki ``OutOfStock``.
+    """
+    achievement = Achievement.objects.filter(pk=achievement_id).values('name', 'point_price', 'amount').first()
+    if achievement is None:
+        raise Achievement.DoesNotExist
+    if achievement['amount'] == 0:
+        raise OutOfStock(f"Achievement {achievement_id} is out of stock")
+    price = achievement['point_price']
+
+    with transaction.atomic():
+        add_points(student_id, -price, 'achievement', f"Yutuq: {achievement['name']}")
+        purchase = AchievementPurchase.objects.create(student_id=student_id, achievement_id=achievement_id, price=price)
+
+        # Narx o'qilgandan keyin o'zgargan bo'lsa ham eski narxda sotilmaydi
+        if not Achievement.objects.filter(pk=achievement_id, amount__gt=0, point_price=price).update(amount=F('amount') - 1):
+            raise OutOfStock(f"Achievement {achievement_id} is out of stock or its price has changed")
+        # update() signal yubormaydi: ro'yxat ETag'i va dashboard keshidagi zaxira eskirdi
+        versions.bump(Achievement)
+    return purchase
+
+
+def get_points(student_id):
+    return Student.objects.filter(pk=student_id).values_list('points', flat=True).get()
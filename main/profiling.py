@@ -0,0 +1,144 @@
+"""
+So'rovlar bo'yicha SQL va vaqt o'lchovi (``REQUEST_PROFILING = True`` bo'lganda).
+
+Har bir javobga ``Server-Timing`` sarlavhasi qo'shiladi va ``main.profiling`` logger'iga
+bitta JSON qator yoziladi::
+
+    Server-Timing: db;dur=12.4;desc="9 queries", view;dur=30.1, render;dur=1.3, total;dur=33.0
+
+Bosqichlar bir-birini qoplaydi: DRF serializer'lari view ichida ishlaydi, shuning uchun serializatsiya
+(va uning ichidagi lazy queryset'lar) ``view`` vaqtiga kiradi, ``db`` esa ikkalasida ham hisoblanadi.
+Alohida ``serializer`` bosqichi yo'q: uni o'lchash uchun ``BaseSerializer``'ni global almashtirish kerak bo'lardi.
+
+SQL ``execute_wrapper`` orqali shu so'rov oqimidagi ulanishlarda sanaladi. Middleware ataylab sinxron:
+ASGI ostida async view'ning ``sync_to_async(thread_sensitive=True)`` chaqiruvlari (async ORM ham) shu
+oqimda bajariladi va sanaladi. ``thread_sensitive=False`` yoki fon executor'lardagi
+(masalan ``images._executor``) so'rovlar boshqa oqimda ketadi va hisobga kirmaydi.
+
+N+1 belgisi ikki holatda qo'yiladi:
+
+* bitta SQL shabloni (parametrlarsiz) ``REQUEST_PROFILING_N_PLUS_ONE`` martadan ko'p bajarilgan;
+* shu route'ning oldingi so'roviga qaraganda natija qatorlari ham, so'rovlar soni ham o'sgan.
+"""
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# route -> (qatorlar, so'rovlar): o'sishni aniqlash uchun eng kichik natijali namuna
+_route_samples = {}
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.view_started = None
+        self.view_time = None
+        self.render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+
+def _result_rows(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict):
+        data = data.get('results')
+    return len(data) if isinstance(data, list) else None
+
+
+def _n_plus_one_reasons(route, rows, profile):
+    reasons = []
+    statement, repeats = profile.statements.most_common(1)[0] if profile.statements else (None, 0)
+    if repeats >= settings.REQUEST_PROFILING_N_PLUS_ONE:
+        reasons.append({'repeated_statement': statement, 'count': repeats})
+
+    if route and rows:
+        sample = _route_samples.get(route)
+        if sample is None or rows < sample[0]:
+            _route_samples[route] = (rows, profile.queries)
+        elif rows > sample[0] and profile.queries > sample[1]:
+            reasons.append({'grows_with_rows': {'rows': [sample[0], rows], 'queries': [sample[1], profile.queries]}})
+    return reasons
+
+
+class QueryProfilingMiddleware:
+    """
+    So'rov davomidagi barcha SQL'larni ``connection.execute_wrapper`` orqali sanaydi.
+    ``REQUEST_PROFILING`` o'chiq bo'lsa Django bu middleware'ni umuman yuklamaydi.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        request._profile = profile
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+
+        total = time.perf_counter() - profile.started
+        if profile.view_time is None and profile.view_started is not None:
+            profile.view_time = time.perf_counter() - profile.view_started
+        render_time = time.perf_counter() - profile.render_started if profile.render_started else 0.0
+
+        route = getattr(getattr(request, 'resolver_match', None), 'route', None)
+        rows = _result_rows(response)
+        reasons = _n_plus_one_reasons(route, rows, profile)
+
+        timings = [
+            f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"',
+            f'view;dur={(profile.view_time or 0) * 1000:.1f}',
+            f'render;dur={render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ]
+        response['Server-Timing'] = ', '.join(timings)
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'queries': profile.queries,
+            'db_ms': round(profile.db_time * 1000, 2),
+            'view_ms': round((profile.view_time or 0) * 1000, 2),
+            'render_ms': round(render_time * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'rows': rows,
+            'n_plus_one': bool(reasons),
+        }
+        if reasons:
+            record['n_plus_one_reasons'] = reasons
+        logger.log(logging.WARNING if reasons else logging.INFO, json.dumps(record), extra={'profile': record})
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF Response shu yerdan keyin render qilinadi
+        profile = request._profile
+        if profile.view_started is not None:
+            profile.view_time = time.perf_counter() - profile.view_started
+        profile.render_started = time.perf_counter()
+        return response
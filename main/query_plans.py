@@ -0,0 +1,61 @@
+"""
+API'dagi asosiy filter/tartib juftliklari va ularni qoplashi kerak bo'lgan indekslar.
+
+``explain_hot_queries`` buyrug'i va testlar har bir so'rov uchun EXPLAIN olib,
+rejada kutilgan indeks ishlatilayotganini tekshiradi.
+"""
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from .models import GivePoint, PointEvent, Student, StudentTestResult, TestSubmissionLog
+
+
+def hot_queries(student_id=1, mentor_id=1, group_id=1):
+    """(nomi, queryset, kutilgan indeks) ro'yxati."""
+    return [
+        ('latest test result of a student (StudentTestDetailView)',
+         StudentTestResult.objects.filter(student_id=student_id).order_by('-taken_at')[:1],
+         'result_student_taken_idx'),
+        ('points given to a student (GivePointListView ?student=)',
+         GivePoint.objects.filter(student_id=student_id).order_by('-created_at')[:51],
+         'givepoint_student_created_idx'),
+        ('points given by a mentor (GivePointListView ?mentor=)',
+         GivePoint.objects.filter(mentor_id=mentor_id).order_by('-created_at')[:51],
+         'givepoint_mentor_created_idx'),
+        ('group leaderboard top-N',
+         Student.objects.filter(group_id=group_id).order_by('-points', 'id')[:10],
+         'student_group_points_idx'),
+        ('global leaderboard top-N',
+         Student.objects.order_by('-points', 'id')[:10],
+         'student_points_idx'),
+        ('submission log of a student (TestSubmissionLogAPIView)',
+         TestSubmissionLog.objects.filter(student_id=student_id).order_by('-submitted_at'),
+         'submission_student_time_idx'),
+        ('point history of a student (StudentPointHistoryView)',
+         PointEvent.objects.filter(student_id=student_id).order_by('-created_at', '-id')[:51],
+         'pointevent_student_created_idx'),
+        ('point history of a student by type (StudentPointHistoryView ?point_type=)',
+         PointEvent.objects.filter(student_id=student_id, point_type='mentor').order_by('-created_at', '-id')[:51],
+         'pointevent_student_type_idx'),
+    ]
+
+
+@contextmanager
+def _planner(prefer_indexes):
+    with transaction.atomic():
+        if prefer_indexes and connection.vendor == 'postgresql':
+            # Kichik jadvallarda planner seq scan'ni afzal ko'radi; indeks ishlatila olishini tekshiramiz
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        yield
+
+
+def explain_hot_queries(prefer_indexes=False):
+    """Har bir so'rov uchun (nomi, kutilgan indeks, reja, indeks ishlatildimi)."""
+    results = []
+    with _planner(prefer_indexes):
+        for name, queryset, index in hot_queries():
+            plan = queryset.explain()
+            results.append((name, index, plan, index in plan))
+    return results
@@ -1,5 +1,24 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from .models import *
+from . import test_sessions
+from .authentication import add_role_claims, get_claims
+from .grading import AnswerKey, submit_answers
+from .images import variant_urls
+from .points import give_points_bulk
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Rasmning kichraytirilgan va WebP variantlari URL'lari (``main.images``)."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'image')
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get('request'))
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,15 +36,55 @@ class UserSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_role_claims(super().get_token(user), user)
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        try:
+            data = super().validate(attrs)
+            # Guruh yoki rol o'zgargan bo'lsa yangi access token eskirgan claim'larni olib yurmasin
+            refresh = self.token_class(attrs['refresh'])
+            user = User.objects.get(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]})
+        except User.DoesNotExist:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        access = refresh.access_token
+        data['access'] = str(add_role_claims(access, user))
+        return data
+
 class CourseSerializer(serializers.ModelSerializer):
     class Meta:
         model = Course
         fields = '__all__'
 
 class StudentSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Student
-        fields = '__all__'
+        # Ichki belgi: tayyor variantlar image_variants orqali beriladi
+        exclude = ['image_variants_of']
+        # Ball faqat main.points orqali (give-points, testlar, xaridlar) o'zgaradi
+        read_only_fields = ['points']
+
+class PointEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PointEvent
+        fields = ['id', 'amount', 'point_type', 'description', 'created_at']
+
+class PointHistoryFilterSerializer(serializers.Serializer):
+    """``date_from``/``date_to`` kunlar bo'yicha (ikkalasi ham kiradi), ``point_type`` ixtiyoriy."""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    point_type = serializers.ChoiceField(choices=POINT_TYPE_CHOICES, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError({'date_to': "Must not be earlier than date_from."})
+        return attrs
 
 class StudentUpdateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -42,20 +101,29 @@ class MentorSerializer(serializers.ModelSerializer):
     course_names = serializers.SerializerMethodField()
     my_test = serializers.SerializerMethodField()
     my_group_id = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Mentor
-        fields = ['id', 'name', 'birthday', 'image', 'point_limit', 'course_names', 'my_test' , 'my_group_id']
+        fields = ['id', 'name', 'birthday', 'image', 'image_variants', 'point_limit', 'course_names', 'my_test' , 'my_group_id']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Kurslar, testlar va guruhlar sahifa uchun bittadan so'rov bilan yuklanadi
+        return queryset.prefetch_related(
+            Prefetch('course', queryset=Course.objects.only('id', 'name')),
+            Prefetch('test_set', queryset=Test.objects.only('id', 'title', 'description', 'created_by_id').order_by('id')),
+            Prefetch('group_set', queryset=Group.objects.only('id').order_by('id')),
+        )
 
     def get_course_names(self, obj):
         return [course.name for course in obj.course.all()]
 
     def get_my_test(self, obj):
-        tests = Test.objects.filter(created_by=obj)
-        return [{"id": test.id,"title": test.title, "description": test.description} for test in tests]
+        return [{"id": test.id,"title": test.title, "description": test.description} for test in obj.test_set.all()]
 
     def get_my_group_id(self, obj):
-        return list(Group.objects.filter(mentors=obj).values_list('id', flat=True))
+        return [group.id for group in obj.group_set.all()]
 
 
 class MentorUpdateSerializer(serializers.ModelSerializer):
@@ -105,12 +173,79 @@ class GivePointSerializer(serializers.ModelSerializer):
         model = GivePoint
         fields = '__all__'
 
+class BulkAwardSerializer(serializers.Serializer):
+    student = serializers.IntegerField()
+    amount = serializers.IntegerField(min_value=1)
+
+class BulkGivePointSerializer(serializers.Serializer):
+    """
+    Butun guruhga (``group`` + ``amount``) yoki talabalar ro'yxatiga (``awards``) ball berish.
+    Mentor o'z nomidan beradi; admin ``mentor`` ni ko'rsatishi kerak.
+    """
+    mentor = serializers.IntegerField(required=False)
+    group = serializers.IntegerField(required=False)
+    amount = serializers.IntegerField(min_value=1, required=False)
+    awards = BulkAwardSerializer(many=True, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate(self, attrs):
+        mentor_id = self.get_mentor_id(attrs)
+        point_limit = Mentor.objects.filter(pk=mentor_id).values_list('point_limit', flat=True).first()
+        if point_limit is None:
+            raise serializers.ValidationError({"mentor": "Mentor not found."})
+
+        if ('group' in attrs) == ('awards' in attrs):
+            raise serializers.ValidationError("Provide either 'group' or 'awards'.")
+
+        if 'group' in attrs:
+            if 'amount' not in attrs:
+                raise serializers.ValidationError({"amount": "This field is required with 'group'."})
+            student_ids = Student.objects.filter(group_id=attrs['group']).values_list('id', flat=True)
+            amounts = {student_id: attrs['amount'] for student_id in student_ids}
+            if not amounts:
+                raise serializers.ValidationError({"group": "Group has no students."})
+        else:
+            amounts = {}
+            for award in attrs['awards']:
+                if award['student'] in amounts:
+                    raise serializers.ValidationError({"awards": f"Student {award['student']} listed more than once."})
+                amounts[award['student']] = award['amount']
+            missing = set(amounts) - set(Student.objects.filter(pk__in=amounts).values_list('id', flat=True))
+            if missing:
+                raise serializers.ValidationError({"awards": f"Students not found: {sorted(missing)}"})
+            if not amounts:
+                raise serializers.ValidationError({"awards": "You must provide at least one award."})
+
+        if max(amounts.values()) > point_limit:
+            raise serializers.ValidationError(f"Mentor can give max {point_limit} points")
+
+        attrs['mentor_id'] = mentor_id
+        attrs['amounts'] = amounts
+        return attrs
+
+    def get_mentor_id(self, attrs):
+        user = self.context['request'].user
+        claims = get_claims(user)
+        if claims is not None:
+            mentor_id = claims['mentor_id']
+        else:
+            mentor_id = Mentor.objects.filter(user=user).values_list('id', flat=True).first()
+        if mentor_id is None:
+            mentor_id = attrs.get('mentor')
+            if mentor_id is None:
+                raise serializers.ValidationError({"mentor": "This field is required."})
+        return mentor_id
+
+    def create(self, validated_data):
+        return give_points_bulk(validated_data['mentor_id'], validated_data['amounts'], validated_data.get('description'))
+
 class QuestionSerializer(serializers.ModelSerializer):
     test_description = serializers.SerializerMethodField()
     test_title = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
     class Meta:
         model = Question
-        fields = ['id', 'text', 'image', 'test_description', 'test_title', 'test']
+        fields = ['id', 'text', 'image', 'image_variants', 'test_description', 'test_title', 'test']
 
     def get_test_description(self, obj):
         return obj.test.description
@@ -121,10 +256,11 @@ class QuestionSerializer(serializers.ModelSerializer):
 class AnswerOptionSerializer(serializers.ModelSerializer):
     test_id = serializers.SerializerMethodField()
     question_text = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = AnswerOption
-        fields = ['id', 'question', 'question_text', 'test_id', 'label', 'image', 'text', 'is_correct']
+        fields = ['id', 'question', 'question_text', 'test_id', 'label', 'image', 'image_variants', 'text', 'is_correct']
 
     def get_test_id(self, obj):
         return obj.question.test.id
@@ -154,78 +290,107 @@ class QuestionWithOptionsSerializer(serializers.ModelSerializer):
             AnswerOption.objects.create(question=question, **option_data)
         return question
 
+class TestPaperOptionSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
+    class Meta:
+        model = AnswerOption
+        fields = ['id', 'label', 'text', 'image', 'image_variants', 'is_correct']
+
+
+class TestPaperQuestionSerializer(serializers.ModelSerializer):
+    options = TestPaperOptionSerializer(many=True)
+    image_variants = ImageVariantsField()
+
+    class Meta:
+        model = Question
+        fields = ['id', 'text', 'image', 'image_variants', 'options']
+
+
+class TestPaperSerializer(serializers.ModelSerializer):
+    questions = TestPaperQuestionSerializer(many=True)
+
+    class Meta:
+        model = Test
+        fields = ['id', 'title', 'description', 'duration_minutes', 'questions']
+
 class AchievementSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Achievement
-        fields = '__all__'
+        # Ichki belgi: tayyor variantlar image_variants orqali beriladi
+        exclude = ['image_variants_of']
+
+class AchievementPurchaseSerializer(serializers.ModelSerializer):
+    achievement_name = serializers.CharField(source='achievement.name', read_only=True)
+
+    class Meta:
+        model = AchievementPurchase
+        fields = ['id', 'student', 'achievement', 'achievement_name', 'price', 'created_at']
 
 class CourseListSerializer(serializers.ModelSerializer):
-    students = serializers.SerializerMethodField()
+    student_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Course
-        fields = ['id', 'name', 'students']
+        fields = ['id', 'name', 'student_count']
 
-    def get_students(self, obj):
-        students = Student.objects.filter(group__courses=obj)
-        return students.values('id', 'name')
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # ?include=students rejimida ro'yxatlar view tomonidan bitta so'rovda yuklanadi
+        rosters = self.context.get('rosters')
+        if rosters is not None:
+            data['students'] = rosters.get(instance.id, [])
+        return data
+
+
+class CourseStudentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Student
+        fields = ['id', 'name']
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    image_variants = ImageVariantsField()
+
+    class Meta:
+        model = Student
+        fields = ['rank', 'id', 'name', 'points', 'image', 'image_variants']
 
 
 class AnswerSubmissionSerializer(serializers.Serializer):
     question_id = serializers.IntegerField()
     answer_option_id = serializers.IntegerField()
 
-class SubmitTestSerializer(serializers.Serializer):
+class SubmitTestPayloadSerializer(serializers.Serializer):
+    """So'rov tanasining shakli; bazaga murojaat qilmaydi (async view ham ishlatadi)."""
     test_id = serializers.IntegerField()
     answers = AnswerSubmissionSerializer(many=True)
 
+class SubmitTestSerializer(SubmitTestPayloadSerializer):
     def validate(self, attrs):
-        test_id = attrs.get('test_id')
         answers = attrs.get('answers')
 
         if not answers:
             raise serializers.ValidationError({"answers": "You must provide at least one answer."})
 
-        try:
-            test = Test.objects.get(id=test_id)
-        except Test.DoesNotExist:
+        key = AnswerKey.load(attrs.get('test_id'))
+        if key is None:
             raise serializers.ValidationError({"test_id": "Test not found."})
 
-        for answer in answers:
-            try:
-                question = Question.objects.get(id=answer['question_id'], test=test)
-            except Question.DoesNotExist:
-                raise serializers.ValidationError(
-                    {"question_id": f"Question {answer['question_id']} not found in this test."})
-
-            try:
-                option = AnswerOption.objects.get(id=answer['answer_option_id'], question=question)
-            except AnswerOption.DoesNotExist:
-                raise serializers.ValidationError({
-                                                      "answer_option_id": f"Answer option {answer['answer_option_id']} does not belong to question {answer['question_id']}."})
+        # user.student create() da ham kerak, shuning uchun bitta so'rov
+        if test_sessions.blocks_direct_submit(self.context['request'].user.student.pk, key.test.id):
+            raise serializers.ValidationError({"test_id": test_sessions.DIRECT_SUBMIT_BLOCKED})
 
+        key.validate(answers)
+        self.answer_key = key
         return attrs
 
     def create(self, validated_data):
         student = self.context['request'].user.student
-        test = Test.objects.get(id=validated_data['test_id'])
-
-        if StudentTestResult.objects.filter(student=student, test=test).exists():
-            raise serializers.ValidationError("You have already submitted this test.")
-
-        answers = validated_data['answers']
-        if not answers:
-            raise serializers.ValidationError({"answers": "You must provide at least one answer."})
-
-        result = StudentTestResult.objects.create(student=student, test=test)
-
-        for answer in validated_data['answers']:
-            question = Question.objects.get(id=answer['question_id'])
-            option = AnswerOption.objects.get(id=answer['answer_option_id'])
-            StudentAnswer.objects.create(result=result, question=question, answer_option=option)
-
-        result.update_score()
-        return result
+        return submit_answers(student, self.answer_key, validated_data['answers'])
 
 
 
@@ -0,0 +1,196 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import leaderboard, test_paper, versions
+from .authentication import revoke_tokens
+from .images import schedule_derivatives
+from .models import Achievement, AnswerOption, Course, Group, LeaderboardBucket, Mentor, Question, Student, Test, User
+
+
+@receiver(pre_save, sender=Student)
+def remember_leaderboard_position(sender, instance, raw=False, **kwargs):
+    instance._leaderboard_position = None
+    if not raw and instance.pk:
+        instance._leaderboard_position = Student.objects.filter(pk=instance.pk).values_list('group_id', 'points').first()
+
+
+@receiver(post_save, sender=Student)
+def update_leaderboard_on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    old = getattr(instance, '_leaderboard_position', None)
+    if old is not None and update_fields is not None and 'points' not in update_fields:
+        # Ball yozilmadi: bazadagi qiymat haqiqiy
+        instance.points = old[1]
+    new = (instance.group_id, instance.points)
+    if created or old is None:
+        leaderboard.add(*new)
+    elif old != new:
+        if old[0] == new[0]:
+            leaderboard.move(new[0], old[1], new[1])
+        else:
+            leaderboard.remove(*old)
+            leaderboard.add(*new)
+
+
+@receiver(post_delete, sender=Student)
+def update_leaderboard_on_delete(sender, instance, **kwargs):
+    leaderboard.remove(instance.group_id, instance.points)
+
+
+@receiver(m2m_changed, sender=Group.courses.through)
+def rebuild_course_leaderboards(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+
+    if action == 'pre_clear':
+        # post_clear signalida pk_set bo'lmaydi, shuning uchun tozalanadigan kurslarni oldindan eslab qolamiz
+        if reverse:
+            instance._cleared_courses = {instance.pk}
+        else:
+            instance._cleared_courses = set(instance.courses.values_list('id', flat=True))
+        return
+
+    if action == 'post_clear':
+        course_ids = getattr(instance, '_cleared_courses', set())
+    elif reverse:
+        course_ids = {instance.pk}
+    else:
+        course_ids = pk_set or set()
+
+    leaderboard.rebuild([leaderboard.course_scope(course_id) for course_id in course_ids])
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_courses(sender, instance, **kwargs):
+    instance._leaderboard_courses = list(instance.courses.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def drop_group_leaderboards(sender, instance, **kwargs):
+    LeaderboardBucket.objects.filter(scope=leaderboard.group_scope(instance.pk)).delete()
+    leaderboard.rebuild([leaderboard.course_scope(course_id) for course_id in getattr(instance, '_leaderboard_courses', [])])
+
+
+@receiver(post_save, sender=Test)
+@receiver(post_delete, sender=Test)
+def bump_test_paper_on_test_change(sender, instance, **kwargs):
+    test_paper.bump_version(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def bump_test_paper_on_question_change(sender, instance, **kwargs):
+    test_paper.bump_version(instance.test_id)
+
+
+@receiver(post_save, sender=AnswerOption)
+@receiver(post_delete, sender=AnswerOption)
+def bump_test_paper_on_option_change(sender, instance, **kwargs):
+    test_paper.bump_version(Question.objects.filter(pk=instance.question_id).values_list('test_id', flat=True).first())
+
+
+@receiver([post_save, post_delete], sender=Course)
+@receiver([post_save, post_delete], sender=Group)
+@receiver([post_save, post_delete], sender=Mentor)
+@receiver([post_save, post_delete], sender=Student)
+@receiver([post_save, post_delete], sender=Test)
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=Achievement)
+@receiver(m2m_changed, sender=Group.courses.through)
+@receiver(m2m_changed, sender=Group.mentors.through)
+@receiver(m2m_changed, sender=Test.groups.through)
+def bump_model_version(sender, raw=False, **kwargs):
+    # M2M o'zgarishida sender - oraliq jadval modeli, uning versiyasi alohida
+    if not raw:
+        versions.bump(sender)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Mentor)
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=AnswerOption)
+@receiver(post_save, sender=Achievement)
+def generate_image_derivatives(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    test_id = None
+    if sender is Question:
+        test_id = instance.test_id
+    elif sender is AnswerOption:
+        test_id = Question.objects.filter(pk=instance.question_id).values_list('test_id', flat=True).first()
+
+    name = instance.image.name
+
+    def derivatives_ready():
+        # Rasm shu orada almashtirilgan bo'lsa belgi qo'yilmaydi; UPDATE signallarni qayta chaqirmaydi
+        marked = (sender.objects.filter(pk=instance.pk, image=name).exclude(image_variants_of=name)
+                  .update(image_variants_of=name))
+        if marked:
+            # image_variants o'zgardi: ETag va test qog'ozi versiyalari yangilanadi
+            versions.bump(sender)
+            test_paper.bump_version(test_id)
+
+    schedule_derivatives(instance.image, derivatives_ready)
+
+
+# Token claim'lariga (rol, student_id/mentor_id, group_ids) ta'sir qiladigan o'zgarishlar
+TOKEN_USER_FIELDS = ('is_active', 'password', 'role', 'is_superuser')
+
+
+@receiver(pre_save, sender=User)
+def remember_token_fields(sender, instance, raw=False, **kwargs):
+    instance._token_fields = None
+    if not raw and instance.pk:
+        instance._token_fields = User.objects.filter(pk=instance.pk).values_list(*TOKEN_USER_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_user_change(sender, instance, created, raw=False, **kwargs):
+    old = getattr(instance, '_token_fields', None)
+    if not raw and not created and old != tuple(getattr(instance, field) for field in TOKEN_USER_FIELDS):
+        revoke_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    revoke_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Student)
+def revoke_tokens_on_student_group_change(sender, instance, created, raw=False, **kwargs):
+    old = getattr(instance, '_leaderboard_position', None)
+    if not raw and (created or old is None or old[0] != instance.group_id):
+        revoke_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=Mentor)
+def revoke_tokens_on_mentor_create(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        revoke_tokens(instance.user_id)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Mentor)
+def revoke_tokens_on_profile_delete(sender, instance, **kwargs):
+    revoke_tokens(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Group.mentors.through)
+def revoke_mentor_tokens_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        user_ids = [instance.user_id]
+    elif action == 'pre_clear':
+        user_ids = instance.mentors.values_list('user_id', flat=True)
+    else:
+        user_ids = Mentor.objects.filter(pk__in=pk_set or ()).values_list('user_id', flat=True)
+    for user_id in user_ids:
+        revoke_tokens(user_id)
+
+
+@receiver(pre_delete, sender=Group)
+def revoke_mentor_tokens_on_group_delete(sender, instance, **kwargs):
+    for user_id in instance.mentors.values_list('user_id', flat=True):
+        revoke_tokens(user_id)
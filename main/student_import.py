@@ -0,0 +1,298 @@
+"""
+CSV/XLSX fayldan talabalarni ommaviy import qilish.
+
+Ustunlar: ``username``, ``password``, ``name``, ``birth_date`` (``YYYY-MM-DD`` yoki ``DD.MM.YYYY``),
+``group`` (id yoki nom), ixtiyoriy ``bio``. Fayl ikki marta oqim bilan o'qiladi: birinchi o'tish
+faqat formatni tekshiradi (buzilgan fayl hech narsa saqlanmasdan rad etiladi), ikkinchisida qatorlar
+``BATCH_SIZE`` tadan tekshiriladi; parollar process pool'da parallel hash qilinadi, ``User`` va
+``Student`` qatorlari ``bulk_create`` bilan yoziladi. Xotirada bir vaqtda bitta partiya turadi.
+Xato qatorlar hisobotga tushadi, qolganlari import qilinaveradi.
+
+API va admin importi so'rov ichida bajarilmaydi: ``start_import`` faylni vaqtinchalik saqlab fon
+oqimida ishga tushiradi, holat va hisobot ``import_status`` bilan keshdan o'qiladi.
+"""
+import csv
+import datetime
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from xml.etree.ElementTree import ParseError
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+
+from . import leaderboard, versions
+from .models import Group, Student, User
+
+BATCH_SIZE = 500
+# Bundan kam parol shu process'da hash qilinadi: pool ishga tushirish qimmatroq
+POOL_MIN_ROWS = 16
+REQUIRED_COLUMNS = ('username', 'password', 'name', 'birth_date', 'group')
+DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y')
+JOB_TIMEOUT = 60 * 60 * 24
+
+logger = logging.getLogger(__name__)
+_jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix='student-import')
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+def _read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+        from openpyxl.utils.exceptions import InvalidFileException
+    except ImportError:
+        raise ImportFormatError("XLSX import requires openpyxl (pip install openpyxl)")
+
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, ValueError, ParseError) as e:
+        raise ImportFormatError(f"Invalid XLSX file: {e}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+        for values in rows:
+            if any(value not in (None, '') for value in values):
+                yield dict(zip(header, values))
+    except (zipfile.BadZipFile, KeyError, ValueError, ParseError) as e:
+        raise ImportFormatError(f"Invalid XLSX file: {e}")
+    finally:
+        workbook.close()
+
+
+READERS = {'.csv': _read_csv, '.xlsx': _read_xlsx, '.xlsm': _read_xlsx}
+
+
+def _reader(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in READERS:
+        raise ImportFormatError(f"Unsupported file type: {ext or filename}")
+    return READERS[ext]
+
+
+def iter_rows(file, filename):
+    """Fayl turini kengaytmadan aniqlab qatorlarni dict ko'rinishida beradi."""
+    return _reader(filename)(file)
+
+
+def read_rows(file, filename):
+    """``iter_rows``, kodlash va CSV xatolari ``ImportFormatError`` sifatida."""
+    try:
+        yield from iter_rows(file, filename)
+    except UnicodeDecodeError:
+        raise ImportFormatError("CSV file must be UTF-8 encoded")
+    except csv.Error as e:
+        raise ImportFormatError(f"Invalid CSV file: {e}")
+
+
+def check_format(file, filename):
+    """Birinchi o'tish: faylni oxirigacha o'qib tashlaydi, so'ng boshiga qaytaradi."""
+    for _ in read_rows(file, filename):
+        pass
+    file.seek(0)
+
+
+def _parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class StudentImporter:
+    def __init__(self, workers=None, batch_size=BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.created = 0
+        self.rows = 0
+        self.errors = []
+        self.seen_usernames = set()
+        self.pool = None
+        # Guruhlar jadvali kichik: id va nom bo'yicha bir marta yuklanadi
+        self.groups = {}
+        for group_id, name in Group.objects.values_list('id', 'name'):
+            self.groups[str(group_id)] = group_id
+            self.groups.setdefault(name.strip().lower(), group_id)
+
+    def run(self, rows):
+        try:
+            batch = []
+            for number, row in enumerate(rows, start=2):  # 1-qator sarlavha
+                self.rows += 1
+                batch.append((number, row))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+        return self.report()
+
+    def hash_passwords(self, passwords):
+        """
+        Pool ``spawn`` bilan ishga tushadi: import web worker'ning fon oqimida ham ishlaydi, ``fork``
+        esa boshqa oqimlar ushlab turgan qulflarni bola process'ga ko'chirib qo'yishi mumkin.
+        """
+        if len(passwords) < POOL_MIN_ROWS:
+            return [make_password(password) for password in passwords]
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup,
+            )
+        chunksize = max(1, len(passwords) // ((self.workers or os.cpu_count() or 1) * 4))
+        return list(self.pool.map(make_password, passwords, chunksize=chunksize))
+
+    def report(self):
+        return {'rows': self.rows, 'created': self.created, 'errors': self.errors}
+
+    def validate(self, number, row):
+        values = {column: _clean(row.get(column)) for column in REQUIRED_COLUMNS}
+        errors = {column: 'This field is required.' for column, value in values.items() if not value}
+
+        if values['birth_date']:
+            birth_date = _parse_date(row.get('birth_date'))
+            if birth_date is None:
+                errors['birth_date'] = 'Expected YYYY-MM-DD or DD.MM.YYYY.'
+        group_id = self.groups.get(values['group']) or self.groups.get(values['group'].lower())
+        if values['group'] and group_id is None:
+            errors['group'] = f"Group '{values['group']}' not found."
+        if values['username'] in self.seen_usernames:
+            errors['username'] = 'Duplicate username in file.'
+
+        if errors:
+            self.errors.append({'row': number, 'errors': errors})
+            return None
+        self.seen_usernames.add(values['username'])
+        return {
+            'row': number,
+            'username': values['username'],
+            'password': values['password'],
+            'name': values['name'],
+            'birth_date': birth_date,
+            'group_id': group_id,
+            'bio': _clean(row.get('bio')) or None,
+        }
+
+    def import_batch(self, batch):
+        valid = [item for item in (self.validate(number, row) for number, row in batch) if item is not None]
+
+        taken = set(User.objects.filter(username__in=[item['username'] for item in valid]).values_list('username', flat=True))
+        for item in valid:
+            if item['username'] in taken:
+                self.errors.append({'row': item['row'], 'errors': {'username': 'A user with that username already exists.'}})
+        valid = [item for item in valid if item['username'] not in taken]
+        if not valid:
+            return
+
+        hashes = self.hash_passwords([item['password'] for item in valid])
+        for item, password in zip(valid, hashes):
+            item['password'] = password
+
+        try:
+            with transaction.atomic():
+                self.save(valid)
+            self.created += len(valid)
+        except IntegrityError:
+            # Parallel yaratilgan username: qatorlarni alohida saqlab, faqat to'qnashganini xato deb belgilaymiz
+            for item in valid:
+                try:
+                    with transaction.atomic():
+                        self.save([item])
+                    self.created += 1
+                except IntegrityError:
+                    self.errors.append({'row': item['row'], 'errors': {'username': 'A user with that username already exists.'}})
+
+    def save(self, items):
+        users = User.objects.bulk_create([
+            User(username=item['username'], password=item['password'], role='STUDENT') for item in items
+        ])
+        students = Student.objects.bulk_create([
+            Student(user=user, name=item['name'], birth_date=item['birth_date'], group_id=item['group_id'], bio=item['bio'])
+            for user, item in zip(users, items)
+        ])
+        # bulk_create signal yubormaydi, reyting bucket'larini va versiyani o'zimiz yangilaymiz
+        leaderboard.add_many([(student.group_id, student.points) for student in students])
+        versions.bump(Student)
+
+
+def import_students(file, filename, workers=None, batch_size=BATCH_SIZE):
+    check_format(file, filename)
+    return StudentImporter(workers=workers, batch_size=batch_size).run(read_rows(file, filename))
+
+
+def _job_key(job_id):
+    return f'student-import:{job_id}'
+
+
+def start_import(upload, filename):
+    """Yuklangan faylni vaqtinchalik faylga yozib, importni fon oqimida boshlaydi; job id qaytaradi."""
+    _reader(filename)
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1].lower(), delete=False) as f:
+        for chunk in upload.chunks():
+            f.write(chunk)
+    job_id = uuid.uuid4().hex
+    cache.set(_job_key(job_id), {'status': 'pending'}, JOB_TIMEOUT)
+    _jobs.submit(_run_in_thread, job_id, f.name, filename)
+    return job_id
+
+
+def run_job(job_id, path, filename):
+    """Fon importi: hisobot yoki xato keshga yoziladi, vaqtinchalik fayl o'chiriladi."""
+    cache.set(_job_key(job_id), {'status': 'running'}, JOB_TIMEOUT)
+    try:
+        with open(path, 'rb') as f:
+            state = {'status': 'done', **import_students(f, filename)}
+    except ImportFormatError as e:
+        state = {'status': 'failed', 'error': str(e)}
+    except Exception:
+        logger.exception("Student import %s failed", job_id)
+        state = {'status': 'failed', 'error': "Import failed."}
+    finally:
+        os.remove(path)
+    cache.set(_job_key(job_id), state, JOB_TIMEOUT)
+
+
+def _run_in_thread(job_id, path, filename):
+    try:
+        run_job(job_id, path, filename)
+    finally:
+        # Fon oqimining DB ulanishi ochiq qolmasin
+        connection.close()
+
+
+def import_status(job_id):
+    """``{'status': 'pending' | 'running' | 'done' | 'failed', ...}`` yoki noma'lum job uchun ``None``."""
+    return cache.get(_job_key(job_id))
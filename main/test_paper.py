@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from . import versions
+from .models import AnswerOption, Question, Test
+
+PAPER_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(test_id):
+    return f'test-paper-version:{test_id}'
+
+
+def get_version(test_id):
+    """
+    Test mazmunining joriy versiyasi. Versiya tasodifiy token, shuning uchun kesh uni
+    o'chirib yuborsa ham eski nusxalar bilan to'qnashmaydi.
+    """
+    return versions.key_tokens([_version_key(test_id)])[0]
+
+
+def bump_version(test_id):
+    # Darhol va commit'dan keyin yana: parallel so'rov commit'dan oldingi qog'ozni yangi versiyaga yozib qo'ymasin
+    if test_id is not None:
+        versions.bump_keys(_version_key(test_id))
+
+
+def build_paper(test_id):
+    from .serializers import TestPaperSerializer
+
+    options = AnswerOption.objects.order_by('label', 'id')
+    test = (
+        Test.objects.filter(pk=test_id)
+        .prefetch_related(Prefetch('questions', queryset=Question.objects.order_by('id').prefetch_related(Prefetch('options', queryset=options))))
+        .first()
+    )
+    if test is None:
+        return None
+    return TestPaperSerializer(test).data
+
+
+def strip_answers(paper):
+    return {
+        **paper,
+        'questions': [
+            {
+                **question,
+                'options': [{k: v for k, v in option.items() if k != 'is_correct'} for option in question['options']],
+            }
+            for question in paper['questions']
+        ],
+    }
+
+
+def get_paper(test_id, with_answers):
+    """Test savollari va variantlari; ``with_answers=False`` bo'lsa ``is_correct`` olib tashlanadi."""
+    version = get_version(test_id)
+    variant = 'full' if with_answers else 'student'
+    key = f'test-paper:{test_id}:{version}:{variant}'
+
+    paper = cache.get(key)
+    if paper is None:
+        paper = build_paper(test_id)
+        if paper is None:
+            return None
+        full = paper
+        student = strip_answers(full)
+        cache.set_many({
+            f'test-paper:{test_id}:{version}:full': full,
+            f'test-paper:{test_id}:{version}:student': student,
+        }, PAPER_TIMEOUT)
+        paper = full if with_answers else student
+    return paper
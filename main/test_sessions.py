@@ -0,0 +1,219 @@
+"""
+Vaqti server tomonidan belgilanadigan test sessiyalari.
+
+Sessiya boshlanganda ``deadline = started_at + Test.duration_minutes``. Avtosaqlangan javoblar
+asosiy jadvallarga emas, ``TEST_SESSION_CACHE`` keshiga yoziladi (har savol alohida kalit,
+shuning uchun parallel bosishlar bir-birini o'chirmaydi) va test kaliti ham keshdagi
+``test_paper`` dan olinadi - Redis bilan avtosaqlash bazaga umuman murojaat qilmaydi. Bufer
+faqat Redis yoki DB kesh jadvalida turadi (main.E001): fayl keshi har yozuvda papkani skanerlaydi.
+
+Topshirilganda yoki muddat o'tganda ``finish`` javoblarni bazadagi kalit bilan baholab, bitta
+to'plam sifatida ``grading.submit_answers`` orqali (bulk_create) saqlaydi. Sessiyasi bor testni
+to'g'ridan-to'g'ri yuborish endpoint'lari qabul qilmaydi (``blocks_direct_submit``). Muddati o'tgan, lekin hech kim
+murojaat qilmagan sessiyalarni ``close_expired_test_sessions`` buyrug'i yopadi.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import test_paper
+from .grading import AnswerKey, submit_answers
+from .models import StudentTestResult, Test, TestSession
+
+
+DIRECT_SUBMIT_BLOCKED = "This test was started as a timed session; submit it via test-sessions/<id>/submit/."
+
+
+class SessionClosed(Exception):
+    pass
+
+
+def _cache():
+    return caches[settings.TEST_SESSION_CACHE]
+
+
+def _meta_key(session_id):
+    return f'test-session:{session_id}'
+
+
+def _answer_key(session_id, question_id):
+    return f'test-session:{session_id}:q:{question_id}'
+
+
+def _grace():
+    return datetime.timedelta(seconds=settings.TEST_SESSION_GRACE_SECONDS)
+
+
+def _timeout(meta):
+    # Muddat + imtiyoz vaqtidan keyin ham bir soat saqlanadi: yopish buyrug'i kechiksa ham javoblar yo'qolmasin
+    return max(int((meta['deadline'] + _grace() - timezone.now()).total_seconds()), 0) + 60 * 60
+
+
+def _to_meta(session):
+    return {
+        'id': session.id,
+        'student_id': session.student_id,
+        'test_id': session.test_id,
+        'started_at': session.started_at,
+        'deadline': session.deadline,
+        'submitted_at': session.submitted_at,
+        'result_id': session.result_id,
+    }
+
+
+def get_meta(session_id):
+    """Sessiya holati: avval keshdan, bo'lmasa bazadan (va keshga qaytariladi)."""
+    meta = _cache().get(_meta_key(session_id))
+    if meta is None:
+        session = TestSession.objects.filter(pk=session_id).first()
+        if session is None:
+            return None
+        meta = _to_meta(session)
+        if meta['submitted_at'] is None:
+            _cache().set(_meta_key(session_id), meta, _timeout(meta))
+    return meta
+
+
+def is_expired(meta, now=None):
+    return (now or timezone.now()) > meta['deadline'] + _grace()
+
+
+def start(student_id, test_id):
+    """
+    Yangi sessiya ochadi yoki ochiq sessiyani davom ettiradi. Test talabaning guruhiga
+    berilmagan bo'lsa ``None``; allaqachon topshirilgan bo'lsa ``SessionClosed``.
+    """
+    test = Test.objects.filter(pk=test_id, groups__student=student_id).only('id', 'duration_minutes').first()
+    if test is None:
+        return None
+    if StudentTestResult.objects.filter(student_id=student_id, test_id=test_id).exists():
+        raise SessionClosed("You have already submitted this test.")
+
+    now = timezone.now()
+    session, _ = TestSession.objects.get_or_create(
+        student_id=student_id, test_id=test_id,
+        defaults={'started_at': now, 'deadline': now + datetime.timedelta(minutes=test.duration_minutes)},
+    )
+    meta = _to_meta(session)
+    if meta['submitted_at'] is not None:
+        raise SessionClosed("You have already submitted this test.")
+    if is_expired(meta, now):
+        finish(session.id)
+        raise SessionClosed("Time is up.")
+
+    _cache().set(_meta_key(session.id), meta, _timeout(meta))
+    return meta
+
+
+def _paper(meta):
+    """Test o'chirilgan bo'lsa sessiya ham o'chgan (CASCADE): keshdagi holat tashlanadi, ``SessionClosed``."""
+    paper = test_paper.get_paper(meta['test_id'], with_answers=True)
+    if paper is None:
+        _cache().delete(_meta_key(meta['id']))
+        raise SessionClosed("This test no longer exists.")
+    return paper
+
+
+def saved_answers(meta, question_ids=None):
+    """Buferdagi javoblar ``{question_id: answer_option_id}``."""
+    if question_ids is None:
+        question_ids = [question['id'] for question in _paper(meta)['questions']]
+    keys = {question_id: _answer_key(meta['id'], question_id) for question_id in question_ids}
+    stored = _cache().get_many(list(keys.values()))
+    return {question_id: stored[key] for question_id, key in keys.items() if key in stored}
+
+
+def autosave(meta, answers):
+    """
+    Javoblarni buferga yozadi. Muddat o'tgan bo'lsa sessiyani yopadi va ``SessionClosed``.
+    Noto'g'ri savol/variant ``serializers.ValidationError`` beradi.
+    """
+    if meta['submitted_at'] is not None:
+        raise SessionClosed("This session is already submitted.")
+    if is_expired(meta):
+        finish(meta['id'])
+        raise SessionClosed("Time is up.")
+
+    key = AnswerKey.from_paper(_paper(meta))
+    key.validate(answers)
+    _cache().set_many(
+        {_answer_key(meta['id'], answer['question_id']): answer['answer_option_id'] for answer in answers},
+        _timeout(meta),
+    )
+
+
+def finish(session_id):
+    """
+    Buferdagi javoblarni bitta tranzaksiyada baholab saqlaydi va sessiyani yopadi.
+    Ikki marta chaqirilsa ham bir marta saqlanadi va o'sha ``StudentTestResult`` qaytadi;
+    natija topilmasa (masalan admin o'chirgan) ``SessionClosed``.
+    """
+    with transaction.atomic():
+        # Compare-and-set: submit va muddat bo'yicha yopish bir vaqtda kelsa faqat bittasi saqlaydi
+        if not TestSession.objects.filter(pk=session_id, submitted_at__isnull=True).update(submitted_at=timezone.now()):
+            session = TestSession.objects.filter(pk=session_id).values('student_id', 'test_id').first()
+            result = StudentTestResult.objects.filter(**session).first() if session else None
+            if result is None:
+                raise SessionClosed("This session is already closed.")
+            return result
+
+        session = TestSession.objects.select_related('student').get(pk=session_id)
+        # Kalit bazadan: mentor is_correct'ni tuzatgan bo'lsa eski keshlangan qog'oz bilan baholanmaydi
+        key = AnswerKey.load(session.test_id)
+
+        # Avtosaqlashdan keyin test o'zgargan bo'lsa, endi mavjud bo'lmagan variantlar tashlab yuboriladi
+        answers = [
+            {'question_id': question_id, 'answer_option_id': option_id}
+            for question_id, option_id in saved_answers(_to_meta(session), key.question_ids).items()
+            if key.options.get(option_id, (None,))[0] == question_id
+        ]
+        try:
+            result = submit_answers(session.student, key, answers)
+        except serializers.ValidationError:
+            # Sessiya ochilishidan oldin to'g'ridan-to'g'ri yuborilgan natija bilan poyga
+            result = StudentTestResult.objects.get(student_id=session.student_id, test_id=session.test_id)
+        TestSession.objects.filter(pk=session_id).update(result=result)
+
+    keys = [_answer_key(session_id, question_id) for question_id in key.question_ids]
+    _cache().delete_many(keys + [_meta_key(session_id)])
+    return result
+
+
+def close_expired(now=None):
+    """Muddati (imtiyoz vaqti bilan) o'tgan ochiq sessiyalarni yopadi; yopilganlar sonini qaytaradi."""
+    cutoff = (now or timezone.now()) - _grace()
+    closed = 0
+    for session_id in TestSession.objects.filter(submitted_at__isnull=True, deadline__lt=cutoff).values_list('id', flat=True):
+        try:
+            finish(session_id)
+        except SessionClosed:
+            continue
+        closed += 1
+    return closed
+
+
+def blocks_direct_submit(student_id, test_id):
+    """Sessiya bilan boshlangan testni ``api/tests/submit/answers/`` orqali muddatni chetlab yuborib bo'lmaydi."""
+    return TestSession.objects.filter(student_id=student_id, test_id=test_id).exists()
+
+
+async def ablocks_direct_submit(student_id, test_id):
+    return await TestSession.objects.filter(student_id=student_id, test_id=test_id).aexists()
+
+
+def state(meta, now=None):
+    now = now or timezone.now()
+    return {
+        'id': meta['id'],
+        'test': meta['test_id'],
+        'started_at': meta['started_at'],
+        'deadline': meta['deadline'],
+        'server_time': now,
+        'remaining_seconds': max(int((meta['deadline'] - now).total_seconds()), 0),
+        'submitted_at': meta['submitted_at'],
+        'result': meta['result_id'],
+    }
@@ -1,3 +1,1221 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .models import *
+from . import images, item_stats, leaderboard, signals, student_import, test_paper, test_sessions
+from .grading import AnswerKey, submit_answers
+from .images import make_derivatives, variant_urls
+from .points import InsufficientPoints, add_points
+from .query_plans import explain_hot_queries
+from .serializers import RoleTokenObtainPairSerializer, StudentSerializer, SubmitTestSerializer
+
+
+class SubmitTestSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        mentor_user = User.objects.create_user(username='mentor', password='x', role='TEACHER')
+        cls.mentor = Mentor.objects.create(user=mentor_user, name='Mentor', point_limit=50)
+        cls.group = Group.objects.create(name='G1')
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        cls.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=cls.group)
+        cls.test = Test.objects.create(title='Math', created_by=cls.mentor)
+
+    def make_questions(self, count):
+        answers = []
+        for i in range(count):
+            question = Question.objects.create(test=self.test, text=f'Q{i}')
+            right = AnswerOption.objects.create(question=question, label='A', text='yes', is_correct=True)
+            wrong = AnswerOption.objects.create(question=question, label='B', text='no')
+            answers.append({'question_id': question.id, 'answer_option_id': (right if i % 2 == 0 else wrong).id})
+        return answers
+
+    def submit(self, answers):
+        request = APIRequestFactory().post('/')
+        request.user = self.student.user
+        serializer = SubmitTestSerializer(data={'test_id': self.test.id, 'answers': answers}, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_grades_whole_submission(self):
+        answers = self.make_questions(4)
+        result = self.submit(answers)
+
+        self.assertEqual(result.score, 10)
+        self.assertEqual(result.answers.filter(is_correct=True).count(), 2)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.points, 10)
+
+    def count_submit_queries(self, length):
+        self.test = Test.objects.create(title=f'Test {length}', created_by=self.mentor)
+        answers = self.make_questions(length)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            self.submit(answers)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_test_length(self):
+        self.assertEqual(self.count_submit_queries(2), self.count_submit_queries(40))
+
+    def test_rejects_option_from_other_question(self):
+        answers = self.make_questions(2)
+        answers[0]['answer_option_id'] = answers[1]['answer_option_id']
+        request = APIRequestFactory().post('/')
+        request.user = self.student.user
+        serializer = SubmitTestSerializer(data={'test_id': self.test.id, 'answers': answers}, context={'request': request})
+        self.assertFalse(serializer.is_valid())
+
+
+class AddPointsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        mentor_user = User.objects.create_user(username='mentor', password='x', role='TEACHER')
+        cls.mentor = Mentor.objects.create(user=mentor_user, name='Mentor', point_limit=50)
+        group = Group.objects.create(name='G1')
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        cls.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=group)
+
+    def test_give_point_credits_once(self):
+        give = GivePoint.objects.create(student=self.student, mentor=self.mentor, amount=7)
+        give.description = 'edited'
+        give.save()
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.points, 7)
+        self.assertEqual(self.student.point_events.count(), 1)
+
+    def test_deduction_is_conditional(self):
+        add_points(self.student.id, 10, 'mentor')
+        with self.assertRaises(InsufficientPoints):
+            add_points(self.student.id, -11, 'mentor')
+        add_points(self.student.id, -10, 'mentor')
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.points, 0)
+        self.assertEqual(self.student.point_events.count(), 2)
+
+    def test_points_change_only_through_the_ledger(self):
+        stale = Student.objects.get(pk=self.student.pk)
+        add_points(self.student.id, 10, 'mentor')
+        stale.points = 999
+        stale.bio = 'Yangi'
+        stale.save()
+        self.assertEqual(stale.points, 10)
+
+        admin_user = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        self.client.force_login(admin_user)
+        form = {'user': self.student.user_id, 'name': 'Ali', 'birth_date': '2010-01-01', 'group': self.student.group_id,
+                'bio': 'Yangi', 'points': 500, 'points_adjustment': -4, 'points_description': 'Tuzatish'}
+        response = self.client.post(f'/admin/main/student/{self.student.pk}/change/', form)
+        self.assertEqual(response.status_code, 302)
+
+        self.student.refresh_from_db()
+        self.assertEqual((self.student.points, self.student.bio), (6, 'Yangi'))
+        self.assertEqual(list(self.student.point_events.values_list('amount', flat=True)), [-4, 10])
+
+        serializer = StudentSerializer(self.student, data={'points': 1000}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.save().points, 6)
+
+
+@skipUnless(connection.features.test_db_allows_multiple_connections, 'needs a database shared between threads')
+class AddPointsConcurrencyTests(TransactionTestCase):
+    writers = 8
+    writes_per_thread = 25
+
+    def setUp(self):
+        group = Group.objects.create(name='G1')
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        self.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=group)
+
+    def test_parallel_writers_do_not_lose_updates(self):
+        errors = []
+
+        def writer():
+            try:
+                for _ in range(self.writes_per_thread):
+                    add_points(self.student.id, 3, 'mentor')
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer) for _ in range(self.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.student.refresh_from_db()
+        total = self.writers * self.writes_per_thread
+        self.assertEqual(self.student.points, total * 3)
+        self.assertEqual(PointEvent.objects.filter(student=self.student).count(), total)
+
+
+class StudentPointHistoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name='G1')
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        cls.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=group)
+        other = User.objects.create_user(username='other', password='x', role='STUDENT')
+        cls.other = Student.objects.create(user=other, name='Vali', birth_date=datetime.date(2010, 1, 1), group=group)
+
+        start = timezone.make_aware(datetime.datetime(2026, 1, 1, 12))
+        for day in range(10):
+            add_points(cls.student.id, day + 1, 'mentor' if day % 2 else 'test', created_at=start + datetime.timedelta(days=day))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+        self.url = f'/students/{self.student.id}/points/'
+
+    def test_filters_by_date_range_and_type(self):
+        response = self.client.get(self.url, {'date_from': '2026-01-03', 'date_to': '2026-01-06', 'point_type': 'mentor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([event['amount'] for event in response.data['results']], [6, 4])
+
+        self.assertEqual(self.client.get(self.url, {'date_from': '2026-01-06', 'date_to': '2026-01-03'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'point_type': 'bogus'}).status_code, 400)
+
+    def test_pages_by_cursor(self):
+        first = self.client.get(self.url, {'page_size': 4}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual([event['amount'] for event in first['results'] + second['results']], [10, 9, 8, 7, 6, 5, 4, 3])
+
+    def test_other_students_history_is_hidden(self):
+        self.assertEqual(self.client.get(f'/students/{self.other.id}/points/').status_code, 404)
+        self.assertNotIn('point_history', self.client.get(f'/students/{self.student.id}/').data)
+
+
+class AchievementRedemptionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        group = Group.objects.create(name='G1')
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        cls.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=group)
+        cls.achievement = Achievement.objects.create(name='Sticker', amount=1, point_price=30)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student.user)
+
+    def test_redeem_deducts_points_and_stock(self):
+        add_points(self.student.id, 70, 'mentor')
+        response = self.client.post(f'/achievement/{self.achievement.id}/redeem/')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['price'], 30)
+        self.assertEqual(response.data['achievement_name'], 'Sticker')
+
+        self.student.refresh_from_db()
+        self.achievement.refresh_from_db()
+        self.assertEqual(self.student.points, 40)
+        self.assertEqual(self.achievement.amount, 0)
+        self.assertEqual(self.student.point_events.filter(point_type='achievement').get().amount, -30)
+
+        # Zaxira tugagan: ball qaytariladi, xarid yozilmaydi
+        response = self.client.post(f'/achievement/{self.achievement.id}/redeem/')
+        self.assertEqual(response.status_code, 409)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.points, 40)
+        self.assertEqual(AchievementPurchase.objects.count(), 1)
+        self.assertEqual(len(self.client.get('/achievement/purchases/').data['results']), 1)
+
+    def test_insufficient_points_keeps_stock(self):
+        response = self.client.post(f'/achievement/{self.achievement.id}/redeem/')
+        self.assertEqual(response.status_code, 400)
+        self.achievement.refresh_from_db()
+        self.assertEqual(self.achievement.amount, 1)
+        self.assertFalse(AchievementPurchase.objects.exists())
+
+
+@skipUnless(connection.features.test_db_allows_multiple_connections, 'needs a database shared between threads')
+class AchievementRedemptionConcurrencyTests(TransactionTestCase):
+    buyers = 300
+    stock = 25
+    workers = 16
+
+    def setUp(self):
+        group = Group.objects.create(name='G1')
+        users = User.objects.bulk_create([User(username=f'buyer{i}', role='STUDENT') for i in range(self.buyers)])
+        self.students = Student.objects.bulk_create([
+            Student(user=user, name=user.username, birth_date=datetime.date(2010, 1, 1), group=group, points=100)
+            for user in users
+        ])
+        leaderboard.rebuild()
+        self.achievement = Achievement.objects.create(name='Hoodie', amount=self.stock, point_price=60)
+
+    def test_hot_item_never_oversells(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from .points import OutOfStock, redeem_achievement
+
+        def buy(student_id):
+            try:
+                redeem_achievement(student_id, self.achievement.id)
+                return 'ok'
+            except OutOfStock:
+                return 'sold out'
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            outcomes = list(pool.map(buy, [student.id for student in self.students]))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(outcomes.count('ok'), self.stock)
+        self.assertEqual(outcomes.count('sold out'), self.buyers - self.stock)
+        self.achievement.refresh_from_db()
+        self.assertEqual(self.achievement.amount, 0)
+        self.assertEqual(AchievementPurchase.objects.count(), self.stock)
+        self.assertEqual(Student.objects.filter(points=40).count(), self.stock)
+        self.assertEqual(Student.objects.filter(points=100).count(), self.buyers - self.stock)
+        self.assertEqual(PointEvent.objects.filter(point_type='achievement').count(), self.stock)
+        # Qatorni uzoq qulflamaslik: har bir urinish o'rtacha bir necha millisekund
+        self.assertLess(elapsed / self.buyers, 0.05)
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(name='English')
+        cls.group_a = Group.objects.create(name='A')
+        cls.group_b = Group.objects.create(name='B')
+        cls.group_a.courses.add(cls.course)
+        cls.students = []
+        for i, group in enumerate([cls.group_a, cls.group_a, cls.group_b, cls.group_b]):
+            user = User.objects.create_user(username=f's{i}', password='x', role='STUDENT')
+            cls.students.append(Student.objects.create(user=user, name=f'S{i}', birth_date=datetime.date(2010, 1, 1), group=group))
+        # Bucket farqlari commit'dan keyin qo'llanadi; setUpTestData tranzaksiyasi commit bo'lmaydi
+        leaderboard.rebuild()
+
+    def assertRanksMatchTable(self, scope):
+        for student in leaderboard.students_in_scope(scope):
+            expected = leaderboard.students_in_scope(scope).filter(points__gt=student.points).count() + 1
+            self.assertEqual(leaderboard.rank_of(scope, student.points), expected)
+
+    def test_incremental_ranks(self):
+        s0, s1, s2, s3 = self.students
+        with self.captureOnCommitCallbacks(execute=True):
+            add_points(s0.id, 10, 'mentor')
+            add_points(s2.id, 20, 'mentor')
+            add_points(s3.id, 10, 'mentor')
+            add_points(s3.id, -5, 'mentor')
+
+            s1.group = self.group_b
+            s1.save()
+            self.group_b.courses.add(self.course)
+
+        for scope in ['global', leaderboard.group_scope(self.group_a.id), leaderboard.group_scope(self.group_b.id),
+                      leaderboard.course_scope(self.course.id)]:
+            self.assertRanksMatchTable(scope)
+
+        top = leaderboard.top('global', 3)
+        self.assertEqual([(s.id, s.rank) for s in top], [(s2.id, 1), (s0.id, 2), (s3.id, 3)])
+
+    def test_group_endpoint_includes_my_rank(self):
+        s0, s1 = self.students[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            add_points(s1.id, 5, 'mentor')
+        client = APIClient()
+        client.force_authenticate(s0.user)
+
+        response = client.get(f'/leaderboard/group/{self.group_a.id}/?limit=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['top']], [s1.id])
+        self.assertEqual(response.data['me']['rank'], 2)
+
+
+class CursorPaginationTests(TestCase):
+    def test_list_endpoint_pages_by_cursor(self):
+        course_names = [f'C{i}' for i in range(5)]
+        Course.objects.bulk_create([Course(name=name) for name in course_names])
+        user = User.objects.create_user(username='u', password='x', role='STUDENT')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        first = client.get('/courses/?page_size=3')
+        second = client.get(first.data['next'])
+
+        self.assertEqual([row['name'] for row in first.data['results']], ['C4', 'C3', 'C2'])
+        self.assertEqual([row['name'] for row in second.data['results']], ['C1', 'C0'])
+        self.assertIsNone(second.data['next'])
+
+
+class MentorListQueryCountTests(TestCase):
+    def add_mentors(self, count):
+        course = Course.objects.create(name='Math')
+        for i in range(count):
+            user = User.objects.create_user(username=f'm{Mentor.objects.count()}', password='x', role='TEACHER')
+            mentor = Mentor.objects.create(user=user, name=f'M{i}', point_limit=10)
+            mentor.course.add(course)
+            Test.objects.create(title=f'T{i}', created_by=mentor)
+            Group.objects.create(name=f'G{i}').mentors.add(mentor)
+
+    def test_query_count_is_constant_per_page(self):
+        admin = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        self.add_mentors(3)
+        with self.assertNumQueries(4):
+            response = client.get('/mentors/')
+        self.assertEqual(len(response.data['results']), 3)
+
+        self.add_mentors(6)
+        with self.assertNumQueries(4):
+            response = client.get('/mentors/')
+        self.assertEqual(len(response.data['results']), 9)
+        self.assertEqual(len(response.data['results'][0]['my_test']), 1)
+        self.assertEqual(response.data['results'][0]['course_names'], ['Math'])
+
+
+class CourseListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.course = Course.objects.create(name='Math')
+        Course.objects.create(name='Empty')
+        group = Group.objects.create(name='G1')
+        group.courses.add(cls.course)
+        for i in range(3):
+            user = User.objects.create_user(username=f's{i}', password='x', role='STUDENT')
+            Student.objects.create(user=user, name=f'S{i}', birth_date=datetime.date(2010, 1, 1), group=group)
+        cls.client_user = User.objects.get(username='s0')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.client_user)
+
+    def test_counts_by_default(self):
+        response = self.client.get('/courses/')
+        counts = {row['name']: row['student_count'] for row in response.data['results']}
+        self.assertEqual(counts, {'Math': 3, 'Empty': 0})
+        self.assertNotIn('students', response.data['results'][0])
+
+    def test_rosters_are_loaded_in_one_query(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/courses/?include=students')
+        rosters = {row['name']: [s['name'] for s in row['students']] for row in response.data['results']}
+        self.assertEqual(rosters, {'Math': ['S0', 'S1', 'S2'], 'Empty': []})
+
+    def test_roster_endpoint_is_paginated(self):
+        response = self.client.get(f'/courses/{self.course.id}/students/?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+
+class RoleClaimsTokenTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        mentor_user = User.objects.create_user(username='mentor', password='secret', role='TEACHER')
+        cls.mentor = Mentor.objects.create(user=mentor_user, name='Mentor', point_limit=50)
+        cls.group = Group.objects.create(name='G1')
+        cls.group.mentors.add(cls.mentor)
+        user = User.objects.create_user(username='student', password='secret', role='STUDENT')
+        cls.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=cls.group)
+        Test.objects.create(title='Math', created_by=cls.mentor).groups.add(cls.group)
+        Test.objects.create(title='Other', created_by=cls.mentor)
+
+    def login(self, username):
+        client = APIClient()
+        tokens = client.post('/token/', {'username': username, 'password': 'secret'}).data
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        return client, tokens
+
+    def test_student_requests_are_authorized_from_claims(self):
+        client, _ = self.login('student')
+
+        # tests + prefetched groups; no User/Student lookups
+        with self.assertNumQueries(2):
+            response = client.get('/test/')
+        self.assertEqual([row['title'] for row in response.data['results']], ['Math'])
+
+    def test_mentor_permission_needs_no_query(self):
+        client, _ = self.login('mentor')
+
+        # groups + prefetched courses and mentors; no User/Mentor lookups
+        with self.assertNumQueries(3):
+            response = client.get('/groups/')
+        self.assertEqual(response.status_code, 200)
+
+        client, _ = self.login('student')
+        self.assertEqual(client.get('/groups/').status_code, 403)
+
+    def test_refresh_picks_up_new_group(self):
+        client, tokens = self.login('student')
+        new_group = Group.objects.create(name='G2')
+        self.student.group = new_group
+        self.student.save()
+
+        access = client.post('/token/refresh/', {'refresh': tokens['refresh']}).data['access']
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(client.get('/test/').data['results'], [])
+
+
+class TokenRevocationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='G1')
+        cls.user = User.objects.create_user(username='student', password='secret', role='STUDENT')
+        cls.student = Student.objects.create(user=cls.user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def issue(self):
+        refresh = RoleTokenObtainPairSerializer.get_token(self.user)
+        access = refresh.access_token
+        # Bekor qilish soniya aniqligida: token undan oldinroq berilgan bo'lsin
+        access['iat'] -= 5
+        return refresh, access
+
+    def test_deactivated_and_deleted_users_are_rejected(self):
+        refresh, access = self.issue()
+        client = self.client_for(access)
+        self.assertEqual(client.get('/students/get-me/').status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(client.get('/students/get-me/').status_code, 401)
+        self.assertEqual(APIClient().post('/token/refresh/', {'refresh': str(refresh)}).status_code, 401)
+
+        self.user.delete()
+        self.assertEqual(client.get('/test/').status_code, 401)
+        self.assertEqual(APIClient().post('/token/refresh/', {'refresh': str(refresh)}).status_code, 401)
+
+    def test_group_change_revokes_access_token(self):
+        refresh, access = self.issue()
+        client = self.client_for(access)
+        self.student.group = Group.objects.create(name='G2')
+        self.student.save()
+        self.assertEqual(client.get('/test/').status_code, 401)
+
+        access = APIClient().post('/token/refresh/', {'refresh': str(refresh)}).data['access']
+        self.assertEqual(self.client_for(access).get('/test/').status_code, 200)
+
+
+class TestPaperTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        mentor_user = User.objects.create_user(username='mentor', password='x', role='TEACHER')
+        cls.mentor = Mentor.objects.create(user=mentor_user, name='Mentor', point_limit=50)
+        group = Group.objects.create(name='G1')
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        cls.student = Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=group)
+        cls.test = Test.objects.create(title='Math', created_by=cls.mentor)
+        cls.test.groups.add(group)
+        cls.question = Question.objects.create(test=cls.test, text='2+2')
+        AnswerOption.objects.create(question=cls.question, label='A', text='4', is_correct=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_paper(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f'/test/{self.test.id}/paper/')
+
+    def test_version_is_bumped_again_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.question.save()
+            during = test_paper.get_version(self.test.id)
+            # Commit'dan oldingi holat shu versiya bilan keshlanishi mumkin
+            self.get_paper(self.student.user)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(test_paper.get_version(self.test.id), during)
+
+    def test_student_variant_hides_answers_and_is_cached(self):
+        self.get_paper(self.student.user)
+        # role check + group check only; the paper itself comes from the cache
+        with self.assertNumQueries(2):
+            response = self.get_paper(self.student.user)
+
+        option = response.data['questions'][0]['options'][0]
+        self.assertNotIn('is_correct', option)
+        self.assertTrue(self.get_paper(self.mentor.user).data['questions'][0]['options'][0]['is_correct'])
+
+    def test_edit_invalidates_cached_paper(self):
+        self.get_paper(self.student.user)
+        AnswerOption.objects.create(question=self.question, label='B', text='5')
+
+        response = self.get_paper(self.student.user)
+
+        self.assertEqual([o['label'] for o in response.data['questions'][0]['options']], ['A', 'B'])
+
+
+class ImageDerivativeTests(TestCase):
+    def test_derivatives_are_created_next_to_original(self):
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            path = os.path.join(media_root, 'photo.jpg')
+            Image.new('RGB', (2000, 1000), 'red').save(path)
+
+            self.assertEqual(make_derivatives(path), 4)
+            self.assertEqual(make_derivatives(path), 0)
+            with Image.open(os.path.join(media_root, 'photo.thumb.webp')) as thumb:
+                self.assertEqual(thumb.size, (128, 64))
+
+            # Belgi qo'yilmaguncha variantlar berilmaydi: storage tekshirilmaydi
+            self.assertIsNone(variant_urls(Student(image='photo.jpg').image))
+            field_file = Student(image='photo.jpg', image_variants_of='photo.jpg').image
+            with mock.patch.object(field_file.storage, 'exists') as exists:
+                self.assertEqual(variant_urls(field_file)['medium']['webp'], '/media/photo.medium.webp')
+            exists.assert_not_called()
+
+
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, 'images'))
+        with open(os.path.join(self.media_root, 'images', 'a.png'), 'wb') as f:
+            f.write(b'png-bytes')
+
+    def test_offloads_body_and_answers_revalidation_with_304(self):
+        with self.settings(MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE='x-accel'):
+            response = self.client.get('/media/images/a.png')
+            self.assertEqual(response['X-Accel-Redirect'], '/protected-media/images/a.png')
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertEqual(response.content, b'')
+
+            revalidated = self.client.get('/media/images/a.png', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(revalidated.status_code, 304)
+
+    def test_offload_header_is_url_encoded(self):
+        with open(os.path.join(self.media_root, 'images', 'rasm 1?.png'), 'wb') as f:
+            f.write(b'png-bytes')
+        with self.settings(MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE='x-accel'):
+            response = self.client.get('/media/images/rasm%201%3F.png')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/images/rasm%201%3F.png')
+
+    def test_protected_prefix_requires_login(self):
+        with self.settings(MEDIA_ROOT=self.media_root, MEDIA_PROTECTED_PREFIXES=('images/',)):
+            self.assertEqual(self.client.get('/media/images/a.png').status_code, 403)
+            self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        cls.mentor = Mentor.objects.create(
+            user=User.objects.create_user(username='mentor', password='x', role='TEACHER'), name='Mentor', point_limit=5)
+        cls.test = Test.objects.create(title='Math', created_by=cls.mentor)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            n = Group.objects.count()
+            group = Group.objects.create(name=f'G{n}')
+            group.mentors.add(self.mentor)
+            user = User.objects.create_user(username=f's{n}', password='x', role='STUDENT')
+            Student.objects.create(user=user, name=f'S{n}', birth_date=datetime.date(2010, 1, 1), group=group)
+            question = Question.objects.create(test=self.test, text=f'Q{n}')
+            AnswerOption.objects.create(question=question, label='A', text='x')
+
+    def assertConstantQueries(self, url):
+        self.client.force_login(self.admin)
+        self.add_rows(2)
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.add_rows(6)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(len(small), len(large))
+
+    def test_student_changelist(self):
+        self.assertConstantQueries('/admin/main/student/')
+
+    def test_group_changelist(self):
+        self.assertConstantQueries('/admin/main/group/')
+
+    def test_question_changelist_with_answer_count_filter(self):
+        self.assertConstantQueries('/admin/main/question/?answer_count=lt4')
+
+
+class IndexUsageTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        for name, index, plan, used in explain_hot_queries(prefer_indexes=True):
+            with self.subTest(name):
+                self.assertTrue(used, f"{index} not used:\n{plan}")
+
+
+class QueryProfilingMiddlewareTests(TestCase):
+    add_mentors = MentorListQueryCountTests.add_mentors
+
+    def get_profile(self, url):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertLogs('main.profiling', level='INFO') as logs:
+            response = client.get(url)
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_reports_timings_and_flags_repeated_statements(self):
+        self.admin = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        with self.settings(REQUEST_PROFILING=True):
+            self.add_mentors(2)
+            small_response, small = self.get_profile('/mentors/')
+            self.add_mentors(4)
+            response, large = self.get_profile('/mentors/')
+
+            self.assertIn(f'desc="{large["queries"]} queries"', response['Server-Timing'])
+            self.assertEqual((small['rows'], large['rows']), (2, 6))
+            self.assertEqual(small['queries'], large['queries'])
+            self.assertFalse(large['n_plus_one'])
+
+            with self.settings(REQUEST_PROFILING_N_PLUS_ONE=1):
+                self.assertTrue(self.get_profile('/mentors/')[1]['n_plus_one'])
+
+
+class AsyncEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SubmitTestSerializerTests.setUpTestData.__func__(cls)
+        token = RoleTokenObtainPairSerializer.get_token(cls.student.user).access_token
+        cls.headers = {'Authorization': f'Bearer {token}'}
+
+    make_questions = SubmitTestSerializerTests.make_questions
+
+    async def test_submit_then_dashboard(self):
+        answers = await sync_to_async(self.make_questions)(4)
+        body = {'test_id': self.test.id, 'answers': answers}
+
+        response = await self.async_client.post('/api/async/tests/submit/answers/', body,
+                                                content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['score'], 10)
+
+        again = await self.async_client.post('/api/async/tests/submit/answers/', body,
+                                             content_type='application/json', headers=self.headers)
+        self.assertEqual(again.status_code, 400)
+
+        dashboard = (await self.async_client.get('/api/async/students/dashboard/', headers=self.headers)).json()
+        self.assertEqual(dashboard['student']['points'], 10)
+        self.assertEqual(dashboard['rank'], {'global': 1, 'group': 1})
+        self.assertEqual([row['test_title'] for row in dashboard['recent_results']], ['Math'])
+        self.assertEqual([row['amount'] for row in dashboard['recent_points']], [10])
+
+    async def test_profiling_counts_async_view_queries(self):
+        # Middleware profiling yoqilgandan keyin yangi client'da yuklanadi
+        with self.settings(REQUEST_PROFILING=True), self.assertLogs('main.profiling', level='INFO') as logs:
+            response = await AsyncClient().get('/api/async/students/dashboard/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        # Talaba, natijalar, ball hodisalari va ikkala o'rin
+        self.assertGreaterEqual(json.loads(logs.records[-1].getMessage())['queries'], 4)
+
+    async def test_requires_student_token(self):
+        response = await self.async_client.get('/api/async/students/dashboard/')
+        self.assertEqual(response.status_code, 401)
+
+
+class BenchmarkBurstTests(TransactionTestCase):
+    def setUp(self):
+        group = Group.objects.create(name='seed_G')
+        mentor = Mentor.objects.create(
+            user=User.objects.create_user(username='seed_m', password='x', role='TEACHER'), name='M', point_limit=5)
+        self.test = Test.objects.create(title='Math', created_by=mentor)
+        self.test.groups.add(group)
+        for i in range(2):
+            question = Question.objects.create(test=self.test, text=f'Q{i}')
+            AnswerOption.objects.create(question=question, label='A', text='a', is_correct=True)
+        # Haqiqiy talaba ham shu guruhda va testni hali yechmagan
+        for username in ['real', 'seed_s0', 'seed_s1', 'seed_s2', 'seed_s3']:
+            user = User.objects.create_user(username=username, password='x', role='STUDENT')
+            Student.objects.create(user=user, name=username, birth_date=datetime.date(2010, 1, 1), group=group)
+        self.real = Student.objects.get(user__username='real')
+        leaderboard.rebuild()
+
+    def test_runs_both_paths_and_reverts_only_its_own_submissions(self):
+        # Benchmark davomida boshqa testdan yozilgan haqiqiy ball hodisasi saqlanib qolishi kerak
+        add_points(self.real.id, 10, 'test', created_at=timezone.now() + datetime.timedelta(minutes=1))
+        out = io.StringIO()
+
+        call_command('benchmark_burst', students=2, wsgi_threads=1, asgi_concurrency=1, stdout=out)
+
+        self.assertIn("wsgi: 2 so'rov, 0 xato", out.getvalue())
+        self.assertIn("asgi: 2 so'rov, 0 xato", out.getvalue())
+        self.assertFalse(StudentTestResult.objects.exists())
+        self.assertEqual(PointEvent.objects.get().student_id, self.real.id)
+        self.assertEqual(dict(Student.objects.filter(points__gt=0).values_list('id', 'points')), {self.real.id: 10})
+        self.assertEqual(leaderboard.rank_of('global', 0), 2)
+        self.assertFalse(Question.objects.filter(attempts__gt=0).exists())
+
+
+class BulkGivePointTests(TestCase):
+    assertRanksMatchTable = LeaderboardTests.assertRanksMatchTable
+
+    @classmethod
+    def setUpTestData(cls):
+        mentor_user = User.objects.create_user(username='mentor', password='x', role='TEACHER')
+        cls.mentor = Mentor.objects.create(user=mentor_user, name='Mentor', point_limit=20)
+        cls.course = Course.objects.create(name='Math')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.mentor.user)
+
+    def make_group(self, size):
+        group = Group.objects.create(name=f'G{Group.objects.count()}')
+        group.courses.add(self.course)
+        for i in range(size):
+            user = User.objects.create_user(username=f'{group.name}-s{i}', password='x', role='STUDENT')
+            Student.objects.create(user=user, name=f'S{i}', birth_date=datetime.date(2010, 1, 1), group=group)
+        return group
+
+    def award_group(self, group, amount):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/give-points/bulk/', {'group': group.id, 'amount': amount}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return len(queries)
+
+    def test_query_count_does_not_depend_on_group_size(self):
+        small, large = self.make_group(3), self.make_group(30)
+        self.assertEqual(self.award_group(small, 5), self.award_group(large, 5))
+
+        self.assertEqual(GivePoint.objects.filter(student__group=large).count(), 30)
+        self.assertEqual(set(Student.objects.filter(group=large).values_list('points', flat=True)), {5})
+        self.assertEqual(PointEvent.objects.filter(student__group=large).count(), 30)
+
+    def test_awards_list_updates_leaderboard(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            group = self.make_group(3)
+        students = list(Student.objects.filter(group=group).order_by('id'))
+        awards = [{'student': students[0].id, 'amount': 20}, {'student': students[1].id, 'amount': 7}]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/give-points/bulk/', {'awards': awards, 'description': 'Faol'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(Student.objects.filter(group=group).order_by('id').values_list('points', flat=True)), [20, 7, 0])
+        for scope in ['global', leaderboard.group_scope(group.id), leaderboard.course_scope(self.course.id)]:
+            self.assertRanksMatchTable(scope)
+
+    def test_amount_above_point_limit_is_rejected(self):
+        group = self.make_group(2)
+        response = self.client.post('/give-points/bulk/', {'group': group.id, 'amount': 21}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(GivePoint.objects.exists())
+
+
+class StudentImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name='Alpha')
+        cls.admin = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        User.objects.create_user(username='taken', password='x', role='STUDENT')
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        rows = [
+            'username,password,name,birth_date,group,bio',
+            'ali,secret-1,Ali,2010-01-02,Alpha,',
+            f'vali,secret-2,Vali,03.04.2011,{self.group.id},Sportchi',
+            'taken,secret-3,Band,2010-01-01,Alpha,',
+            'ali,secret-4,Takror,2010-01-01,Alpha,',
+            'bad,secret-5,Bad,2010/01/01,Beta,',
+        ]
+        upload = SimpleUploadedFile('students.csv', '\n'.join(rows).encode(), content_type='text/csv')
+
+        response = self.run_import(upload)
+
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual((response.data['rows'], response.data['created']), (5, 2))
+        self.assertEqual({error['row']: sorted(error['errors']) for error in response.data['errors']},
+                         {4: ['username'], 5: ['username'], 6: ['birth_date', 'group']})
+
+        vali = Student.objects.select_related('user').get(user__username='vali')
+        self.assertEqual((vali.birth_date, vali.bio, vali.group_id), (datetime.date(2011, 4, 3), 'Sportchi', self.group.id))
+        self.assertTrue(vali.user.check_password('secret-2'))
+        self.assertEqual(leaderboard.rank_of(leaderboard.group_scope(self.group.id), 0), 1)
+        self.assertEqual(LeaderboardBucket.objects.get(scope=leaderboard.group_scope(self.group.id), points=0).students, 2)
+
+    def test_broken_file_is_rejected_before_any_row_is_saved(self):
+        # Buzilgan bayt birinchi o'qish blokidan keyin keladi
+        rows = ''.join(f'user{i},secret,Name,2010-01-02,Alpha\n' for i in range(300))
+        body = f'username,password,name,birth_date,group\n{rows}'.encode() + b'\xff,x,X,2010-01-02,Alpha\n'
+        with self.assertRaises(student_import.ImportFormatError):
+            student_import.import_students(io.BytesIO(body), 'students.csv', batch_size=1)
+        self.assertFalse(Student.objects.exists())
+
+        response = self.run_import(SimpleUploadedFile('students.xlsx', b'not a zip'))
+        self.assertEqual(response.data['status'], 'failed')
+        self.assertIn('Invalid XLSX file', response.data['error'])
+
+    def test_large_batches_hash_in_a_spawned_pool(self):
+        importer = student_import.StudentImporter(workers=2)
+        with mock.patch.object(student_import, 'ProcessPoolExecutor') as pool:
+            pool.return_value.map.side_effect = lambda func, items, chunksize: map(func, items)
+            self.assertEqual(len(importer.hash_passwords(['x'] * 2)), 2)
+            pool.assert_not_called()
+            importer.hash_passwords(['x'] * student_import.POOL_MIN_ROWS)
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'spawn')
+
+    def run_import(self, upload):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with mock.patch.object(student_import._jobs, 'submit') as submit:
+            response = client.post('/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        with self.captureOnCommitCallbacks(execute=True):
+            student_import.run_job(*submit.call_args.args[1:])
+        return client.get(response.data['url'])
+
+    def test_admin_import_page(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get('/admin/main/student/import/').status_code, 200)
+
+        upload = SimpleUploadedFile('students.csv', b'username,password,name,birth_date,group\nx1,secret,X,2010-01-02,Alpha\n')
+        with mock.patch.object(student_import._jobs, 'submit') as submit:
+            response = self.client.post('/admin/main/student/import/', {'file': upload})
+        self.assertEqual(response.status_code, 302)
+        self.assertContains(self.client.get(response.url), 'Import davom etmoqda')
+        self.assertFalse(User.objects.filter(username='x1').exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            student_import.run_job(*submit.call_args.args[1:])
+        self.assertContains(self.client.get(response.url), '1 ta talaba yaratildi')
+        self.assertTrue(Student.objects.filter(user__username='x1').exists())
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        mentor_user = User.objects.create_user(username='mentor', password='x', role='TEACHER')
+        cls.mentor = Mentor.objects.create(user=mentor_user, name='Mentor', point_limit=50)
+        cls.admin = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        cls.test = Test.objects.create(title='Math', created_by=cls.mentor)
+        mine, other = Group.objects.create(name='Mine'), Group.objects.create(name='Other')
+        mine.mentors.add(cls.mentor)
+        for i, group in enumerate([mine, mine, other]):
+            user = User.objects.create_user(username=f's{i}', password='x', role='STUDENT')
+            student = Student.objects.create(user=user, name=f'S{i}', birth_date=datetime.date(2010, 1, 1), group=group)
+            StudentTestResult.objects.create(student=student, test=cls.test, score=5 * i)
+            add_points(student.id, i + 1, 'mentor', 'Faol')
+
+    def export(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_csv_is_streamed_and_scoped_to_mentor_groups(self):
+        response = self.export(self.admin, '/export/results.csv')
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+        self.assertEqual(rows[0], ['id', 'student_id', 'student', 'group', 'test_id', 'test', 'score', 'taken_at'])
+        self.assertEqual([(row[2], row[3], row[6]) for row in rows[1:]], [('S0', 'Mine', '0'), ('S1', 'Mine', '5'), ('S2', 'Other', '10')])
+
+        response = self.export(self.mentor.user, '/export/point-events.csv')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode('utf-8-sig').splitlines()))
+        self.assertEqual([row[2] for row in rows[1:]], ['S0', 'S1'])
+
+    def test_xlsx_export(self):
+        from openpyxl import load_workbook
+
+        TestSubmissionLog.objects.create(student=Student.objects.get(name='S0'), test=self.test, correct_answers=3)
+        response = self.export(self.admin, f'/export/submission-logs.xlsx?test={self.test.id}')
+        self.assertEqual(response['Content-Type'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(rows[0][:3], ('id', 'student_id', 'student'))
+        self.assertEqual(rows[1][2], 'S0')
+        self.assertIsInstance(rows[1][7], datetime.datetime)
+
+
+class ItemStatsTests(TestCase):
+    setUpTestData = SubmitTestSerializerTests.__dict__['setUpTestData']
+    make_questions = SubmitTestSerializerTests.make_questions
+
+    def add_student(self, n):
+        user = User.objects.create_user(username=f'extra{n}', password='x', role='STUDENT')
+        return Student.objects.create(user=user, name=f'E{n}', birth_date=datetime.date(2010, 1, 1), group=self.group)
+
+    def test_counters_follow_grading_and_match_rebuild(self):
+        answers = self.make_questions(3)
+        q0, q1 = answers[0]['question_id'], answers[1]['question_id']
+        key = AnswerKey.load(self.test.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            submit_answers(self.student, key, answers)
+            submit_answers(self.add_student(1), key, [
+                {'question_id': q0, 'answer_option_id': answers[0]['answer_option_id'] + 1},
+                {'question_id': q1, 'answer_option_id': answers[1]['answer_option_id']},
+            ])
+            result = StudentTestResult.objects.create(student=self.add_student(2), test=self.test)
+            StudentAnswer.objects.create(result=result, question_id=q0, answer_option_id=answers[0]['answer_option_id'])
+
+        client = APIClient()
+        client.force_authenticate(self.mentor.user)
+        with self.assertNumQueries(4):
+            stats = client.get(f'/test/{self.test.id}/stats/').data['questions']
+        first = stats[0]
+        self.assertEqual((first['attempts'], first['correct_count'], first['correct_rate']), (3, 2, 0.6667))
+        self.assertEqual([(o['label'], o['selected_count']) for o in first['options']], [('A', 2), ('B', 1)])
+        self.assertEqual((stats[1]['attempts'], stats[1]['correct_count']), (2, 0))
+
+        before = list(AnswerOption.objects.order_by('id').values_list('selected_count', flat=True))
+        AnswerOption.objects.update(selected_count=0)
+        Question.objects.update(attempts=0, correct_count=0)
+        item_stats.rebuild()
+        self.assertEqual(list(AnswerOption.objects.order_by('id').values_list('selected_count', flat=True)), before)
+        self.assertEqual(item_stats.test_stats(self.test.id), stats)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'test_sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-sessions'},
+})
+class TestSessionTests(TestCase):
+    setUpTestData = AsyncEndpointTests.__dict__['setUpTestData']
+    make_questions = SubmitTestSerializerTests.make_questions
+
+    def setUp(self):
+        caches['test_sessions'].clear()
+        self.test.groups.add(self.group)
+        self.answers = self.make_questions(3)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.headers['Authorization'])
+
+    def start(self):
+        response = self.client.post('/test-sessions/', {'test_id': self.test.id}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def test_autosave_is_buffered_and_flushed_once_on_submit(self):
+        session = self.start()
+        self.assertAlmostEqual(session['remaining_seconds'], 30 * 60, delta=2)
+
+        url = f"/test-sessions/{session['id']}/answers/"
+        with self.assertNumQueries(0):
+            self.client.post(url, {'answers': self.answers[:2]}, format='json')
+            # Fikrini o'zgartirdi: 1-savolga to'g'ri javob
+            right = {'question_id': self.answers[1]['question_id'], 'answer_option_id': self.answers[1]['answer_option_id'] - 1}
+            response = self.client.post(url, {'answers': [right]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(StudentAnswer.objects.exists())
+
+        resumed = self.start()
+        self.assertEqual(resumed['id'], session['id'])
+        self.assertEqual(len(resumed['answers']), 2)
+
+        response = self.client.post(f"/test-sessions/{session['id']}/submit/")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['score'], 10)
+        self.assertEqual(StudentAnswer.objects.count(), 2)
+        self.assertEqual(self.client.post(f"/test-sessions/{session['id']}/submit/").data['id'], response.data['id'])
+        self.assertEqual(self.client.post(url, {'answers': self.answers[2:]}, format='json').status_code, 409)
+
+    def test_deadline_is_enforced_by_the_server(self):
+        session = self.start()
+        self.client.post(f"/test-sessions/{session['id']}/answers/", {'answers': self.answers[:1]}, format='json')
+        TestSession.objects.filter(pk=session['id']).update(deadline=timezone.now() - datetime.timedelta(minutes=5))
+        caches['test_sessions'].delete(f"test-session:{session['id']}")
+
+        self.assertEqual(test_sessions.close_expired(), 1)
+        result = StudentTestResult.objects.get(student=self.student, test=self.test)
+        self.assertEqual(result.score, 5)
+        response = self.client.post(f"/test-sessions/{session['id']}/answers/", {'answers': self.answers[1:2]}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_direct_submit_cannot_bypass_the_session(self):
+        self.start()
+        body = {'test_id': self.test.id, 'answers': self.answers}
+        self.assertEqual(self.client.post('/api/tests/submit/answers/', body, format='json').status_code, 400)
+        response = self.client.post('/api/async/tests/submit/answers/', json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StudentTestResult.objects.exists())
+
+        legacy = {'student': self.student.id, 'test': self.test.id, 'correct_answers': 3}
+        self.assertEqual(self.client.post('/api/tests/submit/', legacy, format='json').status_code, 410)
+        result = StudentTestResult.objects.create(student=self.student, test=self.test)
+        answer = {'result': result.id, 'question': self.answers[0]['question_id'],
+                  'answer_option': self.answers[0]['answer_option_id']}
+        self.assertEqual(self.client.post('/students/answer/create/', answer, format='json').status_code, 400)
+        self.assertFalse(StudentAnswer.objects.exists())
+
+        other = APIClient()
+        other.force_authenticate(self.mentor.user)
+        self.assertEqual(other.post('/students/answer/create/', answer, format='json').status_code, 403)
+
+    def test_deleted_test_closes_the_session(self):
+        session = self.start()
+        self.test.delete()
+
+        response = self.client.post(f"/test-sessions/{session['id']}/answers/", {'answers': self.answers[:1]}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.get(f"/test-sessions/{session['id']}/").status_code, 404)
+
+    def test_finish_grades_with_the_current_key(self):
+        session = self.start()
+        self.client.post(f"/test-sessions/{session['id']}/answers/", {'answers': self.answers[1:2]}, format='json')
+        # Qog'oz keshi eskirgan bo'lsa ham (boshqa worker) kalit bazadan olinadi
+        AnswerOption.objects.filter(pk=self.answers[1]['answer_option_id']).update(is_correct=True)
+
+        response = self.client.post(f"/test-sessions/{session['id']}/submit/")
+        self.assertEqual(response.data['score'], 5)
+
+        StudentTestResult.objects.all().delete()
+        self.assertEqual(self.client.post(f"/test-sessions/{session['id']}/submit/").status_code, 409)
+
+
+class StudentDashboardTests(TestCase):
+    setUpTestData = AsyncEndpointTests.__dict__['setUpTestData']
+    make_questions = SubmitTestSerializerTests.make_questions
+
+    def setUp(self):
+        cache.clear()
+        self.test.groups.add(self.group)
+        self.client = APIClient()
+        # Keshni tozalagandan keyin berilgan token foydalanuvchi holatini ham keshga yozadi
+        token = RoleTokenObtainPairSerializer.get_token(self.student.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_dashboard_in_fixed_number_of_queries(self):
+        answers = self.make_questions(2)
+        submit_answers(self.student, AnswerKey.load(self.test.id), answers)
+        started = Test.objects.create(title='Physics', created_by=self.mentor)
+        fresh = Test.objects.create(title='History', created_by=self.mentor)
+        for test in (started, fresh):
+            test.groups.add(self.group)
+        TestSession.objects.create(student=self.student, test=started, deadline=timezone.now() + datetime.timedelta(minutes=10))
+        Achievement.objects.create(name='Pen', amount=3, point_price=5)
+        Achievement.objects.create(name='Hoodie', amount=1, point_price=500)
+        Achievement.objects.create(name='Sold out', amount=0, point_price=1)
+
+        # Sovuq keshda umumiy qismlar ham o'qiladi, keyin faqat talabaga tegishli 4 ta so'rov
+        with self.assertNumQueries(6):
+            self.client.get('/students/dashboard/')
+        with self.assertNumQueries(4):
+            data = self.client.get('/students/dashboard/').data
+
+        self.assertEqual(data['points'], 5)
+        self.assertEqual(data['rank'], {'global': 1, 'group': 1})
+        self.assertEqual([test['title'] for test in data['available_tests']], ['History'])
+        self.assertEqual([test['title'] for test in data['unfinished_tests']], ['Physics'])
+        self.assertEqual([row['test_title'] for row in data['recent_results']], ['Math'])
+        self.assertEqual([item['name'] for item in data['affordable_achievements']], ['Pen'])
+
+    def test_shared_parts_are_invalidated(self):
+        self.client.get('/students/dashboard/')
+        add_points(self.student.id, 50, 'mentor')
+        Achievement.objects.create(name='Cap', amount=1, point_price=20)
+        self.assertEqual([item['name'] for item in self.client.get('/students/dashboard/').data['affordable_achievements']], ['Cap'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/achievement/{Achievement.objects.get(name='Cap').id}/redeem/")
+        self.assertEqual(self.client.get('/students/dashboard/').data['affordable_achievements'], [])
+
+    def test_process_local_cache_is_reported(self):
+        from .checks import check_shared_caches
+
+        self.assertEqual(check_shared_caches(None), [])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                                       'test_sessions': settings.CACHES['test_sessions']}):
+            self.assertEqual([error.id for error in check_shared_caches(None)], ['main.W001'])
+        with override_settings(CACHES={'default': settings.CACHES['default'], 'test_sessions': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/test-sessions'}}):
+            self.assertEqual([error.id for error in check_shared_caches(None)], ['main.E001'])
+
+
+class VersionETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='x', role='ADMIN')
+        cls.course = Course.objects.create(name='English')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_not_modified_without_touching_the_database(self):
+        response = self.client.get('/courses/')
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/courses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Boshqa sahifa/parametr - boshqa ETag
+        self.assertNotEqual(self.client.get('/courses/?page_size=1')['ETag'], etag)
+
+    def test_writes_change_the_etag(self):
+        etags = {url: self.client.get(url)['ETag'] for url in ('/courses/', '/groups/', '/achievement/')}
+
+        self.assertEqual(self.client.get('/courses/', HTTP_IF_NONE_MATCH=etags['/courses/']).status_code, 304)
+        group = Group.objects.create(name='G1')
+        group.courses.add(self.course)
+        self.assertEqual(self.client.get('/courses/', HTTP_IF_NONE_MATCH=etags['/courses/']).status_code, 200)
+        self.assertEqual(self.client.get('/groups/', HTTP_IF_NONE_MATCH=etags['/groups/']).status_code, 200)
+
+        achievement = Achievement.objects.create(name='Pen', amount=1, point_price=0)
+        etag = self.client.get('/achievement/')['ETag']
+        self.assertNotEqual(etag, etags['/achievement/'])
+        user = User.objects.create_user(username='student', password='x', role='STUDENT')
+        Student.objects.create(user=user, name='Ali', birth_date=datetime.date(2010, 1, 1), group=group)
+        student_client = APIClient()
+        student_client.force_authenticate(user)
+        student_client.post(f'/achievement/{achievement.id}/redeem/')
+        self.assertEqual(self.client.get('/achievement/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_finished_image_derivatives_change_the_etag(self):
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'achievements'))
+            Image.new('RGB', (300, 300), 'red').save(os.path.join(media_root, 'achievements', 'a.png'))
+            with mock.patch.object(images._executor, 'submit'), self.captureOnCommitCallbacks(execute=True):
+                achievement = Achievement.objects.create(name='Pen', point_price=1, image='achievements/a.png')
+
+            response = self.client.get('/achievement/')
+            self.assertIsNone(response.data['results'][0]['image_variants'])
+
+            # Fon oqimidagi ishni shu yerning o'zida bajaramiz
+            with mock.patch.object(images._executor, 'submit', lambda fn, *args: images._generate(*args)), \
+                    self.captureOnCommitCallbacks(execute=True):
+                signals.generate_image_derivatives(Achievement, achievement)
+            fresh = self.client.get('/achievement/', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(fresh.status_code, 200)
+            self.assertIsNotNone(fresh.data['results'][0]['image_variants'])
+
+    def test_test_list_etag_depends_on_students_group(self):
+        mentor = Mentor.objects.create(user=User.objects.create_user(username='m', password='x', role='TEACHER'), name='M', point_limit=10)
+        groups = [Group.objects.create(name=name) for name in ('A', 'B')]
+        test = Test.objects.create(title='Math', created_by=mentor)
+        test.groups.add(groups[0])
+
+        etags = []
+        for i, group in enumerate(groups):
+            user = User.objects.create_user(username=f's{i}', password='x', role='STUDENT')
+            Student.objects.create(user=user, name=f's{i}', birth_date=datetime.date(2010, 1, 1), group=group)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}')
+            etags.append(client.get('/test/')['ETag'])
+        self.assertNotEqual(etags[0], etags[1])
+
+        self.assertEqual(client.get('/test/', HTTP_IF_NONE_MATCH=etags[1]).status_code, 304)
+        test.groups.add(groups[1])
+        self.assertEqual(client.get('/test/', HTTP_IF_NONE_MATCH=etags[1]).status_code, 200)
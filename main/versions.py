@@ -0,0 +1,74 @@
+"""
+Modellar uchun o'zgarish versiyalari va ular asosidagi ETag'lar.
+
+Har bir model (M2M oraliq jadvallari ham) yoki kalit (masalan ``test_paper``) uchun keshda
+tasodifiy token turadi va yozuvda (signallar, ``bulk_create``/``update`` qilinadigan joylarda
+qo'lda) yangilanadi. Kesh barcha worker'lar uchun umumiy bo'lishi kerak (``CACHES``). Token
+hisoblagich emas: kesh uni o'chirib yuborsa ham eski versiya qaytib kelmaydi.
+``VersionETagMixin`` shu tokenlardan ETag yasaydi va ``If-None-Match`` mos kelsa queryset
+va serializer'ni ishga tushirmasdan 304 qaytaradi.
+"""
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+
+def _key(model):
+    return f'model-version:{model._meta.label_lower}'
+
+
+def bump_keys(*keys):
+    """Versiyani darhol va tranzaksiya commit bo'lgach yana yangilaydi: commit'dan oldin
+    eski ma'lumotni o'qigan so'rov yangi versiya bilan keshlanib qolmasin."""
+    def new_tokens():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    new_tokens()
+    transaction.on_commit(new_tokens)
+
+
+def key_tokens(keys):
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            cache.add(key, uuid.uuid4().hex, None)
+            tokens[key] = cache.get(key)
+    return [tokens[key] for key in keys]
+
+
+def bump(*models):
+    bump_keys(*[_key(model) for model in models])
+
+
+def get_tokens(models):
+    return key_tokens([_key(model) for model in models])
+
+
+class VersionETagMixin:
+    """
+    GET javobiga ``etag_models`` versiyalari, ``get_etag_variant()`` (foydalanuvchiga bog'liq qism)
+    va so'rov manzili (sahifa kursori, parametrlar) dan olingan ETag qo'shadi.
+    """
+    etag_models = ()
+
+    def get_etag_variant(self):
+        return ''
+
+    def get_etag(self, request):
+        parts = [type(self).__name__, *get_tokens(self.etag_models), self.get_etag_variant(), request.get_full_path()]
+        return '"%s"' % hashlib.md5('\0'.join(parts).encode(), usedforsecurity=False).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            # Brauzer/proksi har safar qayta tekshirsin, javob foydalanuvchiga xos
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization', 'Accept'])
+        return response
@@ -1,14 +1,26 @@
+import datetime
+
+from django.db.models import Count
+from django.utils import timezone
 from django.shortcuts import  get_object_or_404
 from rest_framework import generics
 from rest_framework.generics import ListAPIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
+from main.authentication import get_claims, get_student_id
 from main.permissions import *
 from main.serializers import *
+from main.points import InsufficientPoints, OutOfStock, redeem_achievement
+from main import dashboard, exports, item_stats, leaderboard, test_paper, test_sessions
+from main.pagination import CreatedAtCursorPagination
+from main.versions import VersionETagMixin
+from main.student_import import ImportFormatError, import_status, start_import
 from rest_framework.views import APIView
 from django.http import Http404
+from django.urls import reverse
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework import exceptions
 
 
 
@@ -20,10 +32,34 @@ class UserDetailView(generics.RetrieveAPIView):
     def get_object(self):
         return self.request.user
 
-class CourseListView(generics.ListAPIView):
-    queryset = Course.objects.all()
+class CourseListView(VersionETagMixin, generics.ListAPIView):
+    queryset = Course.objects.annotate(student_count=Count('group__student'))
     serializer_class = CourseListSerializer
     permission_classes = [IsAuthenticated]
+    etag_models = (Course, Group, Group.courses.through, Student)
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+
+        if request.query_params.get('include') == 'students':
+            rosters = {course.id: [] for course in page}
+            students = Student.objects.filter(group__courses__in=rosters).values('id', 'name', 'group__courses').order_by('id')
+            for student in students:
+                rosters[student.pop('group__courses')].append(student)
+            context['rosters'] = rosters
+
+        serializer = self.get_serializer_class()(page, many=True, context=context)
+        return self.get_paginated_response(serializer.data)
+
+
+class CourseStudentListView(generics.ListAPIView):
+    serializer_class = CourseStudentSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        course = get_object_or_404(Course, pk=self.kwargs['pk'])
+        return Student.objects.filter(group__courses=course).only('id', 'name')
 
 class CourseCreateView(generics.CreateAPIView):
     queryset = Course.objects.all()
@@ -35,10 +71,11 @@ class CourseRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CourseSerializer
     permission_classes = [IsMentorOrAdmin]
 
-class GroupListCreateView(generics.ListCreateAPIView):
-    queryset = Group.objects.all()
+class GroupListCreateView(VersionETagMixin, generics.ListCreateAPIView):
+    queryset = Group.objects.prefetch_related('courses', 'mentors')
     serializer_class = GroupSerializer
     permission_classes = [IsMentorOrAdmin]
+    etag_models = (Group, Group.courses.through, Group.mentors.through, Course, Mentor)
 
 class GroupRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Group.objects.all()
@@ -47,7 +84,7 @@ class GroupRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 
 
 class MentorListCreateView(generics.ListCreateAPIView):
-    queryset = Mentor.objects.all()
+    queryset = MentorSerializer.setup_eager_loading(Mentor.objects.all())
     serializer_class = MentorSerializer
     permission_classes = [IsMentorOrAdmin]
 
@@ -58,18 +95,46 @@ class MentorRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     parser_classes = [MultiPartParser, FormParser]
 
 class MentorDetailView(generics.RetrieveAPIView):
-    queryset = Mentor.objects.all()
+    queryset = MentorSerializer.setup_eager_loading(Mentor.objects.all())
     serializer_class = MentorSerializer
     permission_classes = [IsMentor]
 
     def get_object(self):
-        return get_object_or_404(Mentor, user=self.request.user)
+        return get_object_or_404(self.get_queryset(), user=self.request.user)
 
 class StudentListCreateView(generics.ListCreateAPIView):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [IsMentorOrAdmin]
 
+class StudentImportView(APIView):
+    """CSV/XLSX fayldan talabalarni ommaviy yaratish fon oqimida boshlanadi; holat job URL'ida."""
+    permission_classes = [IsAdmin]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            job_id = start_import(upload, upload.name)
+        except ImportFormatError as e:
+            return Response({"file": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'job': job_id, 'status': 'pending', 'url': reverse('students-import-job', args=[job_id])},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+class StudentImportJobView(APIView):
+    """Import holati; tugagach qatorma-qator hisobot (``rows``, ``created``, ``errors``)."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request, job_id):
+        state = import_status(job_id)
+        if state is None:
+            raise Http404
+        return Response({'job': job_id, **state})
+
 class StudentDetailView(generics.RetrieveAPIView):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
@@ -78,6 +143,16 @@ class StudentDetailView(generics.RetrieveAPIView):
     def get_object(self):
         return Student.objects.get(user=self.request.user)
 
+class StudentDashboardView(APIView):
+    """Ilova ochilganda kerak bo'ladigan hamma narsa bitta javobda (``main.dashboard``)."""
+    permission_classes = [IsStudent]
+
+    def get(self, request):
+        data = dashboard.build(get_student_id(request.user), request)
+        if data is None:
+            raise Http404
+        return Response(data)
+
 class StudentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Student.objects.all()
     permission_classes = [IsAuthenticated]
@@ -88,34 +163,212 @@ class StudentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
             return StudentUpdateSerializer
         return StudentSerializer
 
+class StudentPointHistoryView(generics.ListAPIView):
+    """
+    Talabaning ball tarixi ``PointEvent`` jadvalidan: sana oralig'i va ``point_type`` bo'yicha
+    filtr, ``created_at`` bo'yicha keyset sahifalash. So'rov ``(student, [point_type,] -created_at)``
+    indeksi bo'yicha oraliq skaneri bo'ladi.
+    """
+    serializer_class = PointEventSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def check_student_access(self, student_id):
+        user = self.request.user
+        if user.is_superuser:
+            return
+        claims = get_claims(user)
+        if claims is not None:
+            if claims['student_id'] is not None:
+                allowed = claims['student_id'] == student_id
+            else:
+                allowed = claims['mentor_id'] is not None and Student.objects.filter(pk=student_id, group__in=claims['group_ids']).exists()
+        elif hasattr(user, 'student'):
+            allowed = user.student.id == student_id
+        else:
+            allowed = Student.objects.filter(pk=student_id, group__mentors__user=user).exists()
+        if not allowed:
+            raise Http404
+
+    def get_queryset(self):
+        student_id = self.kwargs['pk']
+        self.check_student_access(student_id)
+
+        filters = PointHistoryFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        events = PointEvent.objects.filter(student_id=student_id)
+        if 'point_type' in params:
+            events = events.filter(point_type=params['point_type'])
+        # Kun chegaralari vaqt oralig'iga aylantiriladi: created_at__date indeksdan foydalanmaydi
+        if 'date_from' in params:
+            events = events.filter(created_at__gte=self.day_start(params['date_from']))
+        if 'date_to' in params:
+            events = events.filter(created_at__lt=self.day_start(params['date_to'] + datetime.timedelta(days=1)))
+        return events
+
+    @staticmethod
+    def day_start(day):
+        return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
 class GivePointListView(generics.ListAPIView):
-    queryset = GivePoint.objects.all()
     serializer_class = GivePointSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        queryset = GivePoint.objects.all()
+        for field in ('student', 'mentor'):
+            value = self.request.query_params.get(field)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{field}_id': value})
+        return queryset
 
 class GivePointCreateView(generics.CreateAPIView):
     queryset = GivePoint.objects.all()
     serializer_class = GivePointSerializer
     permission_classes = [IsMentorOrAdmin]
 
+class GivePointBulkCreateView(APIView):
+    """Guruh yoki talabalar ro'yxatiga bitta so'rovda ball berish."""
+    permission_classes = [IsMentorOrAdmin]
+
+    def post(self, request):
+        serializer = BulkGivePointSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        gives = serializer.save()
+        return Response(GivePointSerializer(gives, many=True).data, status=status.HTTP_201_CREATED)
+
 class GivePointRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = GivePoint.objects.all()
     serializer_class = GivePointSerializer
     permission_classes = [IsMentorOrAdmin]
 
-class TestListView(generics.ListAPIView):
+class TestListView(VersionETagMixin, generics.ListAPIView):
     serializer_class = TestSerializer
+    etag_models = (Test, Test.groups.through, Group)
+
+    def get_etag_variant(self):
+        # Talaba faqat o'z guruhi testlarini ko'radi, shuning uchun ETag guruhga bog'liq
+        user = self.request.user
+        claims = get_claims(user)
+        if claims is not None and claims['student_id'] is not None:
+            return 'groups:' + ','.join(map(str, sorted(claims['group_ids'])))
+        if user.is_authenticated and user.role == 'STUDENT':
+            return 'groups:' + ','.join(map(str, Student.objects.filter(user=user).values_list('group_id', flat=True)))
+        if user.is_authenticated and user.role in ['ADMIN', 'TEACHER']:
+            return 'all'
+        return 'none'
 
     def get_queryset(self):
         user = self.request.user
+        claims = get_claims(user)
+        if claims is not None and claims['student_id'] is not None:
+            return Test.objects.filter(groups__in=claims['group_ids']).prefetch_related('groups')
         if user.is_authenticated and user.role == 'STUDENT':
             student = Student.objects.get(user=user)
-            return Test.objects.filter(groups=student.group)
+            return Test.objects.filter(groups=student.group).prefetch_related('groups')
         elif user.is_authenticated and user.role in ['ADMIN', 'TEACHER']:
-            return Test.objects.all()
+            return Test.objects.prefetch_related('groups')
         return Test.objects.none()
 
 
+class TestPaperView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        with_answers = IsMentorOrAdmin().has_permission(request, self)
+        if not with_answers:
+            claims = get_claims(request.user)
+            if claims is not None:
+                group_ids = claims['group_ids'] if claims['student_id'] is not None else []
+            else:
+                group_ids = Student.objects.filter(user=request.user).values_list('group_id', flat=True)
+
+            # Talaba faqat o'z guruhiga berilgan testni ko'radi
+            if not Test.objects.filter(pk=pk, groups__in=group_ids).exists():
+                raise Http404
+
+        paper = test_paper.get_paper(pk, with_answers=with_answers)
+        if paper is None:
+            raise Http404
+        return Response(paper)
+
+
+class TestStatsView(APIView):
+    """Savollar tahlili: urinishlar, to'g'ri javob ulushi, variantlar tanlanishi va ogohlantirishlar."""
+    permission_classes = [IsMentorOrAdmin]
+
+    def get(self, request, pk):
+        if not Test.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response({'test': pk, 'questions': item_stats.test_stats(pk)})
+
+
+class TestSessionMixin:
+    permission_classes = [IsStudent]
+
+    def get_meta(self, pk):
+        meta = test_sessions.get_meta(pk)
+        if meta is None or meta['student_id'] != get_student_id(self.request.user):
+            raise Http404
+        return meta
+
+
+class TestSessionStartView(TestSessionMixin, APIView):
+    """Testni boshlash yoki ochiq sessiyani davom ettirish: server vaqti, muddat va saqlangan javoblar."""
+
+    def post(self, request):
+        test_id = request.data.get('test_id')
+        if not str(test_id).isdigit():
+            return Response({"test_id": "This field is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            meta = test_sessions.start(get_student_id(request.user), int(test_id))
+            if meta is None:
+                raise Http404
+            answers = test_sessions.saved_answers(meta)
+        except test_sessions.SessionClosed as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response({**test_sessions.state(meta), 'answers': answers}, status=status.HTTP_201_CREATED)
+
+
+class TestSessionDetailView(TestSessionMixin, APIView):
+    def get(self, request, pk):
+        meta = self.get_meta(pk)
+        data = test_sessions.state(meta)
+        if meta['submitted_at'] is None:
+            try:
+                data['answers'] = test_sessions.saved_answers(meta)
+            except test_sessions.SessionClosed as e:
+                return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(data)
+
+
+class TestSessionAnswersView(TestSessionMixin, APIView):
+    """Avtosaqlash: javoblar keshdagi buferga yoziladi, asosiy jadvallarga tegilmaydi."""
+
+    def post(self, request, pk):
+        meta = self.get_meta(pk)
+        serializer = AnswerSubmissionSerializer(data=request.data.get('answers'), many=True)
+        serializer.is_valid(raise_exception=True)
+        try:
+            test_sessions.autosave(meta, serializer.validated_data)
+        except test_sessions.SessionClosed as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(test_sessions.state(meta))
+
+
+class TestSessionSubmitView(TestSessionMixin, APIView):
+    def post(self, request, pk):
+        meta = self.get_meta(pk)
+        try:
+            result = test_sessions.finish(meta['id'])
+        except test_sessions.SessionClosed as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(StudentTestResultSerializer(result).data, status=status.HTTP_201_CREATED)
+
+
 class TestCreatView(generics.CreateAPIView):
     queryset = Test.objects.all()
     serializer_class = TestSerializer
@@ -172,6 +425,14 @@ class StudentTestResultListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
+        claims = get_claims(user)
+
+        if claims is not None:
+            if claims['student_id'] is not None:
+                return StudentTestResult.objects.filter(student_id=claims['student_id'])
+            if claims['mentor_id'] is not None:
+                return StudentTestResult.objects.filter(student__group__in=claims['group_ids'])
+            return StudentTestResult.objects.none()
 
         if hasattr(user, 'student'):
             # Student – faqat o‘z natijalarini ko‘radi
@@ -193,7 +454,7 @@ class StudentTestResultListCreateView(generics.ListCreateAPIView):
         return StudentTestResult.objects.none()
 
     def perform_create(self, serializer):
-        serializer.save(student=self.request.user.student)
+        serializer.save(student_id=get_student_id(self.request.user))
 
 
 class StudentTestResultRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
@@ -209,7 +470,7 @@ class StudentTestDetailView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        obj = StudentTestResult.objects.filter(student__user=self.request.user).last()
+        obj = StudentTestResult.objects.filter(student_id=get_student_id(self.request.user)).order_by('-taken_at').first()
 
         if obj is None:
             raise Http404("Sizga tegishli test natijasi topilmadi.")
@@ -224,10 +485,19 @@ class StudentAnswerListView(generics.ListAPIView):
 
 
 class StudentAnswerCreateView(generics.CreateAPIView):
+    """Talaba faqat o'z natijasiga, sessiyasiz boshlangan testga javob qo'sha oladi."""
     serializer_class = StudentAnswerSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsStudent]
     queryset = StudentAnswer.objects.all()
 
+    def perform_create(self, serializer):
+        result = serializer.validated_data['result']
+        if result.student_id != get_student_id(self.request.user):
+            raise exceptions.PermissionDenied("Bu natija sizga tegishli emas.")
+        if test_sessions.blocks_direct_submit(result.student_id, result.test_id):
+            raise exceptions.ValidationError(test_sessions.DIRECT_SUBMIT_BLOCKED)
+        serializer.save()
+
 class StudentAnswerRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = StudentAnswerSerializer
     permission_classes = [IsAuthenticated]
@@ -235,11 +505,12 @@ class StudentAnswerRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVi
     def get_queryset(self):
         return StudentAnswer.objects.filter(result__student__user=self.request.user)
 
-class AchievementListCreateView(generics.ListCreateAPIView):
+class AchievementListCreateView(VersionETagMixin, generics.ListCreateAPIView):
     queryset = Achievement.objects.all()
     serializer_class = AchievementSerializer
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    etag_models = (Achievement,)
 
 class AchievementRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Achievement.objects.all()
@@ -247,72 +518,150 @@ class AchievementRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView
     permission_classes = [IsAdmin]
 
 
-class SubmitTestAPIView(APIView):
-    def post(self, request):
-        try:
-            student = request.data.get("student")
-            test = request.data.get("test")
-            correct_count = request.data.get("correct_answers")
-
-            if student in [None, ""] or test in [None, ""] or correct_count in [None, ""]:
-                return Response({"error": "Ma'lumotlar to'liq emas"}, status=400)
+class AchievementRedeemView(APIView):
+    permission_classes = [IsStudent]
 
-            try:
-                correct_count = int(correct_count)
-            except ValueError:
-                return Response({"error": "'correct_answers' butun son bo'lishi kerak"}, status=400)
+    def post(self, request, pk):
+        try:
+            purchase = redeem_achievement(get_student_id(request.user), pk)
+        except Achievement.DoesNotExist:
+            raise Http404
+        except InsufficientPoints:
+            return Response({"detail": "Not enough points."}, status=status.HTTP_400_BAD_REQUEST)
+        except OutOfStock as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        purchase = AchievementPurchase.objects.select_related('achievement').get(pk=purchase.pk)
+        return Response(AchievementPurchaseSerializer(purchase).data, status=status.HTTP_201_CREATED)
+
+
+class AchievementPurchaseListView(generics.ListAPIView):
+    """Talaba o'z xaridlarini, mentor guruhlari xaridlarini, admin hammasini ko'radi."""
+    serializer_class = AchievementPurchaseSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
-            coin_amount = correct_count * 5
+    def get_queryset(self):
+        purchases = AchievementPurchase.objects.select_related('achievement')
+        user = self.request.user
+        if user.is_superuser:
+            return purchases
+        claims = get_claims(user)
+        if claims is not None:
+            if claims['student_id'] is not None:
+                return purchases.filter(student_id=claims['student_id'])
+            if claims['mentor_id'] is not None:
+                return purchases.filter(student__group__in=claims['group_ids'])
+            return purchases.none()
+        if hasattr(user, 'student'):
+            return purchases.filter(student=user.student)
+        if hasattr(user, 'mentor'):
+            return purchases.filter(student__group__mentors=user.mentor)
+        return purchases.none()
 
-            student = get_object_or_404(Student, id=student)
-            test = get_object_or_404(Test, id=test)
 
-            result, created = StudentTestResult.objects.get_or_create(
-                student=student,
-                test=test,
-                defaults={'score': coin_amount}
-            )
+class SubmitTestAPIView(APIView):
+    """
+    Eski endpoint: talaba va to'g'ri javoblar sonini mijoz yuborardi, ball shunga qarab berilardi.
+    Baholash endi faqat serverda (``api/tests/submit/answers/`` yoki test sessiyasi orqali).
+    """
 
-            if not created:
-                return Response({"detail": "Bu test allaqachon bajarilgan"}, status=400)
+    def post(self, request):
+        return Response(
+            {"detail": "This endpoint has been retired; submit answers to api/tests/submit/answers/."},
+            status=status.HTTP_410_GONE,
+        )
 
-            student.points += coin_amount
 
-            student.point_history.append({
-                'amount': coin_amount,
-                'point_type': 'test',
-                'description': f"{test.title} testidan {correct_count} ta to‘g‘ri javob",
-            })
+class SubmitTestAnswersAPIView(APIView):
+    permission_classes = [IsStudent]
 
-            student.save()
+    def post(self, request):
+        serializer = SubmitTestSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        return Response(StudentTestResultSerializer(result).data, status=status.HTTP_201_CREATED)
 
-            TestSubmissionLog.objects.create(
-                student=student,
-                test=test,
-                correct_answers=correct_count
-            )
 
-            return Response({
-                "detail": f"{correct_count} ta to‘g‘ri javob uchun {coin_amount} ball qo‘shildi",
-                "total_points": student.points,
-            }, status=201)
+class ExportView(APIView):
+    """``export/<nom>.csv`` yoki ``export/<nom>.xlsx``: natijalar, ball hodisalari, yuborish jurnali."""
+    permission_classes = [IsMentorOrAdmin]
 
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
+    def get(self, request, name, file_format):
+        if name not in exports.EXPORTS or file_format not in ('csv', 'xlsx'):
+            raise Http404
+
+        group_ids = None
+        if not request.user.is_superuser:
+            claims = get_claims(request.user)
+            if claims is not None:
+                group_ids = claims['group_ids']
+            else:
+                group_ids = list(Group.objects.filter(mentors__user=request.user).values_list('id', flat=True))
+
+        headers, rows = exports.export_rows(name, request.query_params, group_ids)
+        if file_format == 'csv':
+            return exports.csv_response(name, headers, rows)
+        try:
+            return exports.xlsx_response(name, headers, rows)
+        except ImportError:
+            return Response({"detail": "XLSX export requires openpyxl."}, status=status.HTTP_501_NOT_IMPLEMENTED)
 
 
 class TestSubmissionLogAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        student = request.user.student
-        logs = TestSubmissionLog.objects.filter(student=student)
+        logs = TestSubmissionLog.objects.filter(student_id=get_student_id(request.user)).order_by('-submitted_at')
         serializer = TestSubmissionLogSerializer(logs, many=True)
         return Response(serializer.data)
 
     def post(self, request):
         serializer = TestSubmissionLogSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(student=request.user.student)
+            serializer.save(student_id=get_student_id(request.user))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LeaderboardView(APIView):
+    permission_classes = [IsAuthenticated]
+    scope_model = None
+    default_limit = 10
+    max_limit = 100
+
+    def get_scope(self, pk):
+        if self.scope_model is None:
+            return leaderboard.GLOBAL_SCOPE
+        obj = get_object_or_404(self.scope_model, pk=pk)
+        if self.scope_model is Group:
+            return leaderboard.group_scope(obj.pk)
+        return leaderboard.course_scope(obj.pk)
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get(self, request, pk=None):
+        scope = self.get_scope(pk)
+        top = leaderboard.top(scope, self.get_limit())
+        data = {'top': LeaderboardEntrySerializer(top, many=True, context={'request': request}).data, 'me': None}
+
+        student = Student.objects.filter(user=request.user).only('id', 'points', 'group_id').first()
+        if student is not None and scope in leaderboard.scopes_for_group(student.group_id):
+            data['me'] = {
+                'id': student.id,
+                'points': student.points,
+                'rank': leaderboard.rank_of(scope, student.points),
+            }
+        return Response(data)
+
+
+class GroupLeaderboardView(LeaderboardView):
+    scope_model = Group
+
+
+class CourseLeaderboardView(LeaderboardView):
+    scope_model = Course